@@ -0,0 +1,3 @@
+"""
+Command-line helpers to prepare and run the ITA-Bench tasks with `lm_eval`.
+"""
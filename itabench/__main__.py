@@ -0,0 +1,259 @@
+"""
+Entry point of the `itabench` command line:
+
+    python -m itabench manifest
+    python -m itabench bundle --tasks itabench_leaderboard_it --output_path bundle/
+    python -m itabench run --bundle bundle/ -- --model hf --tasks itabench_leaderboard_it ...
+    python -m itabench run -- --model itabench-completions --model_args base_url=... --tasks ...
+    python -m itabench rescore output/<model>/results_<date>.json
+    python -m itabench langid --samples output/samples_ifeval_it_*.jsonl --backends langdetect
+
+Everything after `--` in `run` is passed to `lm_eval` as is.
+"""
+
+import argparse
+import functools
+import logging
+import os
+import sys
+
+from itabench import bundle, langid, manifest, models, pipeline, prefetch, rescore, stats
+from itabench.tasks import TASKS_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="itabench")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bundle_parser = subparsers.add_parser(
+        "bundle", help="Pack the datasets of the given tasks in a local bundle."
+    )
+    bundle_parser.add_argument(
+        "--tasks",
+        type=str,
+        required=True,
+        help="Comma-separated list of tasks, groups or tags.",
+    )
+    bundle_parser.add_argument("--output_path", type=str, required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run `lm_eval` with the ITA-Bench helpers.")
+    run_parser.add_argument(
+        "--bundle",
+        type=str,
+        default=None,
+        help="Serve the datasets from this bundle instead of the Hugging Face Hub.",
+    )
+    run_parser.add_argument(
+        "--full_task_index",
+        action="store_true",
+        help="Let `lm_eval` index the whole task tree instead of only the files needed by the run.",
+    )
+    run_parser.add_argument(
+        "--letter_choice",
+        action="store_true",
+        help="Score the single-token choices of a document (e.g. A/B/C/D) with one forward pass.",
+    )
+    run_parser.add_argument(
+        "--no_dedup",
+        action="store_true",
+        help="Do not deduplicate the identical loglikelihood requests of the run.",
+    )
+    run_parser.add_argument(
+        "--no_stop_patterns",
+        action="store_true",
+        help="Do not stop the generations at the `stop_pattern` of their task (e.g. GSM8K).",
+    )
+    run_parser.add_argument(
+        "--no_results_cache",
+        action="store_true",
+        help="Do not read or store the answers of the model in the persistent results cache.",
+    )
+    run_parser.add_argument(
+        "--prefix_schedule",
+        action="store_true",
+        help="Order the requests to maximise the shared prefixes and report the prefix reuse.",
+    )
+    run_parser.add_argument(
+        "--prefetch_tasks",
+        action="store_true",
+        help="Prepare the datasets of the tasks in the background while the model is loading.",
+    )
+    run_parser.add_argument(
+        "--prefetch_workers",
+        type=int,
+        default=prefetch.PREFETCH_WORKERS,
+        help="Number of threads loading the datasets of the next tasks.",
+    )
+    run_parser.add_argument(
+        "--prefetch_memory",
+        type=int,
+        default=prefetch.PREFETCH_MEMORY,
+        help="Bytes of datasets loaded ahead of their tasks.",
+    )
+    run_parser.add_argument(
+        "--pipeline_scoring",
+        action="store_true",
+        help="Score the answers of the generative tasks in worker processes while generating.",
+    )
+    run_parser.add_argument(
+        "--scoring_workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes of `--pipeline_scoring`.",
+    )
+    run_parser.add_argument(
+        "--bootstrap_ci",
+        action="store_true",
+        help="Bootstrap the stderrs of the tasks and of the groups with NumPy (`--bootstrap_iters` "
+        "resamples of `lm_eval`) and store their confidence intervals in the results.",
+    )
+    run_parser.add_argument("lm_eval_args", nargs=argparse.REMAINDER)
+
+    subparsers.add_parser("manifest", help="Compile the task manifest and print its location.")
+
+    rescore_parser = subparsers.add_parser(
+        "rescore", help="Score again the samples logged by `lm_eval --log_samples`."
+    )
+    rescore_parser.add_argument(
+        "results_path", type=str, help="The `results_<date>.json` file of the run."
+    )
+    rescore_parser.add_argument(
+        "--output_path",
+        type=str,
+        default=None,
+        help="Where to write the new results (default: `rescored_results_<date>.json` next to them).",
+    )
+    rescore_parser.add_argument("--num_workers", type=int, default=os.cpu_count() or 1)
+    rescore_parser.add_argument("--bootstrap_iters", type=int, default=100000)
+    rescore_parser.add_argument(
+        "--bootstrap_ci",
+        action="store_true",
+        help="Bootstrap the stderrs of the rescored tasks and of their groups, and store their "
+        "confidence intervals.",
+    )
+
+    langid_parser = subparsers.add_parser(
+        "langid", help="Compare the IFEval-IT language identification backends on logged samples."
+    )
+    langid_parser.add_argument(
+        "--samples",
+        type=str,
+        nargs="+",
+        required=True,
+        help="IFEval-IT sample files written by `lm_eval --log_samples`.",
+    )
+    langid_parser.add_argument(
+        "--backends",
+        type=str,
+        nargs="+",
+        default=["langdetect"],
+        help="Backends as `<name>[:<argument>]`, e.g. `langdetect:0` or `fasttext:lid.176.ftz`.",
+    )
+
+    return parser
+
+
+def use_task_manifest(lm_eval_args: argparse.Namespace) -> None:
+    """
+    Point `lm_eval` to a pruned copy of the task tree that only contains the requested tasks.
+
+    Runs that include other directories or tasks that are not part of ITA-Bench are left as
+    they are.
+    """
+    import lm_eval.__main__
+    from lm_eval.tasks import TaskManager
+
+    include_path = lm_eval_args.include_path
+    if include_path is None or os.path.realpath(include_path) != os.path.realpath(TASKS_DIR):
+        return
+    if lm_eval_args.tasks is None:
+        return
+
+    task_names = lm_eval_args.tasks.split(",")
+    task_manifest = manifest.load_manifest()
+    if not all(name in manifest.manifest_index(task_manifest) for name in task_names):
+        logger.info("Some tasks are not part of ITA-Bench, indexing the whole task tree.")
+        return
+
+    lm_eval_args.include_path = manifest.prune_tasks_dir(task_names, task_manifest)
+    lm_eval.__main__.TaskManager = functools.partial(TaskManager, include_defaults=False)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = setup_parser().parse_args()
+
+    if args.command == "bundle":
+        bundle.create_bundle(args.tasks.split(","), args.output_path)
+
+    elif args.command == "manifest":
+        task_manifest = manifest.load_manifest()
+        logger.info(f"Indexed {len(task_manifest['files'])} YAML files.")
+        print(manifest.default_manifest_path())
+
+    elif args.command == "rescore":
+        output_path = rescore.rescore(
+            args.results_path,
+            args.output_path,
+            args.num_workers,
+            args.bootstrap_iters,
+            args.bootstrap_ci,
+        )
+        print(output_path)
+
+    elif args.command == "langid":
+        print(langid.format_rows(langid.benchmark(args.samples, args.backends)))
+
+    elif args.command == "run":
+        if args.bundle is not None:
+            bundle.install(args.bundle)
+
+        # Imported here, so that `bundle` does not need to load the whole harness.
+        from lm_eval.__main__ import cli_evaluate, setup_parser as setup_lm_eval_parser
+
+        from itabench import client  # noqa: F401 (registers the `itabench-completions` model)
+
+        lm_eval_args = args.lm_eval_args
+        if lm_eval_args and lm_eval_args[0] == "--":
+            lm_eval_args = lm_eval_args[1:]
+        lm_eval_args = setup_lm_eval_parser().parse_args(lm_eval_args)
+
+        if not args.full_task_index:
+            use_task_manifest(lm_eval_args)
+
+        wrappers = []
+        if not args.no_stop_patterns:
+            wrappers.append(models.StopPatternLM)
+        if args.letter_choice:
+            wrappers.append(models.LetterChoiceLM)
+        if args.prefix_schedule:
+            wrappers.append(models.PrefixSchedulerLM)
+        if not args.no_results_cache:
+            wrappers.append(
+                functools.partial(
+                    models.ResultsCacheLM,
+                    model=lm_eval_args.model,
+                    model_args=lm_eval_args.model_args,
+                )
+            )
+        if not args.no_dedup:
+            wrappers.append(models.DedupLM)
+        if args.pipeline_scoring:
+            wrappers.append(
+                functools.partial(pipeline.PipelinedScoringLM, num_workers=args.scoring_workers)
+            )
+            pipeline.install()
+        if wrappers:
+            models.install(wrappers)
+        if args.bootstrap_ci:
+            stats.install()
+        if args.prefetch_tasks:
+            prefetch.install(args.prefetch_workers, args.prefetch_memory)
+
+        cli_evaluate(lm_eval_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
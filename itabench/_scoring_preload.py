@@ -0,0 +1,14 @@
+"""
+Imported by the fork server of `itabench.scoring`, so that every worker forked from it starts
+with the lazy initialisation of the scorers done: the first `parse_latex` builds the ANTLR
+parser of sympy (about 0.7s, more than the time limit of a sympy comparison of MATH-IT).
+"""
+
+try:
+    from math_verify import parse
+    from sympy.parsing.latex import parse_latex
+
+    parse_latex("1")
+    parse("$1$")
+except Exception:
+    pass
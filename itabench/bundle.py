@@ -0,0 +1,162 @@
+"""
+Pack the datasets used by ITA-Bench in a local bundle that can be used without network access.
+
+A bundle is a directory with a `manifest.json` and one Arrow file per dataset split,
+named after the SHA-256 of its content:
+
+    bundle/
+        manifest.json
+        objects/<sha256>.arrow
+
+The manifest maps every `dataset_path` and `dataset_name` (`default` when the YAML has
+none) to the objects of its splits.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Iterable, Optional
+
+import datasets
+from datasets.arrow_writer import ArrowWriter
+
+from itabench.tasks import TASKS_DIR, build_index, iter_configs, load_config, resolve_tasks
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+OBJECTS_DIRNAME = "objects"
+DEFAULT_CONFIG_NAME = "default"
+
+
+def collect_datasets(task_names: Iterable[str], tasks_dir: str = TASKS_DIR) -> Dict[str, set]:
+    """
+    Map every `dataset_path` referenced by the given tasks, groups or tags to its `dataset_name`s.
+    """
+    index = build_index(iter_configs(tasks_dir))
+
+    dataset_names = {}
+    for task in resolve_tasks(task_names, index):
+        config = load_config(index[task]["yaml_path"])
+        dataset_name = config.get("dataset_name") or DEFAULT_CONFIG_NAME
+        dataset_names.setdefault(config["dataset_path"], set()).add(dataset_name)
+
+    return dataset_names
+
+
+def _write_object(dataset: datasets.Dataset, objects_dir: str) -> str:
+    """
+    Write a split as a content-addressed Arrow file and return its hash.
+    """
+    with tempfile.NamedTemporaryFile(dir=objects_dir, suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+    os.chmod(tmp_path, 0o644)
+
+    writer = ArrowWriter(features=dataset.features, path=tmp_path)
+    writer.write_table(dataset.flatten_indices().data.table)
+    writer.finalize()
+    writer.close()
+
+    sha256 = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for chunk in iter(functools.partial(f.read, 1 << 20), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+
+    object_path = os.path.join(objects_dir, f"{digest}.arrow")
+    if os.path.exists(object_path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, object_path)
+
+    return digest
+
+
+def create_bundle(task_names: Iterable[str], output_dir: str, tasks_dir: str = TASKS_DIR) -> dict:
+    """
+    Download the datasets of the given tasks, groups or tags and pack them in `output_dir`.
+
+    Running it again on an existing bundle adds the missing datasets to it.
+    """
+    objects_dir = os.path.join(output_dir, OBJECTS_DIRNAME)
+    os.makedirs(objects_dir, exist_ok=True)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    manifest = {"datasets": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+
+    for dataset_path, dataset_names in sorted(collect_datasets(task_names, tasks_dir).items()):
+        for dataset_name in sorted(dataset_names):
+            if dataset_name in manifest["datasets"].get(dataset_path, {}):
+                continue
+
+            logger.info(f"Bundling {dataset_path} ({dataset_name})")
+            dataset_dict = datasets.load_dataset(
+                dataset_path,
+                None if dataset_name == DEFAULT_CONFIG_NAME else dataset_name,
+            )
+            manifest["datasets"].setdefault(dataset_path, {})[dataset_name] = {
+                split: _write_object(dataset, objects_dir)
+                for split, dataset in dataset_dict.items()
+            }
+
+            # Save after every dataset, so that an interrupted run can be resumed.
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+def load_from_bundle(
+    bundle_dir: str,
+    manifest: dict,
+    path: str,
+    name: Optional[str] = None,
+) -> Optional[datasets.DatasetDict]:
+    """
+    Load a dataset from the bundle as memory-mapped splits, or return None if it is not bundled.
+    """
+    splits = manifest["datasets"].get(path, {}).get(name or DEFAULT_CONFIG_NAME)
+    if splits is None:
+        return None
+
+    return datasets.DatasetDict(
+        {
+            split: datasets.Dataset.from_file(
+                os.path.join(bundle_dir, OBJECTS_DIRNAME, f"{digest}.arrow"),
+                split=split,
+            )
+            for split, digest in splits.items()
+        }
+    )
+
+
+def install(bundle_dir: str) -> None:
+    """
+    Serve `datasets.load_dataset` calls from the bundle, falling back to the Hub for datasets
+    that are not in it.
+    """
+    with open(os.path.join(bundle_dir, MANIFEST_FILENAME), "r") as f:
+        manifest = json.load(f)
+
+    hub_load_dataset = datasets.load_dataset
+
+    @functools.wraps(hub_load_dataset)
+    def load_dataset(path, name=None, *args, **kwargs):
+        split = kwargs.pop("split", None)
+        dataset_dict = None
+        if not args and not kwargs:
+            dataset_dict = load_from_bundle(bundle_dir, manifest, path, name)
+
+        if dataset_dict is None:
+            logger.warning(f"{path} ({name}) is not in the bundle, loading it from the Hub.")
+            return hub_load_dataset(path, name, *args, split=split, **kwargs)
+
+        return dataset_dict[split] if split is not None else dataset_dict
+
+    datasets.load_dataset = load_dataset
@@ -0,0 +1,273 @@
+"""
+Asynchronous client for local OpenAI-compatible servers (e.g. vLLM, llama.cpp), for the
+generative tasks (IFEval-IT, MATH-IT, GSM8K):
+
+    python -m itabench run -- --model itabench-completions \
+        --model_args base_url=http://localhost:8000/v1,model=<model>,tokenizer=<tokenizer> \
+        --tasks itabench_leaderboard_it ...
+
+All the generation requests of a run go through one pool of connections, with a window of
+in-flight requests that adapts to the server, as TCP does: it doubles while the server answers
+(slow start), then grows by one request per window, and halves when the server is overloaded
+(HTTP 429 or 503, timeouts, dropped connections). The server always has requests queued, and
+neither the batch size nor the concurrency has to be tuned. Failed requests are retried with
+exponential backoff, and the answers are returned in the order of the requests, while
+`on_answer` gets each of them as soon as it arrives.
+"""
+
+import asyncio
+import copy
+import logging
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lm_eval.api.model import LM
+from lm_eval.api.registry import register_model
+from lm_eval.models.utils import handle_stop_sequences
+
+logger = logging.getLogger(__name__)
+
+# Status codes of an overloaded server, whose requests are retried with a smaller window.
+OVERLOAD_STATUSES = {429, 503}
+# Other status codes whose requests are retried.
+RETRY_STATUSES = {408, 500, 502, 504}
+
+
+class ServerError(Exception):
+    """
+    A request the server did not answer, after all the retries.
+    """
+
+
+class AdaptiveWindow:
+    """
+    Bound the number of in-flight requests with an additive-increase, multiplicative-decrease
+    window.
+    """
+
+    def __init__(self, initial: int = 8, maximum: int = 256) -> None:
+        self.maximum = maximum
+        self.limit = float(min(initial, maximum))
+        self.threshold = float(maximum)
+        self.in_flight = 0
+        # Incremented when the window shrinks, so that the requests that were already in flight
+        # when the server got overloaded shrink it only once.
+        self.epoch = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> int:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            return self.epoch
+
+    async def release(self, epoch: int, overloaded: bool = False) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                if epoch == self.epoch:
+                    self.epoch += 1
+                    self.threshold = max(1.0, self.limit / 2)
+                    self.limit = self.threshold
+            elif self.limit < self.threshold:
+                self.limit = min(self.limit + 1, self.maximum)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, self.maximum)
+            self._condition.notify_all()
+
+
+def completion_payload(
+    model: str, context: str, gen_kwargs: dict, max_gen_toks: int, seed: int, eos: Optional[str]
+) -> dict:
+    """
+    Build the body of a `/completions` request from the `generation_kwargs` of a task, as
+    `lm_eval`'s `local-completions` does.
+    """
+    gen_kwargs = copy.deepcopy(gen_kwargs)
+    gen_kwargs.pop("do_sample", None)
+    max_tokens = gen_kwargs.pop("max_gen_toks", max_gen_toks)
+    max_tokens = gen_kwargs.pop("max_new_tokens", max_tokens)
+    max_tokens = gen_kwargs.pop("max_tokens", max_tokens)
+    return {
+        "model": model,
+        "prompt": context,
+        "max_tokens": max_tokens,
+        "temperature": gen_kwargs.pop("temperature", 0),
+        "stop": handle_stop_sequences(gen_kwargs.pop("until", None), eos),
+        "seed": seed,
+        **gen_kwargs,
+    }
+
+
+@register_model("itabench-completions")
+class AsyncCompletionsLM(LM):
+    """
+    `lm_eval` model that sends the generation requests to the `/completions` endpoint of an
+    OpenAI-compatible server, with an adaptive number of concurrent requests.
+
+    The tokenizer (by default the one of `model` on the Hub) applies the chat template and
+    counts the tokens of the answers. The loglikelihood requests are not supported: the
+    multiple-choice tasks run faster on the `hf` or `vllm` models.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000/v1",
+        model: Optional[str] = None,
+        tokenizer: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_concurrent: int = 256,
+        initial_concurrent: int = 8,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 600.0,
+        max_gen_toks: int = 256,
+        seed: int = 1234,
+        **kwargs,
+    ) -> None:
+        super().__init__()
+        from transformers import AutoTokenizer
+
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer or model)
+        self.api_key = api_key
+        self.max_concurrent = int(max_concurrent)
+        self.initial_concurrent = int(initial_concurrent)
+        self.max_retries = int(max_retries)
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self.timeout = float(timeout)
+        self.max_gen_toks = int(max_gen_toks)
+        self.seed = seed
+        # Called with the index of every request and its answer, as soon as it arrives.
+        self.on_answer: Optional[Callable[[int, str], None]] = None
+
+    @property
+    def tokenizer_name(self) -> str:
+        return self.tokenizer.name_or_path.replace("/", "__")
+
+    def chat_template(self, chat_template=False) -> Optional[str]:
+        return self.tokenizer.chat_template
+
+    def apply_chat_template(
+        self, chat_history: List[Dict[str, str]], add_generation_prompt: bool = True
+    ) -> str:
+        return self.tokenizer.apply_chat_template(
+            chat_history, tokenize=False, add_generation_prompt=add_generation_prompt
+        )
+
+    def tok_encode(self, text: str) -> List[int]:
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    async def _complete(
+        self, session, window: AdaptiveWindow, payload: dict, stats: Dict[str, int]
+    ) -> str:
+        import aiohttp
+
+        for attempt in range(self.max_retries + 1):
+            epoch = await window.acquire()
+            overloaded = False
+            error = None
+            try:
+                async with session.post(
+                    f"{self.base_url}/completions", json=payload, headers=self.headers
+                ) as response:
+                    if response.status == 200:
+                        output = await response.json()
+                        usage = output.get("usage") or {}
+                        stats["completion_tokens"] += usage.get("completion_tokens", 0)
+                        return output["choices"][0]["text"]
+                    error = f"HTTP {response.status}: {await response.text()}"
+                    overloaded = response.status in OVERLOAD_STATUSES
+                    if not overloaded and response.status not in RETRY_STATUSES:
+                        raise ServerError(error)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = repr(e)
+                overloaded = True
+            finally:
+                await window.release(epoch, overloaded)
+
+            stats["retries"] += 1
+            delay = min(self.max_backoff, self.backoff * 2**attempt) * random.uniform(0.5, 1.5)
+            logger.warning(f"Request failed ({error}), retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+        raise ServerError(f"Request failed after {self.max_retries} retries: {error}")
+
+    async def _generate(self, payloads: List[dict], callback: Callable[[int, str], None]) -> dict:
+        import aiohttp
+
+        window = AdaptiveWindow(self.initial_concurrent, self.max_concurrent)
+        stats = {"retries": 0, "completion_tokens": 0}
+
+        async def complete(i: int, session) -> None:
+            callback(i, await self._complete(session, window, payloads[i], stats))
+
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as session:
+            tasks = [asyncio.create_task(complete(i, session)) for i in range(len(payloads))]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        stats["window"] = int(window.limit)
+        return stats
+
+    def generate_until(self, requests, disable_tqdm: bool = False) -> List[str]:
+        from tqdm import tqdm
+
+        eos_token_id = self.tokenizer.eos_token_id
+        eos = self.tokenizer.decode([eos_token_id]) if eos_token_id is not None else None
+        payloads = [
+            completion_payload(self.model, context, gen_kwargs, self.max_gen_toks, self.seed, eos)
+            for context, gen_kwargs in (request.args for request in requests)
+        ]
+        answers = [None] * len(requests)
+        pbar = tqdm(total=len(requests), desc="Requesting the server", disable=disable_tqdm)
+
+        def callback(i: int, answer: str) -> None:
+            # The servers may include the stop sequence in the answer: cut it as `HFLM` does.
+            for term in payloads[i]["stop"]:
+                if term:
+                    answer = answer.split(term)[0]
+            answers[i] = answer
+            self.cache_hook.add_partial("generate_until", requests[i].args, answer)
+            pbar.update(1)
+            if self.on_answer is not None:
+                self.on_answer(i, answer)
+
+        start = time.perf_counter()
+        stats = asyncio.run(self._generate(payloads, callback))
+        seconds = max(time.perf_counter() - start, 1e-9)
+        pbar.close()
+
+        logger.info(
+            f"{len(requests)} completions in {seconds:.1f}s ({len(requests) / seconds:.1f}/s, "
+            f"{stats['completion_tokens'] / seconds:.0f} tokens/s), {stats['retries']} retries, "
+            f"final window of {stats['window']} requests"
+        )
+        return answers
+
+    def loglikelihood(self, requests, disable_tqdm: bool = False) -> List[Tuple[float, bool]]:
+        raise NotImplementedError(
+            "itabench-completions only answers generation requests, use `local-completions` "
+            "for the loglikelihood ones."
+        )
+
+    def loglikelihood_rolling(self, requests, disable_tqdm: bool = False) -> List[float]:
+        raise NotImplementedError(
+            "itabench-completions only answers generation requests, use `local-completions` "
+            "for the loglikelihood ones."
+        )
@@ -0,0 +1,116 @@
+"""
+Persistent cache of the documents processed by the `process_docs` of the translated tasks.
+
+    from itabench.docs_cache import cached_map
+
+    def process_docs(dataset):
+        return cached_map(dataset, _process_docs, "piqa_it-it", batched=True)
+
+An entry is keyed by the fingerprint of the dataset, the name given by the task, the source of
+the module that defines the function and the `metadata.version` of the task YAMLs that use this
+module as their `process_docs`. Entries are stored as Arrow files and loaded back memory-mapped.
+"""
+
+import functools
+import hashlib
+import os
+from typing import Callable
+
+import datasets
+
+from itabench.tasks import function_module_path, load_config
+
+DOCS_CACHE_DIR = os.environ.get(
+    "ITABENCH_DOCS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "itabench", "docs"),
+)
+DOCS_CACHE_MAX_SIZE = int(os.environ.get("ITABENCH_DOCS_CACHE_MAX_SIZE", 20 * 1024**3))
+
+
+@functools.lru_cache(maxsize=None)
+def _source_hash(module_path: str) -> str:
+    with open(module_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def task_version(module_path: str) -> str:
+    """
+    Return the `metadata.version`s of the task YAMLs (under the directory of the module) whose
+    `process_docs` is a function of the module at `module_path`.
+    """
+    module_path = os.path.realpath(module_path)
+    versions = set()
+    for root, _, files in os.walk(os.path.dirname(module_path)):
+        for file in files:
+            if not file.endswith(".yaml"):
+                continue
+            yaml_path = os.path.join(root, file)
+            config = load_config(yaml_path)
+            reference = config.get("process_docs")
+            if not isinstance(reference, str) or "." not in reference:
+                continue
+            if os.path.realpath(function_module_path(yaml_path, reference)) == module_path:
+                versions.add(str((config.get("metadata") or {}).get("version")))
+    return ",".join(sorted(versions))
+
+
+def _evict(used_files: set) -> None:
+    # Other ranks may evict the same entries concurrently.
+    entries = []
+    for name in os.listdir(DOCS_CACHE_DIR):
+        if name.endswith(".arrow"):
+            path = os.path.join(DOCS_CACHE_DIR, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    cache_size = 0
+    for _, size, path in sorted(entries, reverse=True):
+        cache_size += size
+        if cache_size > DOCS_CACHE_MAX_SIZE and path not in used_files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def cached_map(
+    dataset: datasets.Dataset,
+    function: Callable,
+    task_name: str,
+    **map_kwargs,
+) -> datasets.Dataset:
+    """
+    Map `function` over the dataset using a persistent cache of the processed docs.
+
+    Set `ITABENCH_REBUILD_DOCS_CACHE=1` to rebuild the entries; once the cache grows over
+    `ITABENCH_DOCS_CACHE_MAX_SIZE` bytes, the least recently used entries are evicted.
+    """
+    module_path = os.path.realpath(function.__code__.co_filename)
+    key = "\0".join(
+        [dataset._fingerprint, task_name, _source_hash(module_path), task_version(module_path)]
+    )
+    fingerprint = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    cache_file_name = os.path.join(DOCS_CACHE_DIR, f"{task_name}-{fingerprint}.arrow")
+
+    rebuild = os.environ.get("ITABENCH_REBUILD_DOCS_CACHE", "0") == "1"
+
+    os.makedirs(DOCS_CACHE_DIR, exist_ok=True)
+    processed = dataset.map(
+        function,
+        cache_file_name=cache_file_name,
+        new_fingerprint=fingerprint,
+        load_from_cache_file=not rebuild,
+        **map_kwargs,
+    )
+
+    # With num_proc > 1 the entry is split in one file per shard.
+    used_files = {cache_file["filename"] for cache_file in processed.cache_files}
+    for path in used_files:
+        os.utime(path)
+    _evict(used_files)
+
+    return processed
@@ -0,0 +1,117 @@
+"""
+Compare the language identification backends of IFEval-IT on stored model outputs.
+
+    python -m itabench langid --samples output/*/samples_ifeval_it_*.jsonl \
+        --backends langdetect fasttext:lid.176.ftz
+
+The samples are the files written by `lm_eval --log_samples`. Every backend identifies the
+texts the language checkers of IFEval-IT would see (the responses and their loose variants),
+and is compared with the first backend.
+"""
+
+import json
+import os
+import time
+from typing import Iterator, List, Sequence, Tuple
+
+from itabench.tasks import TASKS_DIR, load_module
+
+IFEVAL_UTILS_PATH = os.path.join(TASKS_DIR, "leaderboard_it", "ifeval_it", "utils.py")
+
+# The instructions whose checkers identify the language of the response, and the texts they
+# identify it for.
+LANGUAGE_INSTRUCTIONS = {
+    "language:response_language": lambda text: True,
+    "change_case:english_capital": str.isupper,
+    "change_case:english_lowercase": str.islower,
+}
+
+
+def iter_samples(samples_paths: Sequence[str]) -> Iterator[Tuple[dict, str]]:
+    """
+    Yield the document and the (filtered) response of every logged sample.
+    """
+    for path in samples_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    sample = json.loads(line)
+                    yield sample["doc"], sample["filtered_resps"][0]
+
+
+def language_texts(samples_paths: Sequence[str], ifeval_utils) -> List[str]:
+    """
+    Return, without duplicates, the texts whose language IFEval-IT identifies to score the samples.
+    """
+    texts = {}
+    for doc, response in iter_samples(samples_paths):
+        filters = [
+            LANGUAGE_INSTRUCTIONS[instruction_id]
+            for instruction_id in doc["instruction_id_list"]
+            if instruction_id in LANGUAGE_INSTRUCTIONS
+        ]
+        # The variants start with the response itself, which the strict evaluation checks.
+        for text in ifeval_utils.response_variants(response):
+            if any(f(text) for f in filters):
+                texts[text] = None
+    return list(texts)
+
+
+def benchmark(samples_paths: Sequence[str], backend_specs: Sequence[str]) -> List[dict]:
+    """
+    Identify the language of the texts of the samples with every backend, and return for
+    each one its speed and its agreement with the first backend.
+    """
+    ifeval_utils = load_module(IFEVAL_UTILS_PATH)
+    texts = language_texts(samples_paths, ifeval_utils)
+
+    rows = []
+    reference = None
+    for spec in backend_specs:
+        backend = ifeval_utils.load_language_backend(spec)
+        if texts:
+            # Load the model (or the profiles) outside of the timing.
+            try:
+                backend.detect(texts[0])
+            except ifeval_utils.LanguageDetectionError:
+                pass
+
+        languages = []
+        start = time.perf_counter()
+        for text in texts:
+            try:
+                languages.append(backend.detect(text))
+            except ifeval_utils.LanguageDetectionError:
+                languages.append(None)
+        seconds = time.perf_counter() - start
+
+        if reference is None:
+            reference = languages
+        rows.append(
+            {
+                "backend": spec,
+                "texts": len(texts),
+                "seconds": seconds,
+                "texts_per_second": len(texts) / seconds if seconds else float("inf"),
+                "undetected": languages.count(None),
+                "italian": languages.count("it"),
+                "agreement": (
+                    sum(a == b for a, b in zip(languages, reference)) / len(texts) if texts else 1.0
+                ),
+            }
+        )
+    return rows
+
+
+def format_rows(rows: List[dict]) -> str:
+    lines = [
+        f"{'backend':<32} {'texts':>7} {'seconds':>9} {'texts/s':>9} {'undetected':>10} "
+        f"{'italian':>8} {'agreement':>9}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['backend']:<32} {row['texts']:>7} {row['seconds']:>9.2f} "
+            f"{row['texts_per_second']:>9.1f} {row['undetected']:>10} {row['italian']:>8} "
+            f"{row['agreement']:>9.2%}"
+        )
+    return "\n".join(lines)
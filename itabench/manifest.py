@@ -0,0 +1,183 @@
+"""
+Precompiled index of the task tree, so that a run only reads the YAML files it needs.
+
+The manifest stores, for every YAML file in `tasks/`, its resolved config, the files it
+includes, the `!function` modules it references and the modification time and size of all
+of them. It is refreshed incrementally: only the files that changed since the last run are
+parsed again.
+
+Given the tasks of a run, `prune_tasks_dir` builds a directory of symlinks that mirrors
+`tasks/` but only contains the YAML files those tasks need, to be passed to `lm_eval` as
+the include path.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Iterable, Set
+
+from itabench.tasks import (
+    TASKS_DIR,
+    build_index,
+    function_module_path,
+    iter_function_references,
+    load_config,
+)
+
+CACHE_DIR = os.environ.get(
+    "ITABENCH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "itabench")
+)
+MANIFEST_VERSION = 2
+
+
+def _stat(path: str) -> list:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _is_fresh(entry: dict, tasks_dir: str) -> bool:
+    for path, stat in entry["stats"].items():
+        full_path = os.path.join(tasks_dir, path)
+        if not os.path.exists(full_path) or _stat(full_path) != stat:
+            return False
+    return True
+
+
+def _compile_entry(yaml_path: str, tasks_dir: str) -> dict:
+    dependencies = []
+    config = load_config(yaml_path, dependencies)
+    functions = sorted(
+        {function_module_path(yaml_path, reference) for reference in iter_function_references(config)}
+    )
+
+    files = [yaml_path] + dependencies + [path for path in functions if os.path.exists(path)]
+    return {
+        "config": config,
+        "includes": [os.path.relpath(path, tasks_dir) for path in dependencies],
+        "functions": [os.path.relpath(path, tasks_dir) for path in functions],
+        "stats": {os.path.relpath(path, tasks_dir): _stat(path) for path in files},
+    }
+
+
+def default_manifest_path(tasks_dir: str = TASKS_DIR) -> str:
+    digest = hashlib.sha256(os.path.realpath(tasks_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"manifest-{digest}.json")
+
+
+def load_manifest(tasks_dir: str = TASKS_DIR, manifest_path: str = None) -> dict:
+    """
+    Load the manifest of `tasks_dir`, re-compiling the YAML files that changed since it was saved.
+    """
+    tasks_dir = os.path.realpath(tasks_dir)
+    if manifest_path is None:
+        manifest_path = default_manifest_path(tasks_dir)
+
+    manifest = {"version": MANIFEST_VERSION, "files": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            cached_manifest = json.load(f)
+        if cached_manifest.get("version") == MANIFEST_VERSION:
+            manifest = cached_manifest
+
+    files = {}
+    changed = False
+    for root, _, filenames in os.walk(tasks_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith(".yaml"):
+                continue
+
+            yaml_path = os.path.join(root, filename)
+            relative_path = os.path.relpath(yaml_path, tasks_dir)
+
+            entry = manifest["files"].get(relative_path)
+            if entry is None or not _is_fresh(entry, tasks_dir):
+                entry = _compile_entry(yaml_path, tasks_dir)
+                changed = True
+            files[relative_path] = entry
+
+    changed = changed or files.keys() != manifest["files"].keys()
+    manifest["files"] = files
+
+    if changed:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    return manifest
+
+
+def manifest_index(manifest: dict) -> Dict[str, dict]:
+    """
+    Index the tasks, groups and tags of the manifest by name (see `itabench.tasks.build_index`).
+    """
+    return build_index((path, entry["config"]) for path, entry in manifest["files"].items())
+
+
+def required_files(names: Iterable[str], manifest: dict) -> Set[str]:
+    """
+    Return the YAML files, relative to the tasks directory, needed to load the given tasks,
+    groups or tags.
+    """
+    index = manifest_index(manifest)
+
+    yaml_paths = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in index:
+            raise ValueError(f"Unknown task, group or tag: {name}")
+
+        entry = index[name]
+        if entry["yaml_path"] is not None:
+            yaml_paths.add(entry["yaml_path"])
+        pending.extend(entry["children"])
+
+    files = set()
+    for yaml_path in yaml_paths:
+        files.add(yaml_path)
+        files.update(manifest["files"][yaml_path]["includes"])
+        files.update(manifest["files"][yaml_path]["functions"])
+
+    return files
+
+
+def prune_tasks_dir(names: Iterable[str], manifest: dict, tasks_dir: str = TASKS_DIR) -> str:
+    """
+    Build a copy of the task tree made of symlinks that only contains the YAML files needed by
+    the given tasks, groups or tags, and return its path.
+
+    All the other files (templates, utils modules and resources) of the directories involved
+    are linked as well, so that relative `include`s and `!function`s keep working.
+    """
+    tasks_dir = os.path.realpath(tasks_dir)
+    files = required_files(names, manifest)
+
+    directories = {os.path.dirname(path) for path in files}
+    for directory in directories:
+        for filename in os.listdir(os.path.join(tasks_dir, directory)):
+            path = os.path.join(directory, filename)
+            if not filename.endswith(".yaml") and os.path.isfile(os.path.join(tasks_dir, path)):
+                files.add(path)
+
+    digest = hashlib.sha256("\n".join([tasks_dir] + sorted(files)).encode("utf-8")).hexdigest()
+    pruned_dir = os.path.join(CACHE_DIR, "include", digest[:16])
+    if os.path.exists(pruned_dir):
+        return pruned_dir
+
+    tmp_dir = f"{pruned_dir}.{os.getpid()}.tmp"
+    for path in sorted(files):
+        link_path = os.path.join(tmp_dir, path)
+        os.makedirs(os.path.dirname(link_path), exist_ok=True)
+        os.symlink(os.path.join(tasks_dir, path), link_path)
+    try:
+        os.replace(tmp_dir, pruned_dir)
+    except OSError:
+        # Built by another process (e.g. another rank) in the meantime.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(pruned_dir):
+            raise
+
+    return pruned_dir
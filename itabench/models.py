@@ -0,0 +1,736 @@
+"""
+Wrappers around the `lm_eval` models that reduce the work needed to answer the requests of
+a run without changing their results.
+
+The wrappers follow `lm_eval.api.model.CachingLM`: they intercept the request methods and
+pass every other attribute through to the wrapped model. `install` applies them to the model
+created by `lm_eval` before the evaluation starts.
+"""
+
+import contextlib
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from itabench.manifest import CACHE_DIR, load_manifest, manifest_index
+from itabench.prefix import PrefixTrie
+
+logger = logging.getLogger(__name__)
+
+RESULTS_CACHE_PATH = os.environ.get(
+    "ITABENCH_RESULTS_CACHE", os.path.join(CACHE_DIR, "results.sqlite")
+)
+RESULTS_CACHE_MAX_SIZE = int(os.environ.get("ITABENCH_RESULTS_CACHE_MAX_SIZE", 10 * 1024**3))
+# Stores after which the size of the results cache is read again from the database, to account
+# for the answers stored by the other ranks.
+RESULTS_CACHE_SYNC_STORES = 100
+# File systems on which the SQLite write-ahead log is not safe (it needs shared memory).
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "lustre", "gpfs", "fuse.sshfs"}
+
+
+class LMWrapper:
+    """
+    Base class of the wrappers: every attribute that is not overridden is read from `lm`.
+    """
+
+    def __init__(self, lm) -> None:
+        self.lm = lm
+
+    def __getattr__(self, attr: str):
+        return getattr(self.lm, attr)
+
+
+class LetterChoiceLM(LMWrapper):
+    """
+    Score the choices that are a single token (e.g. " A", " B", ...) with one forward pass
+    per context.
+
+    The log-probabilities of all the choices of a document are read from the next-token
+    distribution of its context, which gives the same results as scoring every
+    (context, choice) pair on its own. Only causal Hugging Face models are supported, the
+    requests of the other models (and the multi-token continuations) are passed through.
+    """
+
+    def __init__(self, lm) -> None:
+        super().__init__(lm)
+
+        from lm_eval.models.huggingface import HFLM
+
+        self.enabled = isinstance(lm, HFLM) and lm.backend == "causal"
+        if not self.enabled:
+            logger.warning(
+                f"The letter-choice fast path does not support {type(lm).__name__}, "
+                "the choices will be scored one by one."
+            )
+
+    def _encode(self, context: str, continuation: str) -> Tuple[List[int], List[int]]:
+        # Same as `TemplateLM.loglikelihood`.
+        if context == "":
+            return [self.lm.prefix_token_id], self.lm.tok_encode(continuation)
+        return self.lm._encode_pair(context, continuation)
+
+    def _score_choices(
+        self, groups: Dict[Tuple[int, ...], List[Tuple[int, int]]]
+    ) -> Dict[int, Tuple[float, bool]]:
+        """
+        Run the model once on every context, and read the (log-probability, is greedy) answer of
+        each of its (request index, choice token) from the distribution of its last position.
+        """
+        import torch
+        import torch.nn.functional as F
+        from tqdm import tqdm
+
+        batch_size = self.lm.batch_size
+        if batch_size == "auto":
+            batch_size = self.lm._detect_batch_size()
+
+        # Longest first, as in `HFLM._loglikelihood_tokens`, so that OOMs happen right away.
+        contexts = sorted(groups, key=lambda context: -len(context))
+        answers = {}
+        for start in tqdm(range(0, len(contexts), batch_size), desc="Letter-choice contexts"):
+            batch_contexts = contexts[start : start + batch_size]
+            max_len = len(batch_contexts[0])
+
+            # Right padding does not change the logits of the real tokens of causal models.
+            batch = torch.zeros(
+                (len(batch_contexts), max_len), dtype=torch.long, device=self.lm.device
+            )
+            for row, context in enumerate(batch_contexts):
+                batch[row, : len(context)] = torch.tensor(context, dtype=torch.long)
+
+            logits = self.lm._model_call(batch)
+            for row, context in enumerate(batch_contexts):
+                # Only the choices and the greedy token leave the device, not the vocabulary.
+                logprobs = F.log_softmax(logits[row, len(context) - 1], dim=-1)
+                tokens = [token for _, token in groups[context]]
+                choice_logprobs = logprobs[torch.tensor(tokens, device=logprobs.device)].tolist()
+                greedy_token = int(logprobs.argmax())
+                for (i, token), logprob in zip(groups[context], choice_logprobs):
+                    answers[i] = (logprob, greedy_token == token)
+            del logits
+
+        return answers
+
+    def loglikelihood(self, requests) -> List[Tuple[float, bool]]:
+        if not self.enabled:
+            return self.lm.loglikelihood(requests)
+
+        # Group the single-token continuations by the (truncated) tokens the model would see.
+        groups: Dict[Tuple[int, ...], List[Tuple[int, int]]] = {}
+        remaining = []
+        for i, request in enumerate(requests):
+            context_enc, continuation_enc = self._encode(*request.args)
+            if len(continuation_enc) != 1:
+                remaining.append(i)
+                continue
+            inputs = tuple(context_enc[-self.lm.max_length :])
+            groups.setdefault(inputs, []).append((i, continuation_enc[0]))
+
+        # A context with a single choice would not save any work.
+        for inputs in [inputs for inputs, choices in groups.items() if len(choices) == 1]:
+            remaining.extend(i for i, _ in groups.pop(inputs))
+        remaining.sort()
+
+        n_fast = len(requests) - len(remaining)
+        logger.info(
+            f"Letter-choice fast path: {n_fast} requests scored with {len(groups)} forward "
+            f"passes, {len(remaining)} requests scored one by one."
+        )
+
+        results = [None] * len(requests)
+        for i, answer in sorted(self._score_choices(groups).items()):
+            results[i] = answer
+            self.lm.cache_hook.add_partial("loglikelihood", requests[i].args, answer)
+
+        if remaining:
+            answers = self.lm.loglikelihood([requests[i] for i in remaining])
+            for i, answer in zip(remaining, answers):
+                results[i] = answer
+
+        return results
+
+
+class DedupLM(LMWrapper):
+    """
+    Answer the identical loglikelihood requests of a run (e.g. the same choices after the
+    same few-shot context in different tasks) with a single call to the model.
+
+    `lm_eval` sends all the requests of a type, from every task of the run, in a single call,
+    so deduplicating them here covers the whole suite.
+    """
+
+    def __init__(self, lm) -> None:
+        super().__init__(lm)
+        # request type -> task name -> (requests, duplicate requests)
+        self.stats: Dict[str, Dict[str, List[int]]] = {}
+
+    def _dedup(self, request_type: str, requests) -> list:
+        unique_indices: Dict[tuple, int] = {}
+        unique_requests = []
+        positions = []
+        task_stats = self.stats.setdefault(request_type, {})
+        for request in requests:
+            key = tuple(request.args)
+            stats = task_stats.setdefault(request.task_name, [0, 0])
+            stats[0] += 1
+            if key in unique_indices:
+                stats[1] += 1
+            else:
+                unique_indices[key] = len(unique_requests)
+                unique_requests.append(request)
+            positions.append(unique_indices[key])
+
+        logger.info(
+            f"Deduplicated {request_type} requests: {len(requests)} -> {len(unique_requests)}"
+        )
+        for task_name, (n_requests, n_duplicates) in sorted(task_stats.items()):
+            logger.info(
+                f"  {task_name}: {n_duplicates}/{n_requests} duplicate requests "
+                f"(dedup ratio {n_duplicates / n_requests:.2%})"
+            )
+
+        answers = getattr(self.lm, request_type)(unique_requests)
+        return [answers[position] for position in positions]
+
+    def loglikelihood(self, requests) -> List[Tuple[float, bool]]:
+        return self._dedup("loglikelihood", requests)
+
+    def loglikelihood_rolling(self, requests) -> List[float]:
+        return self._dedup("loglikelihood_rolling", requests)
+
+
+class PrefixSchedulerLM(LMWrapper):
+    """
+    Send the requests to the model ordered so that consecutive requests share the longest
+    possible prefix of tokens.
+
+    The order comes from a depth-first visit of a `PrefixTrie` built over all the pending
+    requests of a type. Backends that can reuse the cache of a shared prefix get the trie
+    through their `set_prefix_trie` method, if they have one. For every task, the share of
+    its tokens that is a prefix of an earlier request (the reuse a prefix cache could
+    achieve) is logged.
+    """
+
+    def __init__(self, lm) -> None:
+        super().__init__(lm)
+        # request type -> task name -> [tokens, shared tokens]
+        self.stats: Dict[str, Dict[str, List[int]]] = {}
+
+    def _tokenize(self, text: str) -> list:
+        if hasattr(self.lm, "tok_encode"):
+            return self.lm.tok_encode(text)
+        # Models without a local tokenizer: characters give the same prefixes.
+        return [ord(c) for c in text]
+
+    def _schedule(self, request_type: str, requests) -> list:
+        trie = PrefixTrie()
+        task_stats = self.stats.setdefault(request_type, {})
+        for i, request in enumerate(requests):
+            context = request.args[0]
+            if request_type == "loglikelihood":
+                context += request.args[1]
+            tokens = self._tokenize(context)
+            shared = trie.insert(tokens, i)
+
+            stats = task_stats.setdefault(request.task_name, [0, 0])
+            stats[0] += len(tokens)
+            stats[1] += shared
+
+        logger.info(
+            f"Prefix reuse of {request_type} requests: {trie.n_shared_tokens}/{trie.n_tokens} "
+            f"tokens ({trie.n_shared_tokens / max(trie.n_tokens, 1):.2%})"
+        )
+        for task_name, (n_tokens, n_shared) in sorted(task_stats.items()):
+            logger.info(
+                f"  {task_name}: {n_shared}/{n_tokens} tokens in shared prefixes "
+                f"({n_shared / max(n_tokens, 1):.2%})"
+            )
+
+        if hasattr(self.lm, "set_prefix_trie"):
+            self.lm.set_prefix_trie(trie)
+
+        order = list(trie)
+        answers = getattr(self.lm, request_type)([requests[i] for i in order])
+        results = [None] * len(requests)
+        for i, answer in zip(order, answers):
+            results[i] = answer
+        return results
+
+    def loglikelihood(self, requests) -> List[Tuple[float, bool]]:
+        return self._schedule("loglikelihood", requests)
+
+    def generate_until(self, requests) -> List[str]:
+        return self._schedule("generate_until", requests)
+
+
+def task_stop_patterns(task_manifest: Optional[dict] = None) -> Dict[str, str]:
+    """
+    Return the `stop_pattern` of the tasks that declare one in their `metadata`.
+    """
+    if task_manifest is None:
+        task_manifest = load_manifest()
+
+    patterns = {}
+    for name, entry in manifest_index(task_manifest).items():
+        if entry["type"] != "task":
+            continue
+        metadata = task_manifest["files"][entry["yaml_path"]]["config"].get("metadata") or {}
+        if metadata.get("stop_pattern"):
+            patterns[name] = metadata["stop_pattern"]
+    return patterns
+
+
+def pattern_stopping_criteria(tokenizer, pattern: re.Pattern, stop: List[str], input_length: int):
+    """
+    A `transformers` stopping criterion that marks as done every sequence whose generated text
+    matches `pattern` or contains one of the `stop` sequences.
+
+    Unlike the criteria of `lm_eval`, it stops the sequences one by one, so a batch ends as
+    soon as each of its sequences has stopped for any of the two reasons.
+    """
+    import torch
+    import transformers
+
+    class PatternStoppingCriteria(transformers.StoppingCriteria):
+        def __init__(self) -> None:
+            self.done = None
+
+        def __call__(self, input_ids, scores, **kwargs):
+            if self.done is None:
+                self.done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+            pending = (~self.done).nonzero().flatten().tolist()
+            texts = tokenizer.batch_decode(input_ids[pending, input_length:])
+            for row, text in zip(pending, texts):
+                if pattern.search(text) or any(s and s in text for s in stop):
+                    self.done[row] = True
+            return self.done.clone()
+
+    return PatternStoppingCriteria()
+
+
+class StopPatternLM(LMWrapper):
+    """
+    Stop the generations of a task as soon as they match the `stop_pattern` (a regular
+    expression) in the `metadata` of the task, e.g. the "#### <number>" line of a GSM8K answer.
+
+    Every answer is cut at the end of the first match, which for greedy decoding gives the
+    same text as generating the whole answer and cutting it. The causal Hugging Face models
+    stop generating a sequence as soon as it matches; the other models generate the whole
+    answer, which is then cut. For every task, the tokens generated and the tokens of the
+    generation budget (`max_new_tokens`) that were not used are logged, and the same
+    figures are stored in the logged samples.
+    """
+
+    def __init__(self, lm, patterns: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(lm)
+        if patterns is None:
+            patterns = task_stop_patterns()
+        self.patterns = {name: re.compile(pattern) for name, pattern in patterns.items()}
+
+        from lm_eval.models.huggingface import HFLM
+
+        self.early_stop = isinstance(lm, HFLM) and lm.backend == "causal"
+        # task name -> [generations, generations that matched, generated tokens, budget]
+        self.stats: Dict[str, List[int]] = {}
+
+    def request_key(self, request) -> Optional[str]:
+        """
+        The pattern the answer of `request` is cut at, which the results cache adds to its key.
+        """
+        pattern = self.patterns.get(request.task_name)
+        return pattern.pattern if pattern is not None else None
+
+    def cut(self, task_name: str, answer: str) -> str:
+        """
+        Cut an answer of a task at the end of the first match of the stop pattern of the task.
+        """
+        pattern = self.patterns.get(task_name)
+        match = pattern.search(answer) if pattern is not None else None
+        return answer[: match.end()] if match is not None else answer
+
+    @contextlib.contextmanager
+    def _stopping_at(self, pattern: re.Pattern):
+        # `HFLM._model_generate` builds the criteria of the stop sequences and passes them to
+        # `model.generate`, which is where the pattern is added to them.
+        model = self.lm.model
+        generate = model.generate
+
+        @functools.wraps(generate)
+        def generate_with_pattern(*args, input_ids, stopping_criteria, **kwargs):
+            stop = [getattr(criteria, "sequence", "") for criteria in stopping_criteria]
+            stopping_criteria.append(
+                pattern_stopping_criteria(self.lm.tokenizer, pattern, stop, input_ids.shape[1])
+            )
+            return generate(
+                *args, input_ids=input_ids, stopping_criteria=stopping_criteria, **kwargs
+            )
+
+        model.generate = generate_with_pattern
+        try:
+            yield
+        finally:
+            del model.generate
+
+    def _budget(self, generation_kwargs: dict) -> int:
+        return generation_kwargs.get(
+            "max_new_tokens",
+            generation_kwargs.get("max_gen_toks", getattr(self.lm, "max_gen_toks", 0)),
+        )
+
+    def _answer_stats(self, answer: str, generation_kwargs: dict, pattern: re.Pattern) -> dict:
+        # Answers are cut at the end of the match, so a cut answer still matches.
+        tokens = len(self.lm.tok_encode(answer)) if hasattr(self.lm, "tok_encode") else None
+        return {
+            "matched": pattern.search(answer) is not None,
+            "tokens": tokens,
+            "budget": self._budget(generation_kwargs),
+        }
+
+    def _generate(self, requests, pattern: re.Pattern) -> List[str]:
+        if self.early_stop:
+            with self._stopping_at(pattern):
+                answers = self.lm.generate_until(requests)
+        else:
+            answers = self.lm.generate_until(requests)
+
+        results = []
+        for request, answer in zip(requests, answers):
+            answer = self.cut(request.task_name, answer)
+            results.append(answer)
+
+            answer_stats = self._answer_stats(answer, request.args[1], pattern)
+            stats = self.stats.setdefault(request.task_name, [0, 0, 0, 0])
+            stats[0] += 1
+            stats[1] += answer_stats["matched"]
+            if answer_stats["tokens"] is not None:
+                stats[2] += answer_stats["tokens"]
+                stats[3] += answer_stats["budget"]
+        return results
+
+    def generate_until(self, requests) -> List[str]:
+        groups: Dict[Optional[re.Pattern], List[int]] = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(self.patterns.get(request.task_name), []).append(i)
+        if list(groups) == [None]:
+            return self.lm.generate_until(requests)
+
+        results = [None] * len(requests)
+        for pattern, indices in groups.items():
+            group = [requests[i] for i in indices]
+            if pattern is None:
+                answers = self.lm.generate_until(group)
+            else:
+                answers = self._generate(group, pattern)
+            for i, answer in zip(indices, answers):
+                results[i] = answer
+
+        if not self.early_stop:
+            logger.info(
+                f"{type(self.lm).__name__} cannot stop at a pattern, the answers are generated "
+                "in full and then cut."
+            )
+            return results
+
+        logger.info("Generations stopped at the stop pattern of their task:")
+        for task_name, (n_answers, n_matched, n_tokens, budget) in sorted(self.stats.items()):
+            logger.info(
+                f"  {task_name}: {n_matched}/{n_answers} answers stopped at the stop pattern, "
+                f"{n_tokens}/{budget} tokens of the generation budget used "
+                f"({budget - n_tokens} unused budget)"
+            )
+        return results
+
+    def update_results(self, results: dict) -> None:
+        """
+        Add to the logged samples of the tasks with a stop pattern, under `stop_pattern`,
+        whether every answer matched it, its tokens and its generation budget.
+
+        The samples are annotated from their answers, so that the ones read from a cache, or
+        generated on other ranks, are accounted for as well.
+        """
+        for task_name, samples in (results.get("samples") or {}).items():
+            pattern = self.patterns.get(task_name)
+            if pattern is None:
+                continue
+            for sample in samples:
+                sample["stop_pattern"] = [
+                    [self._answer_stats(answer, args[1], pattern) for answer in answers]
+                    for args, answers in zip(sample["arguments"], sample["resps"])
+                ]
+
+
+def file_stats(path: str) -> list:
+    """
+    Return the relative path, size and modification time of a file or of every file under a
+    directory.
+    """
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [[os.path.basename(path), stat.st_size, stat.st_mtime_ns]]
+
+    stats = []
+    for root, _, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            stat = os.stat(file_path)
+            stats.append([os.path.relpath(file_path, path), stat.st_size, stat.st_mtime_ns])
+    return sorted(stats)
+
+
+def model_fingerprint(lm, model: str, model_args: Optional[str]) -> str:
+    """
+    Hash what determines the answers of a model: its `lm_eval` name and arguments, the revision
+    of its weights and of its adapters (`peft`, `delta`) and its tokenizer.
+
+    The weights are identified by the commit of the Hub repository they come from or, for
+    local checkpoints and adapters, by the path, size and modification time of all their files.
+    """
+    from lm_eval.utils import simple_parse_args_string
+
+    fingerprint = {"model": model, "model_args": model_args or ""}
+
+    config = getattr(getattr(lm, "model", None), "config", None)
+    name_or_path = getattr(config, "_name_or_path", None)
+    if name_or_path is not None and os.path.isdir(name_or_path):
+        fingerprint["weights"] = file_stats(name_or_path)
+    elif config is not None:
+        fingerprint["weights"] = [name_or_path, getattr(config, "_commit_hash", None)]
+
+    args = simple_parse_args_string(model_args or "")
+    for name in ("peft", "delta"):
+        path = args.get(name)
+        if isinstance(path, str) and os.path.exists(path):
+            fingerprint[name] = file_stats(path)
+
+    tokenizer = getattr(lm, "tokenizer", None)
+    if hasattr(tokenizer, "backend_tokenizer"):
+        fingerprint["tokenizer"] = hashlib.sha256(
+            tokenizer.backend_tokenizer.to_str().encode()
+        ).hexdigest()
+    elif hasattr(tokenizer, "get_vocab"):
+        fingerprint["tokenizer"] = hashlib.sha256(
+            json.dumps(sorted(tokenizer.get_vocab().items())).encode()
+        ).hexdigest()
+
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+
+def is_network_filesystem(path: str) -> bool:
+    """
+    Tell whether a path is on a network file system, from the mount table (Linux only).
+    """
+    path = os.path.realpath(path)
+    mount_point, filesystem = "", None
+    try:
+        with open("/proc/mounts", "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount = fields[1].replace("\\040", " ")
+                inside = path == mount or path.startswith(mount.rstrip("/") + "/")
+                if inside and len(mount) > len(mount_point):
+                    mount_point, filesystem = mount, fields[2]
+    except OSError:
+        return False
+    return filesystem in NETWORK_FILESYSTEMS
+
+
+def is_greedy(generation_kwargs: dict) -> bool:
+    return not generation_kwargs.get("do_sample", False) and not generation_kwargs.get(
+        "temperature", 0.0
+    )
+
+
+class ResultsCacheLM(LMWrapper):
+    """
+    Persistent cache of the answers of a model, shared by all the runs of the same model.
+
+    The answers are stored in a SQLite database, keyed by the fingerprint of the model, the
+    request type and the request arguments. Only the deterministic requests are cached: all
+    the loglikelihood requests and the greedy generations. When the database grows beyond
+    `max_size` bytes, the least recently used answers are removed.
+
+    The database uses a write-ahead log, so that the ranks of a run read it while another one
+    writes. The log relies on shared memory, which is not safe on network file systems (e.g.
+    a home directory on NFS): there the database falls back to the default rollback journal.
+    """
+
+    def __init__(
+        self,
+        lm,
+        model: str,
+        model_args: Optional[str] = None,
+        path: str = RESULTS_CACHE_PATH,
+        max_size: int = RESULTS_CACHE_MAX_SIZE,
+    ) -> None:
+        super().__init__(lm)
+        self.fingerprint = model_fingerprint(lm, model, model_args)
+        self.path = path
+        self.max_size = max_size
+        # request type -> [hits, misses]
+        self.stats: Dict[str, List[int]] = {}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Every rank of a multi-GPU run opens the same database.
+        self.connection = sqlite3.connect(path, timeout=600)
+        if is_network_filesystem(path):
+            self.connection.execute("PRAGMA journal_mode=DELETE")
+        else:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS last_used ON results (last_used)")
+        self.connection.commit()
+        # Size of the database as of the last read, plus the answers stored by this rank since.
+        self.size = self._read_size()
+        self.stores = 0
+
+    def _key(self, request_type: str, request) -> str:
+        args = tuple(request.args)
+        # The wrappers below the cache that change the answers (`StopPatternLM`) extend the key.
+        request_key = getattr(self.lm, "request_key", None)
+        if request_key is not None and request_key(request) is not None:
+            args += (request_key(request),)
+        data = json.dumps([self.fingerprint, request_type, args], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, object]:
+        found = {}
+        now = time.time()
+        # SQLite limits the number of parameters of a query.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT key, value FROM results WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update((key, pickle.loads(value)) for key, value in rows)
+            self.connection.execute(
+                f"UPDATE results SET last_used = ? WHERE key IN ({placeholders})", [now, *chunk]
+            )
+        self.connection.commit()
+        return found
+
+    def _store(self, items: List[Tuple[str, object]]) -> None:
+        now = time.time()
+        rows = []
+        for key, answer in items:
+            value = pickle.dumps(answer)
+            rows.append((key, value, len(key) + len(value), now))
+        self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+        self.connection.commit()
+
+        self.size += sum(row[2] for row in rows)
+        self.stores += 1
+        if self.size > self.max_size or self.stores >= RESULTS_CACHE_SYNC_STORES:
+            self.size = self._read_size()
+            self.stores = 0
+            self._evict()
+
+    def _read_size(self) -> int:
+        (size,) = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        return size
+
+    def _evict(self) -> None:
+        if self.size <= self.max_size:
+            return
+
+        # Remove the least recently used answers until the cache is back to 90% of its limit.
+        excess = self.size - int(self.max_size * 0.9)
+        keys = []
+        for key, entry_size in self.connection.execute(
+            "SELECT key, size FROM results ORDER BY last_used"
+        ):
+            keys.append((key,))
+            self.size -= entry_size
+            excess -= entry_size
+            if excess <= 0:
+                break
+        self.connection.executemany("DELETE FROM results WHERE key = ?", keys)
+        self.connection.commit()
+        logger.info(f"Evicted {len(keys)} answers from the results cache {self.path}.")
+
+    def _cached(self, request_type: str, requests) -> list:
+        keys = [self._key(request_type, request) for request in requests]
+        cacheable = [
+            request_type != "generate_until" or is_greedy(request.args[1]) for request in requests
+        ]
+        found = self._lookup([key for key, use in zip(keys, cacheable) if use])
+
+        results = [found.get(key) if use else None for key, use in zip(keys, cacheable)]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        stats = self.stats.setdefault(request_type, [0, 0])
+        stats[0] += len(requests) - len(missing)
+        stats[1] += len(missing)
+        logger.info(
+            f"Results cache: {len(requests) - len(missing)} hits, {len(missing)} misses "
+            f"for {request_type} requests ({self.path})."
+        )
+
+        if missing:
+            answers = getattr(self.lm, request_type)([requests[i] for i in missing])
+            for i, answer in zip(missing, answers):
+                results[i] = answer
+            self._store([(keys[i], results[i]) for i in missing if cacheable[i]])
+
+        return results
+
+    def loglikelihood(self, requests) -> List[Tuple[float, bool]]:
+        return self._cached("loglikelihood", requests)
+
+    def loglikelihood_rolling(self, requests) -> List[float]:
+        return self._cached("loglikelihood_rolling", requests)
+
+    def generate_until(self, requests) -> List[str]:
+        return self._cached("generate_until", requests)
+
+
+def install(wrappers: List[Callable]) -> None:
+    """
+    Wrap the model used by `lm_eval.evaluator.evaluate` with the given wrappers, applied in
+    order (the last one is the outermost).
+
+    With `--use_cache`, the wrappers go below `CachingLM`, so that they only see the requests
+    that are not in its cache. The wrappers with an `update_results` method get the results
+    of the evaluation (on the first rank) to add their own information.
+    """
+    import lm_eval.evaluator
+    from lm_eval.api.model import CachingLM
+
+    evaluate = lm_eval.evaluator.evaluate
+
+    @functools.wraps(evaluate)
+    def wrapped_evaluate(lm, *args, **kwargs):
+        model = lm.lm if isinstance(lm, CachingLM) else lm
+        wrapped_models = []
+        for wrapper in wrappers:
+            model = wrapper(model)
+            wrapped_models.append(model)
+
+        if isinstance(lm, CachingLM):
+            lm.lm = model
+        else:
+            lm = model
+
+        results = evaluate(lm, *args, **kwargs)
+        if results is not None:
+            for wrapped_model in wrapped_models:
+                if hasattr(type(wrapped_model), "update_results"):
+                    wrapped_model.update_results(results)
+        return results
+
+    lm_eval.evaluator.evaluate = wrapped_evaluate
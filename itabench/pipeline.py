@@ -0,0 +1,243 @@
+"""
+Score the answers of the generative tasks while the model is still generating.
+
+`lm_eval` filters and scores the answers (`process_results`) only once all the generations of
+the run are done, which leaves a long CPU-bound tail after the model for IFEval-IT (language
+identification, NLTK) and MATH-IT (`math_verify`, sympy). With `itabench run
+--pipeline_scoring`, every answer is filtered and scored by a pool of worker processes as soon
+as the model returns it, with the filters and metrics of the task config (see
+`itabench.rescore.TaskScorer`), so that scoring overlaps with generation. The workers are the
+ones of `itabench.scoring.shared_pool`, which the scorers of the tasks (e.g. MATH-IT) also use,
+and which run these scorers inline instead of starting pools of their own.
+
+When `lm_eval` then filters and scores the task, it gets the filtered responses and the scores
+computed in the background for the same documents and answers. A task whose answers were not
+all scored in the background (e.g. some of them came from the `--use_cache` of `lm_eval`) is
+filtered by `lm_eval` as usual, and a response without a background score is scored as usual,
+so the results are the same as without the pipeline.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Set, Tuple
+
+from itabench.manifest import load_manifest, manifest_index
+from itabench.models import LMWrapper, StopPatternLM
+from itabench.scoring import shared_pool
+from itabench.tasks import TASKS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Tasks of the current evaluation by name, to compute the targets of the documents.
+_TASKS: Dict[str, object] = {}
+# Answer and background scores of every (task, document), as
+# future of {filter name: (filtered response, scores)}.
+_PENDING: Dict[Tuple[str, str], Tuple[str, Future]] = {}
+# Answers scored in the background, and filtered responses whose scores `lm_eval` used, by task.
+_STATS: Dict[str, List[int]] = {}
+# Tasks whose background scoring failed, to warn once.
+_FAILED: Set[str] = set()
+
+# Task scorers by name, in the workers.
+_SCORERS: Dict[str, object] = {}
+
+
+def doc_key(doc: dict) -> str:
+    """
+    Hash a document, to match the answers scored in the background with the documents that
+    `lm_eval` scores.
+    """
+    text = json.dumps(doc, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def score_answer(task_name: str, yaml_path: str, doc: dict, target, answer: str) -> dict:
+    """
+    Filter and score one answer of a task, as {filter name: (filtered response, scores)}.
+    """
+    from itabench.rescore import TaskScorer
+
+    scorer = _SCORERS.get(task_name)
+    if scorer is None:
+        scorer = _SCORERS[task_name] = TaskScorer(task_name, yaml_path)
+
+    filtered = scorer.apply_filters([{"doc": doc, "resps": [[answer]]}])[0]
+    return {name: (resp, scorer.score(doc, target, resp)) for name, resp in filtered.items()}
+
+
+def _warm_up() -> None:
+    # Import the harness in the workers while the model is busy.
+    import itabench.rescore  # noqa: F401
+    import lm_eval.filters  # noqa: F401
+
+
+def _scores(task_name: str, doc: dict, answer: Optional[str] = None) -> Optional[dict]:
+    entry = _PENDING.get((task_name, doc_key(doc)))
+    if entry is None or (answer is not None and entry[0] != answer):
+        return None
+    scores = entry[1].result()
+    if scores is None and task_name not in _FAILED:
+        _FAILED.add(task_name)
+        logger.warning(f"Could not score some answers of {task_name} in the background")
+    return scores
+
+
+class PipelinedScoringLM(LMWrapper):
+    """
+    Send every answer of the model to the background scorers as soon as it is generated.
+
+    The answers are read from the `cache_hook` of the model, which gets each of them when it is
+    ready (`HFLM`, `itabench-completions`), and cut by the `StopPatternLM` below this wrapper as
+    it will cut them. The answers that are returned without going through the model (e.g. from
+    the results cache) are sent when `generate_until` returns.
+    """
+
+    def __init__(self, lm, num_workers: int = os.cpu_count() or 1) -> None:
+        super().__init__(lm)
+        self.num_workers = num_workers
+        index = manifest_index(load_manifest())
+        self.yaml_paths = {
+            name: os.path.join(TASKS_DIR, entry["yaml_path"])
+            for name, entry in index.items()
+            if entry.get("type") == "task"
+        }
+
+        self.base = lm
+        self.stop_patterns = None
+        while isinstance(self.base, LMWrapper):
+            if isinstance(self.base, StopPatternLM):
+                self.stop_patterns = self.base
+            self.base = self.base.lm
+        pool = shared_pool(num_workers)
+        for _ in range(num_workers):
+            pool.submit(_warm_up, ())
+
+    def _submit(self, request, answer: str) -> None:
+        task = _TASKS.get(request.task_name)
+        yaml_path = self.yaml_paths.get(request.task_name)
+        # `TaskScorer` scores like `lm_eval` the targets that are neither choices nor lists.
+        if (
+            task is None
+            or yaml_path is None
+            or request.repeats != 1
+            or task.config.doc_to_choice is not None
+            or task.multiple_target
+        ):
+            return
+
+        key = (request.task_name, doc_key(request.doc))
+        if key in _PENDING and _PENDING[key][0] == answer:
+            return
+        future = shared_pool(self.num_workers).submit(
+            score_answer,
+            (request.task_name, yaml_path, request.doc, task.doc_to_target(request.doc), answer),
+        )
+        _PENDING[key] = (answer, future)
+        _STATS.setdefault(request.task_name, [0, 0])[0] += 1
+
+    def generate_until(self, requests) -> List[str]:
+        requests_by_args = {}
+        for request in requests:
+            key = json.dumps(request.args, sort_keys=True, default=str)
+            requests_by_args.setdefault(key, []).append(request)
+
+        cache_hook = self.base.cache_hook
+        pipeline = self
+
+        class StreamingHook:
+            def add_partial(self, attr: str, req, res) -> None:
+                cache_hook.add_partial(attr, req, res)
+                if attr != "generate_until":
+                    return
+                key = json.dumps(req, sort_keys=True, default=str)
+                for request in requests_by_args.get(key, []):
+                    answer = res
+                    if pipeline.stop_patterns is not None:
+                        answer = pipeline.stop_patterns.cut(request.task_name, answer)
+                    pipeline._submit(request, answer)
+
+        self.base.cache_hook = StreamingHook()
+        try:
+            answers = self.lm.generate_until(requests)
+        finally:
+            self.base.cache_hook = cache_hook
+
+        for request, answer in zip(requests, answers):
+            self._submit(request, answer)
+        return answers
+
+
+def install() -> None:
+    """
+    Use the background scores of `PipelinedScoringLM` in `lm_eval.evaluator.evaluate`.
+    """
+    import lm_eval.evaluator
+    from lm_eval.api.task import ConfigurableTask
+    from lm_eval.evaluator_utils import get_task_list
+
+    apply_filters = ConfigurableTask.apply_filters
+
+    @functools.wraps(apply_filters)
+    def wrapped_apply_filters(self):
+        instances = self._instances or []
+        if not instances or not hasattr(self, "_filters"):
+            return apply_filters(self)
+
+        start = time.perf_counter()
+        scored = []
+        for instance in instances:
+            scores = None
+            if instance.request_type == "generate_until" and len(instance.resps) == 1:
+                scores = _scores(self.config.task, instance.doc, instance.resps[0])
+            if scores is None or set(scores) != {f.name for f in self._filters}:
+                return apply_filters(self)
+            scored.append(scores)
+
+        for instance, scores in zip(instances, scored):
+            for name, (resp, _) in scores.items():
+                instance.filtered_resps[name] = resp
+        logger.info(
+            f"  {self.config.task}: waited {time.perf_counter() - start:.1f}s for the background "
+            f"scores of {len(instances)} answers"
+        )
+
+    ConfigurableTask.apply_filters = wrapped_apply_filters
+
+    process_results = ConfigurableTask.process_results
+
+    @functools.wraps(process_results)
+    def wrapped_process_results(self, doc, results):
+        if self.OUTPUT_TYPE == "generate_until" and len(results) == 1:
+            for resp, scores in (_scores(self.config.task, doc) or {}).values():
+                if resp == results[0]:
+                    _STATS[self.config.task][1] += 1
+                    return dict(scores)
+        return process_results(self, doc, results)
+
+    ConfigurableTask.process_results = wrapped_process_results
+
+    evaluate = lm_eval.evaluator.evaluate
+
+    @functools.wraps(evaluate)
+    def wrapped_evaluate(lm, task_dict, *args, **kwargs):
+        _TASKS.update({output.task_name: output.task for output in get_task_list(task_dict)})
+        try:
+            return evaluate(lm, task_dict, *args, **kwargs)
+        finally:
+            if _STATS:
+                logger.info("Answers scored while generating:")
+                for name, (scored, used) in sorted(_STATS.items()):
+                    logger.info(f"  {name}: {scored} answers, used for {used} filtered responses")
+            for _, future in _PENDING.values():
+                future.cancel()
+            _TASKS.clear()
+            _PENDING.clear()
+            _STATS.clear()
+            _FAILED.clear()
+
+    lm_eval.evaluator.evaluate = wrapped_evaluate
@@ -0,0 +1,247 @@
+"""
+Prepare the tasks of a run while the model is loading.
+
+`lm_eval` loads the model, then builds the tasks of the run one after the other (loading their
+datasets and running `process_docs`, e.g. the subject filtering of MMLU or the configs of BBH),
+and the accelerator sits idle until the last one is ready. With `itabench run --prefetch_tasks`,
+a pool of threads starts loading the datasets of the tasks as soon as the model starts loading,
+so that the tasks, which `lm_eval` still builds on the main thread (some `process_docs` and
+scorers rely on `SIGALRM`, which only works there), find their datasets ready or loading.
+
+The datasets loaded ahead of their tasks are held within a budget (`--prefetch_memory`, the
+size of their Arrow tables in bytes, which overestimates the memory-mapped ones), and released
+once all the tasks that use them are built. The tasks themselves are built as without the
+prefetcher.
+"""
+
+import collections
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from itabench.manifest import load_manifest, manifest_index
+from itabench.tasks import resolve_tasks
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 4
+PREFETCH_MEMORY = 8 * 2**30
+
+# States of a prefetched dataset.
+PENDING = "pending"
+LOADING = "loading"
+SKIPPED = "skipped"
+
+
+def dataset_key(arguments: dict) -> str:
+    """
+    Identify the keyword arguments of a `datasets.load_dataset` call.
+    """
+    return json.dumps(arguments, sort_keys=True, default=str)
+
+
+def dataset_nbytes(dataset) -> int:
+    """
+    Return the size of the Arrow tables of a dataset or of a dataset dict.
+    """
+    splits = dataset.values() if isinstance(dataset, dict) else [dataset]
+    return sum(getattr(getattr(split, "data", None), "nbytes", 0) for split in splits)
+
+
+def task_datasets(names: Iterable[str], task_manifest: Optional[dict] = None) -> List[dict]:
+    """
+    Return the `load_dataset` arguments of the ITA-Bench tasks under the given tasks, groups or
+    tags, in order, as `ConfigurableTask.download` passes them.
+    """
+    if task_manifest is None:
+        task_manifest = load_manifest()
+    index = manifest_index(task_manifest)
+
+    arguments = []
+    for task in resolve_tasks([name for name in names if name in index], index):
+        config = task_manifest["files"][index[task]["yaml_path"]]["config"]
+        if not config.get("dataset_path"):
+            continue
+        arguments.append(
+            {
+                "path": config["dataset_path"],
+                "name": config.get("dataset_name"),
+                **(config.get("dataset_kwargs") or {}),
+            }
+        )
+    return arguments
+
+
+class DatasetPrefetcher:
+    """
+    Load datasets in a pool of threads, in order, ahead of the tasks that use them.
+
+    A dataset starts loading only while the datasets held are within `max_bytes`. A dataset
+    asked for before it started loading is left to the caller, and one that is loading is
+    waited for.
+    """
+
+    def __init__(
+        self,
+        load_dataset: Callable,
+        arguments: List[dict],
+        max_workers: int = PREFETCH_WORKERS,
+        max_bytes: int = PREFETCH_MEMORY,
+    ) -> None:
+        self.load_dataset = load_dataset
+        self.max_bytes = max_bytes
+        self.held_bytes = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+        keys = [dataset_key(kwargs) for kwargs in arguments]
+        # Tasks that will still ask for every dataset.
+        self.users = collections.Counter(keys)
+        self.states: Dict[str, str] = {}
+        self.sizes: Dict[str, int] = {}
+        self.futures: Dict[str, Future] = {}
+        self.hits = 0
+
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="itabench-prefetch")
+        for key, kwargs in zip(keys, arguments):
+            if key not in self.futures:
+                self.states[key] = PENDING
+                self.futures[key] = self.executor.submit(self._load, key, kwargs)
+
+    def _load(self, key: str, kwargs: dict):
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.closed
+                or self.states[key] == SKIPPED
+                or self.held_bytes < self.max_bytes
+            )
+            if self.closed or self.states[key] == SKIPPED:
+                return None
+            self.states[key] = LOADING
+
+        dataset = self.load_dataset(**kwargs)
+        with self.condition:
+            self.sizes[key] = dataset_nbytes(dataset)
+            self.held_bytes += self.sizes[key]
+        return dataset
+
+    def _release(self, key: str) -> None:
+        self.futures.pop(key, None)
+        self.held_bytes -= self.sizes.pop(key, 0)
+        self.condition.notify_all()
+
+    def get(self, arguments: dict):
+        """
+        Return the prefetched dataset for these `load_dataset` arguments, or None.
+        """
+        key = dataset_key(arguments)
+        with self.condition:
+            if key not in self.futures:
+                return None
+            self.users[key] -= 1
+            if self.states[key] == PENDING:
+                self.states[key] = SKIPPED
+                self._release(key)
+                return None
+            future = self.futures[key]
+
+        try:
+            dataset = future.result()
+        except Exception:
+            # Loaded again by the caller, which raises the error where `lm_eval` expects it.
+            dataset = None
+
+        with self.condition:
+            if self.users[key] <= 0 or dataset is None:
+                self._release(key)
+            if dataset is not None:
+                self.hits += 1
+        return dataset
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.futures.clear()
+            self.sizes.clear()
+            self.held_bytes = 0
+            self.condition.notify_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def install(max_workers: int = PREFETCH_WORKERS, max_bytes: int = PREFETCH_MEMORY) -> None:
+    """
+    Load the datasets of the tasks of `lm_eval.evaluator.simple_evaluate` in the background
+    while it loads the model.
+    """
+    import datasets
+    import lm_eval.api.registry
+    import lm_eval.evaluator
+
+    simple_evaluate = lm_eval.evaluator.simple_evaluate
+    get_task_dict = lm_eval.evaluator.get_task_dict
+    get_model = lm_eval.api.registry.get_model
+    load_dataset = datasets.load_dataset
+    # Tasks of the current `simple_evaluate` call and the prefetcher of their datasets.
+    state = {}
+
+    @functools.wraps(simple_evaluate)
+    def wrapped_simple_evaluate(*args, **kwargs):
+        arguments = inspect.signature(simple_evaluate).bind(*args, **kwargs).arguments
+        state["tasks"] = arguments.get("tasks")
+        try:
+            return simple_evaluate(*args, **kwargs)
+        finally:
+            prefetcher = state.pop("prefetcher", None)
+            if prefetcher is not None:
+                prefetcher.close()
+            state.clear()
+
+    @functools.wraps(get_model)
+    def wrapped_get_model(model_name: str):
+        # Called by `simple_evaluate` right before loading the model.
+        if state.get("tasks") and "prefetcher" not in state:
+            tasks = state["tasks"]
+            names = [tasks] if isinstance(tasks, str) else tasks
+            state["prefetcher"] = DatasetPrefetcher(
+                load_dataset,
+                task_datasets(name for name in names if isinstance(name, str)),
+                max_workers,
+                max_bytes,
+            )
+        return get_model(model_name)
+
+    @functools.wraps(get_task_dict)
+    def wrapped_get_task_dict(task_name_list, task_manager=None):
+        prefetcher = state.get("prefetcher")
+        if prefetcher is None or task_name_list is not state.get("tasks"):
+            return get_task_dict(task_name_list, task_manager)
+
+        start = time.perf_counter()
+        try:
+            return get_task_dict(task_name_list, task_manager)
+        finally:
+            state.pop("prefetcher")
+            prefetcher.close()
+            logger.info(
+                f"Prepared the tasks in {time.perf_counter() - start:.1f}s after loading the "
+                f"model, {prefetcher.hits} datasets served by the prefetcher"
+            )
+
+    @functools.wraps(load_dataset)
+    def wrapped_load_dataset(*args, **kwargs):
+        prefetcher = state.get("prefetcher")
+        if prefetcher is not None and not args:
+            dataset = prefetcher.get(kwargs)
+            if dataset is not None:
+                return dataset
+        return load_dataset(*args, **kwargs)
+
+    lm_eval.evaluator.simple_evaluate = wrapped_simple_evaluate
+    lm_eval.evaluator.get_task_dict = wrapped_get_task_dict
+    lm_eval.api.registry.get_model = wrapped_get_model
+    datasets.load_dataset = wrapped_load_dataset
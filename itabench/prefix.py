@@ -0,0 +1,81 @@
+"""
+Token-level prefix trie over the requests of a run.
+
+Requests that share a prefix (the few-shot examples and the `description` of a task, the
+passage of a document, the context of its choices) share a path from the root of the trie.
+Visiting the trie depth-first gives an order in which consecutive requests share the longest
+possible prefix, which is what backends with prefix (KV) caching need to reuse their work.
+
+The trie is compressed: every edge holds a run of tokens, so its size grows with the number
+of requests and not with the number of tokens.
+"""
+
+from typing import Dict, Iterator, List, Sequence
+
+
+class PrefixNode:
+    __slots__ = ("tokens", "children", "requests")
+
+    def __init__(self, tokens: tuple = ()) -> None:
+        # Tokens on the edge from the parent to this node.
+        self.tokens = tokens
+        self.children: Dict[int, "PrefixNode"] = {}
+        # Requests whose tokens end at this node.
+        self.requests: List[int] = []
+
+
+class PrefixTrie:
+    def __init__(self) -> None:
+        self.root = PrefixNode()
+        self.n_tokens = 0
+        self.n_shared_tokens = 0
+
+    def insert(self, tokens: Sequence[int], request_id: int) -> int:
+        """
+        Add the tokens of a request and return how many of them are a prefix already in the
+        trie, i.e. could be read from the cache of a backend that kept the previous requests.
+        """
+        tokens = tuple(tokens)
+        node = self.root
+        shared = 0
+        while shared < len(tokens):
+            child = node.children.get(tokens[shared])
+            if child is None:
+                node.children[tokens[shared]] = node = PrefixNode(tokens[shared:])
+                break
+
+            edge = child.tokens
+            limit = min(len(edge), len(tokens) - shared)
+            if edge[:limit] == tokens[shared : shared + limit]:
+                common = limit
+            else:
+                common = 1
+                while edge[common] == tokens[shared + common]:
+                    common += 1
+
+            if common < len(edge):
+                # Split the edge: the common part becomes a new node above `child`.
+                middle = PrefixNode(edge[:common])
+                child.tokens = edge[common:]
+                middle.children[child.tokens[0]] = child
+                node.children[tokens[shared]] = middle
+                child = middle
+
+            node = child
+            shared += common
+
+        node.requests.append(request_id)
+        self.n_tokens += len(tokens)
+        self.n_shared_tokens += shared
+        return shared
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Yield the request ids depth-first, so that consecutive requests share their prefixes.
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield from node.requests
+            # Reversed, so that the children are visited in insertion order.
+            stack.extend(reversed(list(node.children.values())))
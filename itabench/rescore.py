@@ -0,0 +1,349 @@
+"""
+Score again the samples of a run, without running the model.
+
+    python -m itabench rescore output/<model>/results_<date>.json
+
+`lm_eval --log_samples` writes the responses of the model next to the results of the run, in
+`samples_<task>_<date>.jsonl`. This module applies to them the filters, `process_results` and
+metrics of the current task configs (e.g. after fixing a scorer of IFEval-IT or MATH-IT, or
+a regex of GSM8K), aggregates the scores like `lm_eval` does, updates the groups that
+contain the rescored tasks and writes the results to `rescored_results_<date>.json`.
+
+Only `generate_until` tasks are rescored: the results of the other tasks are kept as they are.
+"""
+
+import glob
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from itabench import manifest, scoring, stats
+from itabench.tasks import TASKS_DIR, FunctionReference, function_module_path, load_config, load_module
+
+logger = logging.getLogger(__name__)
+
+# Documents scored by a worker at a time.
+CHUNK_SIZE = 64
+
+# Task scorers by name, inherited by the (forked) workers.
+_SCORERS: Dict[str, "TaskScorer"] = {}
+
+
+def resolve_functions(config, yaml_path: str, modules: Dict[str, object]):
+    """
+    Replace the `!function` references of a config with the functions they point to.
+
+    Every module is imported once, so that the filters and `process_results` of a task share
+    their state as they do in `lm_eval`.
+    """
+    if isinstance(config, FunctionReference):
+        path = function_module_path(yaml_path, config)
+        if path not in modules:
+            modules[path] = load_module(path)
+        return getattr(modules[path], config.rsplit(".", 1)[1])
+    if isinstance(config, dict):
+        return {key: resolve_functions(value, yaml_path, modules) for key, value in config.items()}
+    if isinstance(config, list):
+        return [resolve_functions(value, yaml_path, modules) for value in config]
+    return config
+
+
+class TaskScorer:
+    """
+    The filters, metrics and aggregations of a task, built from its config as `lm_eval` does.
+    """
+
+    def __init__(self, task_name: str, yaml_path: str) -> None:
+        from lm_eval.api.registry import get_aggregation, get_metric, get_metric_aggregation
+        from lm_eval.filters import build_filter_ensemble
+
+        self.task_name = task_name
+        config = resolve_functions(load_config(yaml_path), yaml_path, {})
+        self.output_type = config.get("output_type")
+        self.process_results = config.get("process_results")
+
+        self.filters = []
+        for filter_config in config.get("filter_list") or []:
+            components = [
+                [function["function"], {k: v for k, v in function.items() if k != "function"}]
+                for function in filter_config["filter"]
+            ]
+            self.filters.append(build_filter_ensemble(filter_config["name"], components))
+        if not self.filters:
+            self.filters = [build_filter_ensemble("none", [["take_first", None]])]
+
+        self.metric_fns = {}
+        self.aggregations = {}
+        for metric_config in config.get("metric_list") or []:
+            metric = metric_config["metric"]
+            if self.process_results is None:
+                kwargs = {
+                    key: value
+                    for key, value in metric_config.items()
+                    if key not in ["metric", "aggregation", "higher_is_better", "hf_evaluate"]
+                }
+                self.metric_fns[metric] = (
+                    get_metric(metric, metric_config.get("hf_evaluate") is True),
+                    kwargs,
+                )
+
+            aggregation = metric_config.get("aggregation")
+            if aggregation is None:
+                self.aggregations[metric] = get_metric_aggregation(metric)
+            elif isinstance(aggregation, str):
+                self.aggregations[metric] = get_aggregation(aggregation)
+            else:
+                self.aggregations[metric] = aggregation
+
+    def apply_filters(self, samples: List[dict]) -> List[Dict[str, object]]:
+        """
+        Return, for every sample, its filtered response by filter name.
+        """
+        from lm_eval.api.instance import Instance
+
+        instances = []
+        for sample in samples:
+            instance = Instance(
+                request_type=self.output_type, doc=sample["doc"], arguments=(), idx=0
+            )
+            instance.resps = sample["resps"][0]
+            instances.append(instance)
+
+        for filter_ensemble in self.filters:
+            filter_ensemble.apply(instances)
+        return [instance.filtered_resps for instance in instances]
+
+    def score(self, doc: dict, target, result) -> Dict[str, float]:
+        """
+        Score a filtered response, as `ConfigurableTask.process_results` does for `generate_until`.
+        """
+        if self.process_results is not None:
+            return self.process_results(doc, [result])
+
+        gold = target
+        if type(gold) is not type(result) and not isinstance(result, list):
+            gold = type(result)(gold)
+
+        scores = {}
+        for metric, (metric_fn, kwargs) in self.metric_fns.items():
+            try:
+                score = metric_fn(references=[gold], predictions=[result], **kwargs)
+            except TypeError:
+                score = metric_fn([gold, result])
+            if isinstance(score, dict):
+                scores.update(score)
+            else:
+                scores[metric] = score
+        return scores
+
+
+def _score_chunk(task_name: str, chunk: List[tuple]) -> List[Dict[str, Dict[str, float]]]:
+    scorer = _SCORERS[task_name]
+    return [
+        {
+            filter_name: scorer.score(doc, target, result)
+            for filter_name, result in filtered.items()
+        }
+        for doc, target, filtered in chunk
+    ]
+
+
+def load_samples(samples_path: str) -> List[dict]:
+    """
+    Read the samples of a task, once per document (`lm_eval` logs a sample per filter).
+    """
+    samples = {}
+    with open(samples_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                sample = json.loads(line)
+                samples.setdefault(sample["doc_id"], sample)
+    return [samples[doc_id] for doc_id in sorted(samples)]
+
+
+def score_task(scorer: TaskScorer, samples: List[dict], num_workers: int) -> Dict[tuple, list]:
+    """
+    Score the samples of a task and return the scores of every (metric, filter).
+    """
+    filtered = scorer.apply_filters(samples)
+    items = [
+        (sample["doc"], sample["target"], filtered_resps)
+        for sample, filtered_resps in zip(samples, filtered)
+    ]
+    chunks = [items[i : i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+
+    _SCORERS[scorer.task_name] = scorer
+    if num_workers > 1 and len(chunks) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # Forked after the filters ran, so that the workers see what they stored (e.g. MATH-IT).
+        # The workers score inline what the scorers send to the scoring pool.
+        with ProcessPoolExecutor(
+            min(num_workers, len(chunks)),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=scoring.run_inline,
+        ) as executor:
+            results = executor.map(_score_chunk, [scorer.task_name] * len(chunks), chunks)
+            doc_scores = [scores for chunk_scores in results for scores in chunk_scores]
+    else:
+        doc_scores = [scores for chunk in chunks for scores in _score_chunk(scorer.task_name, chunk)]
+
+    sample_metrics = {}
+    for scores in doc_scores:
+        for filter_name, metrics in scores.items():
+            for metric, value in metrics.items():
+                sample_metrics.setdefault((metric, filter_name), []).append(value)
+    return sample_metrics
+
+
+def aggregate_task(
+    scorer: TaskScorer,
+    sample_metrics: Dict[tuple, list],
+    bootstrap_iters: int,
+    bootstrap_means: bool = False,
+) -> Dict[str, object]:
+    """
+    Aggregate the scores of a task, as `lm_eval`'s `TaskOutput.calculate_aggregate_metric` does.
+
+    With `bootstrap_means`, the stderr of the metrics aggregated by their mean is left to
+    `itabench.stats.add_bootstrap`.
+    """
+    from lm_eval.api.metrics import mean, stderr_for_metric
+
+    results = {}
+    for (metric, filter_name), items in sample_metrics.items():
+        aggregation = scorer.aggregations.get(metric, mean)
+        results[f"{metric},{filter_name}"] = aggregation(items)
+        if bootstrap_means and aggregation is mean:
+            results[f"{metric}_stderr,{filter_name}"] = "N/A"
+            continue
+        stderr_fn = stderr_for_metric(
+            metric=aggregation,
+            bootstrap_iters=min(bootstrap_iters, 100)
+            if metric in ["bleu", "chrf", "ter"]
+            else bootstrap_iters,
+        )
+        results[f"{metric}_stderr,{filter_name}"] = (
+            stderr_fn(items) if (stderr_fn and len(items) > 1) else "N/A"
+        )
+    return results
+
+
+def aggregate_groups(
+    run: dict, index: Dict[str, dict], sizes: Dict[str, int], rescored: List[str]
+) -> None:
+    """
+    Aggregate again the groups of the run that contain a rescored task, as `lm_eval`'s
+    `consolidate_group_results` does: over the leaf tasks, with the `aggregate_metric_list`
+    of the group. The stderrs already bootstrapped by `itabench.stats.add_bootstrap` are kept.
+    """
+    from lm_eval.api.metrics import aggregate_subtask_metrics, pooled_sample_stderr
+
+    group_subtasks = run.get("group_subtasks", {})
+    for group in group_subtasks:
+        leaves = stats.leaf_tasks(group, group_subtasks)
+        if group not in index or not set(leaves) & set(rescored):
+            continue
+
+        config = load_config(os.path.join(TASKS_DIR, index[group]["yaml_path"]))
+        aggregate_metric_list = config.get("aggregate_metric_list") or []
+        if isinstance(aggregate_metric_list, dict):
+            aggregate_metric_list = [aggregate_metric_list]
+
+        for metric_config in aggregate_metric_list:
+            if metric_config.get("aggregation", "mean") != "mean":
+                logger.warning(
+                    f"Only the 'mean' aggregation of groups can be recomputed, keeping "
+                    f"{metric_config['metric']} of {group}."
+                )
+                continue
+
+            filter_list = metric_config.get("filter_list", ["none"])
+            if isinstance(filter_list, str):
+                filter_list = [filter_list]
+            for filter_name in filter_list:
+                key = f"{metric_config['metric']},{filter_name}"
+                stderr_key = f"{metric_config['metric']}_stderr,{filter_name}"
+                tasks = [task for task in leaves if key in run["results"].get(task, {})]
+                if not tasks:
+                    continue
+
+                metrics = [run["results"][task][key] for task in tasks]
+                stderrs = [run["results"][task].get(stderr_key, "N/A") for task in tasks]
+                task_sizes = [sizes[task] for task in tasks]
+                bootstrapped = key in run.get("bootstrap", {}).get(group, {})
+                for section in ("results", "groups"):
+                    if group in run.get(section, {}):
+                        run[section][group][key] = aggregate_subtask_metrics(
+                            metrics, task_sizes, metric_config.get("weight_by_size", False)
+                        )
+                        if bootstrapped:
+                            continue
+                        run[section][group][stderr_key] = (
+                            "N/A" if "N/A" in stderrs else pooled_sample_stderr(stderrs, task_sizes)
+                        )
+
+
+def rescore(
+    results_path: str,
+    output_path: Optional[str] = None,
+    num_workers: int = os.cpu_count() or 1,
+    bootstrap_iters: int = 100000,
+    bootstrap_ci: bool = False,
+) -> str:
+    """
+    Rescore the `generate_until` tasks of the run whose results are in `results_path`, and
+    write the updated results to `output_path`. Return the path of the written file.
+
+    With `bootstrap_ci`, the stderrs of the rescored tasks and of their groups are bootstrapped,
+    and their confidence intervals stored under `bootstrap` (see `itabench.stats`).
+    """
+    output_dir = os.path.dirname(os.path.abspath(results_path))
+    basename = os.path.basename(results_path)
+    if not (basename.startswith("results_") and basename.endswith(".json")):
+        raise ValueError(f"Expected a `results_<date>.json` file written by lm_eval, got {results_path}")
+    date_id = basename[len("results_") : -len(".json")]
+    if output_path is None:
+        output_path = os.path.join(output_dir, f"rescored_results_{date_id}.json")
+
+    with open(results_path, "r", encoding="utf-8") as f:
+        run = json.load(f)
+    # `bootstrap_iters=0` skips the standard errors, as in `lm_eval`.
+    bootstrap_ci = bootstrap_ci and bootstrap_iters > 0
+
+    index = manifest.manifest_index(manifest.load_manifest())
+    sizes = {task: n["effective"] for task, n in run.get("n-samples", {}).items()}
+
+    rescored = []
+    task_scores = {}
+    suffix = f"_{date_id}.jsonl"
+    for samples_path in sorted(glob.glob(os.path.join(output_dir, f"samples_*{suffix}"))):
+        task_name = os.path.basename(samples_path)[len("samples_") : -len(suffix)]
+        if index.get(task_name, {}).get("type") != "task":
+            logger.warning(f"{task_name} is not an ITA-Bench task, keeping its results.")
+            continue
+
+        scorer = TaskScorer(task_name, os.path.join(TASKS_DIR, index[task_name]["yaml_path"]))
+        if scorer.output_type != "generate_until":
+            continue
+
+        samples = load_samples(samples_path)
+        logger.info(f"Rescoring {len(samples)} samples of {task_name}")
+        sample_metrics = score_task(scorer, samples, num_workers)
+        run["results"].setdefault(task_name, {}).update(
+            aggregate_task(scorer, sample_metrics, bootstrap_iters, bootstrap_ci)
+        )
+        sizes[task_name] = len(samples)
+        rescored.append(task_name)
+        if bootstrap_ci:
+            task_scores[task_name] = stats.mean_scores(sample_metrics, scorer.aggregations)
+
+    if bootstrap_ci:
+        stats.add_bootstrap(run, task_scores, bootstrap_iters, index=index)
+    aggregate_groups(run, index, sizes, rescored)
+    run["rescored_tasks"] = rescored
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2, default=str, ensure_ascii=False)
+    return output_path
@@ -0,0 +1,342 @@
+"""
+A pool of scoring processes with hard per-item wall-clock limits, shared by the whole run.
+
+The scorers of the generative tasks (the `math_verify` and sympy comparisons of MATH-IT, the
+background scoring of `itabench run --pipeline_scoring`) submit their items to the pool of
+their process, which is started on first use and kept for the rest of the run. The workers are
+started with `forkserver` (`spawn` where it is not available): the process of the model holds
+CUDA contexts and threads, which must not be forked. An item that exceeds its time limit has
+its worker killed and replaced, and gets a default value, as do the items that raise.
+
+Inside a worker (or a process marked with `run_inline`), the pool runs the items in the process
+itself, under a `SIGALRM` deadline: a job of the pool that scores items does not start a pool of
+its own.
+"""
+
+import atexit
+import collections
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCORING_NUM_WORKERS = int(
+    os.environ.get("ITABENCH_SCORING_WORKERS", min(8, os.cpu_count() or 1))
+)
+
+# Modules imported once by the fork server, so that replacing a killed worker is cheap; the
+# last one also runs the scorers once (see `itabench._scoring_preload`).
+PRELOAD_MODULES = [
+    "itabench.scoring",
+    "datasets",
+    "sympy",
+    "math_verify",
+    "itabench._scoring_preload",
+]
+
+# True in the workers of the pool, where the items are run inline.
+_INLINE = False
+# Modules of the functions run by this worker, by path.
+_MODULES: Dict[str, object] = {}
+
+_POOL: Optional["ScoringPool"] = None
+_POOL_PID: Optional[int] = None
+
+# (module name, path of the module file, qualified name) of a function.
+FunctionReference = Tuple[str, Optional[str], str]
+
+
+def function_reference(function: Callable) -> FunctionReference:
+    """
+    Reference a function by its module, which the workers import by name or, for the modules
+    that `lm_eval` loads from the file of a task (and does not register), by path.
+    """
+    return function.__module__, function.__code__.co_filename, function.__qualname__
+
+
+def _resolve(reference: FunctionReference) -> Callable:
+    module_name, path, qualname = reference
+    module = _MODULES.get(path or module_name)
+    if module is None:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+        if path is None or (
+            spec is not None
+            and spec.origin is not None
+            and os.path.realpath(spec.origin) == os.path.realpath(path)
+        ):
+            module = importlib.import_module(module_name)
+        else:
+            # A script is loaded as multiprocessing does, without running its `__main__` block.
+            if module_name == "__main__":
+                module_name = "__mp_main__"
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        _MODULES[path or module_name] = module
+
+    function = module
+    for name in qualname.split("."):
+        function = getattr(function, name)
+    return function
+
+
+class _Deadline(BaseException):
+    pass
+
+
+def _raise_deadline(signum, frame):
+    raise _Deadline()
+
+
+def _apply_inline(function: Callable, args: tuple, timeout: Optional[float], default):
+    use_alarm = timeout is not None and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_deadline)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return function(*args)
+    except (Exception, _Deadline):
+        return default
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def run_inline() -> None:
+    """
+    Run the items of `ScoringPool.map` in this process, e.g. in the workers of another pool.
+    """
+    global _INLINE
+    _INLINE = True
+
+
+def _worker(connection) -> None:
+    run_inline()
+    while True:
+        try:
+            item = connection.recv()
+        except EOFError:
+            break
+        if item is None:
+            break
+        reference, args = item
+        try:
+            function = _resolve(reference)
+        except Exception:
+            connection.send((False, None))
+            continue
+        # The time limit starts now, not while the module of the function is imported.
+        connection.send(None)
+        try:
+            connection.send((True, function(*args)))
+        except Exception:
+            connection.send((False, None))
+
+
+class _Item:
+    def __init__(self, function, args, timeout, default) -> None:
+        self.future = Future()
+        self.function = function
+        self.reference = function_reference(function)
+        self.args = args
+        self.timeout = timeout
+        self.default = default
+
+
+class ScoringPool:
+    """
+    Run functions in worker processes, with a hard wall-clock limit per item.
+
+    `submit` returns a future; `map` preserves the order of the items. A dispatcher thread
+    sends the items to the workers as they become idle.
+    """
+
+    def __init__(self, num_workers: int = SCORING_NUM_WORKERS) -> None:
+        self.num_workers = max(1, num_workers)
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        if self.context.get_start_method() == "forkserver":
+            self.context.set_forkserver_preload(PRELOAD_MODULES)
+
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+        self._closed = False
+        self._inline_fallback = False
+        # process, connection, item, deadline (from when the worker starts the item)
+        self._workers: List[list] = []
+        self._thread = threading.Thread(
+            target=self._dispatch, name="itabench-scoring", daemon=True
+        )
+        self._thread.start()
+
+    def _start_worker(self) -> list:
+        connection, child_connection = self.context.Pipe()
+        process = self.context.Process(target=_worker, args=(child_connection,), daemon=True)
+        process.start()
+        child_connection.close()
+        return [process, connection, None, None]
+
+    def _stop_worker(self, worker: list, kill: bool = False) -> None:
+        process, connection = worker[0], worker[1]
+        if kill:
+            process.kill()
+        else:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        connection.close()
+
+    def _finish(self, worker: list, result) -> None:
+        item = worker[2]
+        worker[2] = worker[3] = None
+        item.future.set_result(result)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    break
+                while self._queue and (
+                    len(self._workers) < self.num_workers
+                    or any(worker[2] is None for worker in self._workers)
+                ):
+                    item = self._queue.popleft()
+                    if not item.future.set_running_or_notify_cancel():
+                        continue
+                    idle = [worker for worker in self._workers if worker[2] is None]
+                    if idle:
+                        worker = idle[0]
+                    else:
+                        try:
+                            worker = self._start_worker()
+                        except Exception as e:
+                            # E.g. a script without a `__main__` guard: score in this process,
+                            # without time limits.
+                            if not self._inline_fallback:
+                                self._inline_fallback = True
+                                logger.warning(f"Could not start a scoring worker: {e!r}")
+                            result = _apply_inline(item.function, item.args, None, item.default)
+                            item.future.set_result(result)
+                            continue
+                        self._workers.append(worker)
+                    try:
+                        worker[1].send((item.reference, item.args))
+                    except (BrokenPipeError, OSError):
+                        item.future.set_result(item.default)
+                        self._stop_worker(worker, kill=True)
+                        self._workers.remove(worker)
+                        continue
+                    worker[2] = item
+
+            busy = [worker for worker in self._workers if worker[2] is not None]
+            deadlines = [worker[3] for worker in busy if worker[3] is not None]
+            wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = multiprocessing.connection.wait(
+                [worker[1] for worker in busy] + [self._wakeup_reader], wait
+            )
+            if self._wakeup_reader in ready:
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv_bytes()
+
+            for worker in busy:
+                if worker[1] in ready:
+                    try:
+                        message = worker[1].recv()
+                    except (EOFError, OSError):
+                        message = (False, None)
+                    if message is None:
+                        if worker[2].timeout:
+                            worker[3] = time.monotonic() + worker[2].timeout
+                        continue
+                    success, result = message
+                    self._finish(worker, result if success else worker[2].default)
+                    if not worker[0].is_alive():
+                        self._stop_worker(worker, kill=True)
+                        self._workers.remove(worker)
+                elif worker[3] is not None and time.monotonic() >= worker[3]:
+                    self._finish(worker, worker[2].default)
+                    self._stop_worker(worker, kill=True)
+                    self._workers.remove(worker)
+
+        for worker in self._workers:
+            if worker[2] is not None:
+                worker[2].future.set_result(worker[2].default)
+            self._stop_worker(worker)
+        self._workers = []
+
+    def submit(
+        self, function: Callable, args: tuple, timeout: Optional[float] = None, default=None
+    ) -> Future:
+        """
+        Run `function(*args)` in a worker, returning `default` if it raises or runs for more than
+        `timeout` seconds.
+        """
+        if _INLINE:
+            future = Future()
+            future.set_result(_apply_inline(function, args, timeout, default))
+            return future
+
+        item = _Item(function, args, timeout, default)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The scoring pool is closed.")
+            self._queue.append(item)
+        self._wakeup_writer.send_bytes(b"")
+        return item.future
+
+    def map(
+        self, function: Callable, items: List[tuple], timeout: Optional[float] = None, default=None
+    ) -> list:
+        """
+        Apply `function` to a list of argument tuples, preserving the order.
+        """
+        futures = [self.submit(function, args, timeout, default) for args in items]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            pending = list(self._queue)
+            self._queue.clear()
+        for item in pending:
+            item.future.set_result(item.default)
+        self._wakeup_writer.send_bytes(b"")
+        self._thread.join()
+
+
+def shared_pool(num_workers: Optional[int] = None) -> ScoringPool:
+    """
+    Return the scoring pool of this process, starting it on first use.
+
+    Asking for more workers than the pool has grows it.
+    """
+    global _POOL, _POOL_PID
+    if _POOL is None or _POOL_PID != os.getpid():
+        # A forked child does not inherit the dispatcher thread of its parent's pool.
+        _POOL = ScoringPool(num_workers or SCORING_NUM_WORKERS)
+        _POOL_PID = os.getpid()
+        atexit.register(_POOL.close)
+    elif num_workers is not None and num_workers > _POOL.num_workers:
+        _POOL.num_workers = num_workers
+    return _POOL
@@ -0,0 +1,251 @@
+"""
+Bootstrap standard errors and confidence intervals of the tasks and groups of a run.
+
+The per-sample scores of every task are resampled with NumPy, all at once: the mean of a
+resample of binary scores (accuracy, exact match) is drawn directly from a binomial, other
+scores are resampled in chunks of index arrays. The resamples of a group are the weighted
+means of the resamples of its leaf tasks (a stratified bootstrap), with the weighting of the
+`aggregate_metric_list` of the group, so a task is resampled once however many groups it is in.
+
+With `itabench run --bootstrap_ci`, these are the standard errors that the run reports: the
+stderr of `lm_eval` (a closed form for the mean metrics, recomputed with a pooled variance for
+the groups) is skipped for the metrics aggregated by their mean, and their `*_stderr` entries
+are filled from the resamples (`bootstrap_iters` of them) once all the tasks are scored. The
+confidence intervals are stored in the results under `bootstrap`:
+
+    "bootstrap": {"itabench_leaderboard_it": {"acc,none": {"ci": [low, high]}}}
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from itabench import manifest
+from itabench.tasks import TASKS_DIR, load_config
+
+BOOTSTRAP_ITERS = 100000
+CONFIDENCE = 0.95
+SEED = 1234
+
+# Bytes of indices drawn at a time when resampling non-binary scores.
+CHUNK_BYTES = 64 * 2**20
+
+# Per-sample scores of the tasks evaluated in this process, by task and `metric,filter`.
+_SAMPLE_SCORES: Dict[str, Dict[str, np.ndarray]] = {}
+
+
+def _rng(name: str, key: str, seed: int) -> np.random.Generator:
+    # Seeded by the task and metric, so that the resamples do not depend on the order of the run.
+    digest = hashlib.sha256(f"{name}\0{key}".encode("utf-8")).digest()
+    return np.random.default_rng([seed, int.from_bytes(digest[:8], "little")])
+
+
+def resample_means(scores: np.ndarray, iters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Return the means of `iters` resamples (with replacement) of `scores`.
+    """
+    n = len(scores)
+    if np.isin(scores, (0, 1)).all():
+        return rng.binomial(n, scores.mean(), size=iters) / n
+
+    means = np.empty(iters)
+    step = max(1, CHUNK_BYTES // (8 * n))
+    for start in range(0, iters, step):
+        stop = min(iters, start + step)
+        means[start:stop] = scores[rng.integers(0, n, size=(stop - start, n))].mean(axis=1)
+    return means
+
+
+def _interval(replicates: np.ndarray, confidence: float) -> dict:
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(replicates, [alpha, 1 - alpha])
+    return {"stderr": float(replicates.std(ddof=1)), "ci": [float(low), float(high)]}
+
+
+def bootstrap_suite(
+    task_scores: Dict[str, Dict[str, np.ndarray]],
+    groups: Dict[str, List[Tuple[str, List[str], bool]]],
+    iters: int = BOOTSTRAP_ITERS,
+    confidence: float = CONFIDENCE,
+    seed: int = SEED,
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Bootstrap the mean scores of the tasks and of the groups.
+
+    `task_scores` maps every task to the per-sample scores of each of its `metric,filter`.
+    `groups` maps every group to its aggregated metrics, as (`metric,filter`, leaf tasks,
+    weight_by_size). Return the `stderr` and the `confidence` interval (`ci`) of every task
+    and group metric.
+    """
+    replicates = {}
+    intervals = {}
+    for name, scores_by_key in task_scores.items():
+        for key, scores in scores_by_key.items():
+            if len(scores) < 2:
+                continue
+            replicates[name, key] = resample_means(scores, iters, _rng(name, key, seed))
+            intervals.setdefault(name, {})[key] = _interval(replicates[name, key], confidence)
+
+    for group, metrics in groups.items():
+        for key, leaves, weight_by_size in metrics:
+            # Only the groups whose tasks were all scored (e.g. by `itabench rescore`).
+            if not all(leaf in task_scores for leaf in leaves):
+                continue
+            leaves = [leaf for leaf in leaves if (leaf, key) in replicates]
+            if not leaves:
+                continue
+            weights = np.array(
+                [len(task_scores[leaf][key]) if weight_by_size else 1 for leaf in leaves],
+                dtype=float,
+            )
+            group_replicates = np.stack([replicates[leaf, key] for leaf in leaves], axis=1)
+            intervals.setdefault(group, {})[key] = _interval(
+                group_replicates @ (weights / weights.sum()), confidence
+            )
+
+    return intervals
+
+
+def leaf_tasks(name: str, group_subtasks: Dict[str, list]) -> List[str]:
+    """
+    Return the tasks under a group of a run (its `group_subtasks`), through the nested groups.
+    """
+    if not group_subtasks.get(name):
+        return [name]
+    return [leaf for child in group_subtasks[name] for leaf in leaf_tasks(child, group_subtasks)]
+
+
+def group_metrics(
+    group_subtasks: Dict[str, list], index: Optional[Dict[str, dict]] = None
+) -> Dict[str, List[Tuple[str, List[str], bool]]]:
+    """
+    Read the `aggregate_metric_list` of the groups of a run (its `group_subtasks`) from their
+    YAML files, in the form expected by `bootstrap_suite`.
+    """
+    if index is None:
+        index = manifest.manifest_index(manifest.load_manifest())
+
+    groups = {}
+    for group, subtasks in group_subtasks.items():
+        if not subtasks or index.get(group, {}).get("type") != "group":
+            continue
+
+        config = load_config(os.path.join(TASKS_DIR, index[group]["yaml_path"]))
+        aggregate_metric_list = config.get("aggregate_metric_list") or []
+        if isinstance(aggregate_metric_list, dict):
+            aggregate_metric_list = [aggregate_metric_list]
+
+        leaves = leaf_tasks(group, group_subtasks)
+        for metric_config in aggregate_metric_list:
+            if metric_config.get("aggregation", "mean") != "mean":
+                continue
+            filter_list = metric_config.get("filter_list", ["none"])
+            if isinstance(filter_list, str):
+                filter_list = [filter_list]
+            for filter_name in filter_list:
+                groups.setdefault(group, []).append(
+                    (
+                        f"{metric_config['metric']},{filter_name}",
+                        leaves,
+                        bool(metric_config.get("weight_by_size", False)),
+                    )
+                )
+    return groups
+
+
+def mean_scores(
+    sample_metrics: Dict[Tuple[str, str], Sequence], aggregations: Dict[str, object]
+) -> Dict[str, np.ndarray]:
+    """
+    Keep the per-sample scores of the metrics of a task that are aggregated by their mean,
+    as `metric,filter` -> array.
+    """
+    from lm_eval.api.metrics import mean
+
+    scores = {}
+    for (metric, filter_name), items in sample_metrics.items():
+        if aggregations.get(metric, mean) is not mean:
+            continue
+        try:
+            scores[f"{metric},{filter_name}"] = np.asarray(items, dtype=float)
+        except (TypeError, ValueError):
+            continue
+    return scores
+
+
+def add_bootstrap(
+    results: dict,
+    task_scores: Dict[str, Dict[str, np.ndarray]],
+    iters: int = BOOTSTRAP_ITERS,
+    index: Optional[Dict[str, dict]] = None,
+) -> None:
+    """
+    Set the `*_stderr` of the tasks and groups of `results` (the results of
+    `lm_eval.evaluator.evaluate`) to their bootstrap standard errors, and add their confidence
+    intervals under `bootstrap`.
+    """
+    groups = group_metrics(results.get("group_subtasks", {}), index)
+    intervals = bootstrap_suite(task_scores, groups, iters)
+    for name, metrics in intervals.items():
+        for key, interval in metrics.items():
+            stderr = interval.pop("stderr")
+            stderr_key = "_stderr,".join(key.split(",", 1))
+            for section in ("results", "groups"):
+                if name in results.get(section, {}):
+                    results[section][name][stderr_key] = stderr
+    results["bootstrap"] = intervals
+
+
+def install(iters: Optional[int] = None) -> None:
+    """
+    Compute the standard errors of the mean metrics of `lm_eval.evaluator.evaluate` with the
+    bootstrap of this module (`iters` resamples, by default the `bootstrap_iters` of the run),
+    and add the confidence intervals to its results.
+    """
+    import lm_eval.evaluator
+    import lm_eval.evaluator_utils
+    from lm_eval.api.metrics import mean
+    from lm_eval.evaluator_utils import TaskOutput
+
+    stderr_for_metric = lm_eval.evaluator_utils.stderr_for_metric
+
+    @functools.wraps(stderr_for_metric)
+    def wrapped_stderr_for_metric(metric, bootstrap_iters):
+        # Filled by `add_bootstrap` once all the tasks are scored.
+        if metric is mean:
+            return None
+        return stderr_for_metric(metric, bootstrap_iters)
+
+    lm_eval.evaluator_utils.stderr_for_metric = wrapped_stderr_for_metric
+
+    calculate_aggregate_metric = TaskOutput.calculate_aggregate_metric
+
+    @functools.wraps(calculate_aggregate_metric)
+    def wrapped_calculate_aggregate_metric(self, *args, **kwargs):
+        calculate_aggregate_metric(self, *args, **kwargs)
+        _SAMPLE_SCORES[self.task_name] = mean_scores(self.sample_metrics, self.task.aggregation())
+
+    TaskOutput.calculate_aggregate_metric = wrapped_calculate_aggregate_metric
+
+    evaluate = lm_eval.evaluator.evaluate
+
+    @functools.wraps(evaluate)
+    def wrapped_evaluate(*args, **kwargs):
+        arguments = inspect.signature(evaluate).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        # `bootstrap_iters=0` skips the standard errors, as in `lm_eval`.
+        bootstrap_iters = arguments.arguments.get("bootstrap_iters")
+        _SAMPLE_SCORES.clear()
+        try:
+            results = evaluate(*args, **kwargs)
+            if results is not None and bootstrap_iters:
+                add_bootstrap(results, _SAMPLE_SCORES, iters or bootstrap_iters)
+            return results
+        finally:
+            _SAMPLE_SCORES.clear()
+
+    lm_eval.evaluator.evaluate = wrapped_evaluate
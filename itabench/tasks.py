@@ -0,0 +1,163 @@
+"""
+Read the ITA-Bench task tree without going through the `lm_eval` task manager.
+"""
+
+import importlib.util
+import os
+from types import ModuleType
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+TASKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tasks")
+
+
+class FunctionReference(str):
+    """
+    A `!function` reference, stored as the `<module>.<function>` string found in the YAML,
+    with the path of the YAML file it was found in (which may be an included file).
+    """
+
+    yaml_path: Optional[str] = None
+
+
+class TaskLoader(yaml.SafeLoader):
+    pass
+
+
+def _function_constructor(loader: yaml.Loader, node: yaml.Node) -> FunctionReference:
+    reference = FunctionReference(loader.construct_scalar(node))
+    if os.path.isfile(loader.name):
+        reference.yaml_path = loader.name
+    return reference
+
+
+TaskLoader.add_constructor("!function", _function_constructor)
+
+
+def load_config(yaml_path: str, dependencies: Optional[List[str]] = None) -> dict:
+    """
+    Load a task YAML, merging its `include`s the same way `lm_eval` does.
+
+    If `dependencies` is given, the paths of all the included files are appended to it.
+    """
+    with open(yaml_path, "rb") as f:
+        config = yaml.load(f, Loader=TaskLoader) or {}
+
+    if "include" not in config:
+        return config
+
+    include_paths = config.pop("include")
+    if isinstance(include_paths, str):
+        include_paths = [include_paths]
+
+    final_config = {}
+    for include_path in reversed(include_paths):
+        if not os.path.isfile(include_path):
+            include_path = os.path.join(os.path.dirname(yaml_path), include_path)
+        if dependencies is not None:
+            dependencies.append(os.path.normpath(include_path))
+        final_config.update(load_config(include_path, dependencies))
+
+    final_config.update(config)
+    return final_config
+
+
+def iter_function_references(config) -> Iterator[FunctionReference]:
+    """
+    Yield all the `!function` references in a (possibly nested) config.
+    """
+    if isinstance(config, FunctionReference):
+        yield config
+    elif isinstance(config, dict):
+        for value in config.values():
+            yield from iter_function_references(value)
+    elif isinstance(config, list):
+        for value in config:
+            yield from iter_function_references(value)
+
+
+def function_module_path(yaml_path: str, reference: str) -> str:
+    """
+    Return the path of the Python file a `!function` reference points to, as `lm_eval` resolves it:
+    relative to the YAML file the reference is written in.
+    """
+    yaml_path = getattr(reference, "yaml_path", None) or yaml_path
+    module_name = reference.rsplit(".", 1)[0]
+    return os.path.normpath(os.path.join(os.path.dirname(yaml_path), f"{module_name}.py"))
+
+
+def load_module(path: str) -> ModuleType:
+    """
+    Import the Python file of a task (e.g. its `utils.py`) the way `lm_eval` does for `!function`.
+    """
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def iter_configs(tasks_dir: str = TASKS_DIR) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield the path and the resolved config of every task and group YAML in the tree.
+    """
+    for root, _, files in os.walk(tasks_dir):
+        for file in sorted(files):
+            if file.endswith(".yaml"):
+                yaml_path = os.path.join(root, file)
+                yield yaml_path, load_config(yaml_path)
+
+
+def build_index(configs: Iterable[Tuple[str, dict]]) -> Dict[str, dict]:
+    """
+    Index tasks, groups and tags by name.
+
+    Every entry has a `type` (`task`, `group` or `tag`), the `yaml_path` that defines it
+    (None for tags) and the names of its `children` (empty for tasks).
+    """
+    index = {}
+    for yaml_path, config in configs:
+        if "group" in config:
+            children = config.get("task", [])
+            if isinstance(children, str):
+                children = [children]
+            index[config["group"]] = {
+                "type": "group",
+                "yaml_path": yaml_path,
+                "children": [c["task"] if isinstance(c, dict) else c for c in children],
+            }
+
+        elif isinstance(config.get("task"), str):
+            index[config["task"]] = {"type": "task", "yaml_path": yaml_path, "children": []}
+
+            tags = config.get("tag", [])
+            if isinstance(tags, str):
+                tags = [tags]
+            for tag in tags:
+                tag_entry = index.setdefault(
+                    tag, {"type": "tag", "yaml_path": None, "children": []}
+                )
+                tag_entry["children"].append(config["task"])
+
+    return index
+
+
+def resolve_tasks(names: Iterable[str], index: Dict[str, dict]) -> List[str]:
+    """
+    Expand groups and tags into the list of leaf tasks they contain, in order and without duplicates.
+    """
+    tasks = []
+    for name in names:
+        if name not in index:
+            raise ValueError(f"Unknown task, group or tag: {name}")
+
+        entry = index[name]
+        if entry["type"] == "task":
+            children = [name]
+        else:
+            children = resolve_tasks(entry["children"], index)
+
+        tasks.extend(task for task in children if task not in tasks)
+
+    return tasks
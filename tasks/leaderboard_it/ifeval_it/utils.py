@@ -17,3089 +17,49 @@
 """Utility library of instructions"""
 
 import functools
+import hashlib
+import os
 import random
 import re
+from typing import Dict
 
 import immutabledict
+import langdetect
 import nltk
+from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory
+
+RESOURCES_DIR = os.environ.get("ITABENCH_IFEVAL_RESOURCES", os.path.dirname(__file__))
 
 
+@functools.lru_cache(maxsize=None)
 def download_nltk_resources():
-    """Download 'punkt' if not already installed"""
-    try:
-        nltk.data.find("tokenizers/punkt")
-    except LookupError:
-        nltk.download("punkt")
-
-
-download_nltk_resources()
-
-WORD_LIST_EN = [
-    "western",
-    "sentence",
-    "signal",
-    "dump",
-    "spot",
-    "opposite",
-    "bottom",
-    "potato",
-    "administration",
-    "working",
-    "welcome",
-    "morning",
-    "good",
-    "agency",
-    "primary",
-    "wish",
-    "responsibility",
-    "press",
-    "problem",
-    "president",
-    "steal",
-    "brush",
-    "read",
-    "type",
-    "beat",
-    "trainer",
-    "growth",
-    "lock",
-    "bone",
-    "case",
-    "equal",
-    "comfortable",
-    "region",
-    "replacement",
-    "performance",
-    "mate",
-    "walk",
-    "medicine",
-    "film",
-    "thing",
-    "rock",
-    "tap",
-    "total",
-    "competition",
-    "ease",
-    "south",
-    "establishment",
-    "gather",
-    "parking",
-    "world",
-    "plenty",
-    "breath",
-    "claim",
-    "alcohol",
-    "trade",
-    "dear",
-    "highlight",
-    "street",
-    "matter",
-    "decision",
-    "mess",
-    "agreement",
-    "studio",
-    "coach",
-    "assist",
-    "brain",
-    "wing",
-    "style",
-    "private",
-    "top",
-    "brown",
-    "leg",
-    "buy",
-    "procedure",
-    "method",
-    "speed",
-    "high",
-    "company",
-    "valuable",
-    "pie",
-    "analyst",
-    "session",
-    "pattern",
-    "district",
-    "pleasure",
-    "dinner",
-    "swimming",
-    "joke",
-    "order",
-    "plate",
-    "department",
-    "motor",
-    "cell",
-    "spend",
-    "cabinet",
-    "difference",
-    "power",
-    "examination",
-    "engine",
-    "horse",
-    "dimension",
-    "pay",
-    "toe",
-    "curve",
-    "literature",
-    "bother",
-    "fire",
-    "possibility",
-    "debate",
-    "activity",
-    "passage",
-    "hello",
-    "cycle",
-    "background",
-    "quiet",
-    "author",
-    "effect",
-    "actor",
-    "page",
-    "bicycle",
-    "error",
-    "throat",
-    "attack",
-    "character",
-    "phone",
-    "tea",
-    "increase",
-    "outcome",
-    "file",
-    "specific",
-    "inspector",
-    "internal",
-    "potential",
-    "staff",
-    "building",
-    "employer",
-    "shoe",
-    "hand",
-    "direction",
-    "garden",
-    "purchase",
-    "interview",
-    "study",
-    "recognition",
-    "member",
-    "spiritual",
-    "oven",
-    "sandwich",
-    "weird",
-    "passenger",
-    "particular",
-    "response",
-    "reaction",
-    "size",
-    "variation",
-    "a",
-    "cancel",
-    "candy",
-    "exit",
-    "guest",
-    "condition",
-    "fly",
-    "price",
-    "weakness",
-    "convert",
-    "hotel",
-    "great",
-    "mouth",
-    "mind",
-    "song",
-    "sugar",
-    "suspect",
-    "telephone",
-    "ear",
-    "roof",
-    "paint",
-    "refrigerator",
-    "organization",
-    "jury",
-    "reward",
-    "engineering",
-    "day",
-    "possession",
-    "crew",
-    "bar",
-    "road",
-    "description",
-    "celebration",
-    "score",
-    "mark",
-    "letter",
-    "shower",
-    "suggestion",
-    "sir",
-    "luck",
-    "national",
-    "progress",
-    "hall",
-    "stroke",
-    "theory",
-    "offer",
-    "story",
-    "tax",
-    "definition",
-    "history",
-    "ride",
-    "medium",
-    "opening",
-    "glass",
-    "elevator",
-    "stomach",
-    "question",
-    "ability",
-    "leading",
-    "village",
-    "computer",
-    "city",
-    "grand",
-    "confidence",
-    "candle",
-    "priest",
-    "recommendation",
-    "point",
-    "necessary",
-    "body",
-    "desk",
-    "secret",
-    "horror",
-    "noise",
-    "culture",
-    "warning",
-    "water",
-    "round",
-    "diet",
-    "flower",
-    "bus",
-    "tough",
-    "permission",
-    "week",
-    "prompt",
-    "connection",
-    "abuse",
-    "height",
-    "save",
-    "corner",
-    "border",
-    "stress",
-    "drive",
-    "stop",
-    "rip",
-    "meal",
-    "listen",
-    "confusion",
-    "girlfriend",
-    "living",
-    "relation",
-    "significance",
-    "plan",
-    "creative",
-    "atmosphere",
-    "blame",
-    "invite",
-    "housing",
-    "paper",
-    "drink",
-    "roll",
-    "silver",
-    "drunk",
-    "age",
-    "damage",
-    "smoke",
-    "environment",
-    "pack",
-    "savings",
-    "influence",
-    "tourist",
-
-    "rain",
-    "post",
-    "sign",
-    "grandmother",
-    "run",
-    "profit",
-    "push",
-    "clerk",
-    "final",
-    "wine",
-    "swim",
-    "pause",
-    "stuff",
-    "singer",
-    "funeral",
-    "average",
-    "source",
-    "scene",
-    "tradition",
-    "personal",
-    "snow",
-    "nobody",
-    "distance",
-    "sort",
-    "sensitive",
-    "animal",
-    "major",
-    "negotiation",
-    "click",
-    "mood",
-    "period",
-    "arrival",
-    "expression",
-    "holiday",
-    "repeat",
-    "dust",
-    "closet",
-    "gold",
-    "bad",
-    "sail",
-    "combination",
-    "clothes",
-    "emphasis",
-    "duty",
-    "black",
-    "step",
-    "school",
-    "jump",
-    "document",
-    "professional",
-    "lip",
-    "chemical",
-    "front",
-    "wake",
-    "while",
-    "inside",
-    "watch",
-    "row",
-    "subject",
-    "penalty",
-    "balance",
-    "possible",
-    "adult",
-    "aside",
-    "sample",
-    "appeal",
-    "wedding",
-    "depth",
-    "king",
-    "award",
-    "wife",
-    "blow",
-    "site",
-    "camp",
-    "music",
-    "safe",
-    "gift",
-    "fault",
-    "guess",
-    "act",
-    "shame",
-    "drama",
-    "capital",
-    "exam",
-    "stupid",
-    "record",
-    "sound",
-    "swing",
-    "novel",
-    "minimum",
-    "ratio",
-    "machine",
-    "shape",
-    "lead",
-    "operation",
-    "salary",
-    "cloud",
-    "affair",
-    "hit",
-    "chapter",
-    "stage",
-    "quantity",
-    "access",
-    "army",
-    "chain",
-    "traffic",
-    "kick",
-    "analysis",
-    "airport",
-    "time",
-    "vacation",
-    "philosophy",
-    "ball",
-    "chest",
-    "thanks",
-    "place",
-    "mountain",
-    "advertising",
-    "red",
-    "past",
-    "rent",
-    "return",
-    "tour",
-    "house",
-    "construction",
-    "net",
-    "native",
-    "war",
-    "figure",
-    "fee",
-    "spray",
-    "user",
-    "dirt",
-    "shot",
-    "task",
-    "stick",
-    "friend",
-    "software",
-    "promotion",
-    "interaction",
-    "surround",
-    "block",
-    "purpose",
-    "practice",
-    "conflict",
-    "routine",
-    "requirement",
-    "bonus",
-    "hole",
-    "state",
-    "junior",
-    "sweet",
-    "catch",
-    "tear",
-    "fold",
-    "wall",
-    "editor",
-    "life",
-    "position",
-    "pound",
-    "respect",
-    "bathroom",
-    "coat",
-    "script",
-    "job",
-    "teach",
-    "birth",
-    "view",
-    "resolve",
-    "theme",
-    "employee",
-    "doubt",
-    "market",
-    "education",
-    "serve",
-    "recover",
-    "tone",
-    "harm",
-    "miss",
-    "union",
-    "understanding",
-    "cow",
-    "river",
-    "association",
-    "concept",
-    "training",
-    "recipe",
-    "relationship",
-    "reserve",
-    "depression",
-    "proof",
-    "hair",
-    "revenue",
-    "independent",
-    "lift",
-    "assignment",
-    "temporary",
-    "amount",
-    "loss",
-    "edge",
-    "track",
-    "check",
-    "rope",
-    "estimate",
-    "pollution",
-    "stable",
-    "message",
-    "delivery",
-    "perspective",
-    "mirror",
-    "assistant",
-    "representative",
-    "witness",
-    "nature",
-    "judge",
-    "fruit",
-    "tip",
-    "devil",
-    "town",
-    "emergency",
-    "upper",
-    "drop",
-    "stay",
-    "human",
-    "neck",
-    "speaker",
-    "network",
-    "sing",
-    "resist",
-    "league",
-    "trip",
-    "signature",
-    "lawyer",
-    "importance",
-    "gas",
-    "choice",
-    "engineer",
-    "success",
-    "part",
-    "external",
-    "worker",
-    "simple",
-    "quarter",
-    "student",
-    "heart",
-    "pass",
-    "spite",
-    "shift",
-    "rough",
-    "lady",
-    "grass",
-    "community",
-    "garage",
-    "youth",
-    "standard",
-    "skirt",
-    "promise",
-    "blind",
-    "television",
-    "disease",
-    "commission",
-    "positive",
-    "energy",
-    "calm",
-    "presence",
-    "tune",
-    "basis",
-    "preference",
-    "head",
-    "common",
-    "cut",
-    "somewhere",
-    "presentation",
-    "current",
-    "thought",
-    "revolution",
-    "effort",
-    "master",
-    "implement",
-    "republic",
-    "floor",
-    "principle",
-    "stranger",
-    "shoulder",
-    "grade",
-    "button",
-    "tennis",
-    "police",
-    "collection",
-    "account",
-    "register",
-    "glove",
-    "divide",
-    "professor",
-    "chair",
-    "priority",
-    "combine",
-    "peace",
-    "extension",
-    "maybe",
-
-    "evening",
-    "frame",
-    "sister",
-    "wave",
-    "code",
-    "application",
-    "mouse",
-    "match",
-    "counter",
-    "bottle",
-    "half",
-    "cheek",
-    "resolution",
-    "back",
-    "knowledge",
-    "make",
-    "discussion",
-    "screw",
-    "length",
-    "accident",
-    "battle",
-    "dress",
-    "knee",
-    "log",
-    "package",
-    "it",
-    "turn",
-    "hearing",
-    "newspaper",
-    "layer",
-    "wealth",
-    "profile",
-    "imagination",
-    "answer",
-    "weekend",
-    "teacher",
-    "appearance",
-    "meet",
-    "bike",
-    "rise",
-    "belt",
-    "crash",
-    "bowl",
-    "equivalent",
-    "support",
-    "image",
-    "poem",
-    "risk",
-    "excitement",
-    "remote",
-    "secretary",
-    "public",
-    "produce",
-    "plane",
-    "display",
-    "money",
-    "sand",
-    "situation",
-    "punch",
-    "customer",
-    "title",
-    "shake",
-    "mortgage",
-    "option",
-    "number",
-    "pop",
-    "window",
-    "extent",
-    "nothing",
-    "experience",
-    "opinion",
-    "departure",
-    "dance",
-    "indication",
-    "boy",
-    "material",
-    "band",
-    "leader",
-    "sun",
-    "beautiful",
-    "muscle",
-    "farmer",
-    "variety",
-    "fat",
-    "handle",
-    "director",
-    "opportunity",
-    "calendar",
-    "outside",
-    "pace",
-    "bath",
-    "fish",
-    "consequence",
-    "put",
-    "owner",
-    "go",
-    "doctor",
-    "information",
-    "share",
-    "hurt",
-    "protection",
-    "career",
-    "finance",
-    "force",
-    "golf",
-    "garbage",
-    "aspect",
-    "kid",
-    "food",
-    "boot",
-    "milk",
-    "respond",
-    "objective",
-    "reality",
-    "raw",
-    "ring",
-    "mall",
-    "one",
-    "impact",
-    "area",
-    "news",
-    "international",
-    "series",
-    "impress",
-    "mother",
-    "shelter",
-    "strike",
-    "loan",
-    "month",
-    "seat",
-    "anything",
-    "entertainment",
-    "familiar",
-    "clue",
-    "year",
-    "glad",
-    "supermarket",
-    "natural",
-    "god",
-    "cost",
-    "conversation",
-    "tie",
-    "ruin",
-    "comfort",
-    "earth",
-    "storm",
-    "percentage",
-    "assistance",
-    "budget",
-    "strength",
-    "beginning",
-    "sleep",
-    "other",
-    "young",
-    "unit",
-    "fill",
-    "store",
-    "desire",
-    "hide",
-    "value",
-    "cup",
-    "maintenance",
-    "nurse",
-    "function",
-    "tower",
-    "role",
-    "class",
-    "camera",
-    "database",
-    "panic",
-    "nation",
-    "basket",
-    "ice",
-    "art",
-    "spirit",
-    "chart",
-    "exchange",
-    "feedback",
-    "statement",
-    "reputation",
-    "search",
-    "hunt",
-    "exercise",
-    "nasty",
-    "notice",
-    "male",
-    "yard",
-    "annual",
-    "collar",
-    "date",
-    "platform",
-    "plant",
-    "fortune",
-    "passion",
-    "friendship",
-    "spread",
-    "cancer",
-    "ticket",
-    "attitude",
-    "island",
-    "active",
-    "object",
-    "service",
-    "buyer",
-    "bite",
-    "card",
-    "face",
-    "steak",
-    "proposal",
-    "patient",
-    "heat",
-    "rule",
-    "resident",
-    "broad",
-    "politics",
-    "west",
-    "knife",
-    "expert",
-    "girl",
-    "design",
-    "salt",
-    "baseball",
-    "grab",
-    "inspection",
-    "cousin",
-    "couple",
-    "magazine",
-    "cook",
-    "dependent",
-    "security",
-    "chicken",
-    "version",
-    "currency",
-    "ladder",
-    "scheme",
-    "kitchen",
-    "employment",
-    "local",
-    "attention",
-    "manager",
-    "fact",
-    "cover",
-    "sad",
-    "guard",
-    "relative",
-    "county",
-    "rate",
-    "lunch",
-    "program",
-    "initiative",
-    "gear",
-    "bridge",
-    "breast",
-    "talk",
-    "dish",
-    "guarantee",
-    "beer",
-    "vehicle",
-    "reception",
-    "woman",
-    "substance",
-    "copy",
-    "lecture",
-    "advantage",
-    "park",
-    "cold",
-    "death",
-    "mix",
-    "hold",
-    "scale",
-    "tomorrow",
-    "blood",
-    "request",
-    "green",
-    "cookie",
-    "church",
-    "strip",
-    "forever",
-    "beyond",
-    "debt",
-    "tackle",
-    "wash",
-    "following",
-    "feel",
-    "maximum",
-    "sector",
-    "sea",
-    "property",
-    "economics",
-    "menu",
-    "bench",
-    "try",
-    "language",
-    "start",
-    "call",
-    "solid",
-    "address",
-    "income",
-    "foot",
-    "senior",
-    "honey",
-    "few",
-    "mixture",
-    "cash",
-    "grocery",
-    "link",
-    "map",
-    "form",
-    "factor",
-    "pot",
-    "model",
-    "writer",
-    "farm",
-    "winter",
-    "skill",
-    "anywhere",
-    "birthday",
-    "policy",
-    "release",
-    "husband",
-    "lab",
-    "hurry",
-    "mail",
-    "equipment",
-    "sink",
-    "pair",
-    "driver",
-    "consideration",
-    "leather",
-    "skin",
-    "blue",
-    "boat",
-    "sale",
-    "brick",
-    "two",
-    "feed",
-    "square",
-    "dot",
-    "rush",
-    "dream",
-    "location",
-    "afternoon",
-    "manufacturer",
-    "control",
-    "occasion",
-    "trouble",
-    "introduction",
-    "advice",
-    "bet",
-    "eat",
-    "kill",
-    "category",
-    "manner",
-    "office",
-    "estate",
-    "pride",
-    "awareness",
-    "slip",
-    "crack",
-    "client",
-    "nail",
-    "shoot",
-    "membership",
-    "soft",
-    "anybody",
-    "web",
-    "official",
-    "individual",
-    "pizza",
-    "interest",
-    "bag",
-    "spell",
-    "profession",
-    "queen",
-    "deal",
-    "resource",
-    "ship",
-    "guy",
-    "chocolate",
-    "joint",
-    "formal",
-    "upstairs",
-    "car",
-    "resort",
-    "abroad",
-    "dealer",
-    "associate",
-    "finger",
-    "surgery",
-    "comment",
-    "team",
-    "detail",
-    "crazy",
-    "path",
-    "tale",
-    "initial",
-    "arm",
-    "radio",
-    "demand",
-    "single",
-
-    "draw",
-    "yellow",
-    "contest",
-    "piece",
-    "quote",
-    "pull",
-    "commercial",
-    "shirt",
-    "contribution",
-    "cream",
-    "channel",
-    "suit",
-    "discipline",
-    "instruction",
-    "concert",
-    "speech",
-    "low",
-    "effective",
-    "hang",
-    "scratch",
-    "industry",
-    "breakfast",
-    "lay",
-    "join",
-    "metal",
-    "bedroom",
-    "minute",
-    "product",
-    "rest",
-    "temperature",
-    "many",
-    "give",
-    "argument",
-    "print",
-    "purple",
-    "laugh",
-    "health",
-    "credit",
-    "investment",
-    "sell",
-    "setting",
-    "lesson",
-    "egg",
-    "middle",
-    "marriage",
-    "level",
-    "evidence",
-    "phrase",
-    "love",
-    "self",
-    "benefit",
-    "guidance",
-    "affect",
-    "you",
-    "dad",
-    "anxiety",
-    "special",
-    "boyfriend",
-    "test",
-    "blank",
-    "payment",
-    "soup",
-    "obligation",
-    "reply",
-    "smile",
-    "deep",
-    "complaint",
-    "addition",
-    "review",
-    "box",
-    "towel",
-    "minor",
-    "fun",
-    "soil",
-    "issue",
-    "cigarette",
-    "internet",
-    "gain",
-    "tell",
-    "entry",
-    "spare",
-    "incident",
-    "family",
-    "refuse",
-    "branch",
-    "can",
-    "pen",
-    "grandfather",
-    "constant",
-    "tank",
-    "uncle",
-    "climate",
-    "ground",
-    "volume",
-    "communication",
-    "kind",
-    "poet",
-    "child",
-    "screen",
-    "mine",
-    "quit",
-    "gene",
-    "lack",
-    "charity",
-    "memory",
-    "tooth",
-    "fear",
-    "mention",
-    "marketing",
-    "reveal",
-    "reason",
-    "court",
-    "season",
-    "freedom",
-    "land",
-    "sport",
-    "audience",
-    "classroom",
-    "law",
-    "hook",
-    "win",
-    "carry",
-    "eye",
-    "smell",
-    "distribution",
-    "research",
-    "country",
-    "dare",
-    "hope",
-    "whereas",
-    "stretch",
-    "library",
-    "if",
-    "delay",
-    "college",
-    "plastic",
-    "book",
-    "present",
-    "use",
-    "worry",
-    "champion",
-    "goal",
-    "economy",
-    "march",
-    "election",
-    "reflection",
-    "midnight",
-    "slide",
-    "inflation",
-    "action",
-    "challenge",
-    "guitar",
-    "coast",
-    "apple",
-    "campaign",
-    "field",
-    "jacket",
-    "sense",
-    "way",
-    "visual",
-    "remove",
-    "weather",
-    "trash",
-    "cable",
-    "regret",
-    "buddy",
-    "beach",
-    "historian",
-    "courage",
-    "sympathy",
-    "truck",
-    "tension",
-    "permit",
-    "nose",
-    "bed",
-    "son",
-    "person",
-    "base",
-    "meat",
-    "usual",
-    "air",
-    "meeting",
-    "worth",
-    "game",
-    "independence",
-    "physical",
-    "brief",
-    "play",
-    "raise",
-    "board",
-    "she",
-    "key",
-    "writing",
-    "pick",
-    "command",
-    "party",
-    "yesterday",
-    "spring",
-    "candidate",
-    "physics",
-    "university",
-    "concern",
-    "development",
-    "change",
-    "string",
-    "target",
-    "instance",
-    "room",
-    "bitter",
-    "bird",
-    "football",
-    "normal",
-    "split",
-    "impression",
-    "wood",
-    "long",
-    "meaning",
-    "stock",
-    "cap",
-    "leadership",
-    "media",
-    "ambition",
-    "fishing",
-    "essay",
-    "salad",
-    "repair",
-    "today",
-    "designer",
-    "night",
-    "bank",
-    "drawing",
-    "inevitable",
-    "phase",
-    "vast",
-    "chip",
-    "anger",
-    "switch",
-    "cry",
-    "twist",
-    "personality",
-    "attempt",
-    "storage",
-    "being",
-    "preparation",
-    "bat",
-    "selection",
-    "white",
-    "technology",
-    "contract",
-    "side",
-    "section",
-    "station",
-    "till",
-    "structure",
-    "tongue",
-    "taste",
-    "truth",
-    "difficulty",
-    "group",
-    "limit",
-    "main",
-    "move",
-    "feeling",
-    "light",
-    "example",
-    "mission",
-    "might",
-    "wait",
-    "wheel",
-    "shop",
-    "host",
-    "classic",
-    "alternative",
-    "cause",
-    "agent",
-    "consist",
-    "table",
-    "airline",
-    "text",
-    "pool",
-    "craft",
-    "range",
-    "fuel",
-    "tool",
-    "partner",
-    "load",
-    "entrance",
-    "deposit",
-    "hate",
-    "article",
-    "video",
-    "summer",
-    "feature",
-    "extreme",
-    "mobile",
-    "hospital",
-    "flight",
-    "fall",
-    "pension",
-    "piano",
-    "fail",
-    "result",
-    "rub",
-    "gap",
-    "system",
-    "report",
-    "suck",
-    "ordinary",
-    "wind",
-    "nerve",
-    "ask",
-    "shine",
-    "note",
-    "line",
-    "mom",
-    "perception",
-    "brother",
-    "reference",
-    "bend",
-    "charge",
-    "treat",
-    "trick",
-    "term",
-    "homework",
-    "bake",
-    "bid",
-    "status",
-    "project",
-    "strategy",
-    "orange",
-    "let",
-    "enthusiasm",
-    "parent",
-    "concentrate",
-    "device",
-    "travel",
-    "poetry",
-    "business",
-    "society",
-    "kiss",
-    "end",
-    "vegetable",
-    "employ",
-    "schedule",
-    "hour",
-    "brave",
-    "focus",
-    "process",
-    "movie",
-    "illegal",
-    "general",
-    "coffee",
-    "ad",
-    "highway",
-    "chemistry",
-    "psychology",
-    "hire",
-    "bell",
-    "conference",
-    "relief",
-    "show",
-    "neat",
-    "funny",
-    "weight",
-    "quality",
-    "club",
-    "daughter",
-    "zone",
-    "touch",
-    "tonight",
-    "shock",
-    "burn",
-    "excuse",
-    "name",
-    "survey",
-    "landscape",
-    "advance",
-    "satisfaction",
-    "bread",
-    "disaster",
-    "item",
-    "hat",
-    "prior",
-    "shopping",
-    "visit",
-    "east",
-    "photo",
-    "home",
-    "idea",
-    "father",
-    "comparison",
-    "cat",
-    "pipe",
-    "winner",
-    "count",
-    "lake",
-    "fight",
-    "prize",
-    "foundation",
-    "dog",
-    "keep",
-    "ideal",
-    "fan",
-    "struggle",
-    "peak",
-    "safety",
-    "solution",
-    "hell",
-    "conclusion",
-    "population",
-    "strain",
-    "alarm",
-    "measurement",
-    "second",
-    "train",
-    "race",
-    "due",
-    "insurance",
-    "boss",
-    "tree",
-    "monitor",
-    "sick",
-    "course",
-    "drag",
-    "appointment",
-    "slice",
-    "still",
-    "care",
-    "patience",
-    "rich",
-    "escape",
-    "emotion",
-    "royal",
-    "female",
-    "childhood",
-    "government",
-    "picture",
-    "will",
-    "sock",
-    "big",
-    "gate",
-    "oil",
-    "cross",
-    "pin",
-    "improvement",
-    "championship",
-    "silly",
-    "help",
-    "sky",
-    "pitch",
-    "man",
-    "diamond",
-    "most",
-    "transition",
-    "work",
-    "science",
-    "committee",
-    "moment",
-    "fix",
-    "teaching",
-    "dig",
-    "specialist",
-    "complex",
-    "guide",
-    "people",
-    "dead",
-    "voice",
-    "original",
-    "break",
-    "topic",
-    "data",
-    "degree",
-    "reading",
-    "recording",
-    "bunch",
-    "reach",
-    "judgment",
-    "lie",
-    "regular",
-    "set",
-    "painting",
-    "mode",
-    "list",
-    "player",
-    "bear",
-    "north",
-    "wonder",
-    "carpet",
-    "heavy",
-    "officer",
-    "negative",
-    "clock",
-    "unique",
-    "baby",
-    "pain",
-    "assumption",
-    "disk",
-    "iron",
-    "bill",
-    "drawer",
-
-    "look",
-    "double",
-    "mistake",
-    "finish",
-    "future",
-    "brilliant",
-    "contact",
-    "math",
-    "rice",
-    "leave",
-    "restaurant",
-    "discount",
-    "sex",
-    "virus",
-    "bit",
-    "trust",
-    "event",
-    "wear",
-    "juice",
-    "failure",
-    "bug",
-    "context",
-    "mud",
-    "whole",
-    "wrap",
-    "intention",
-    "draft",
-    "pressure",
-    "cake",
-    "dark",
-    "explanation",
-    "space",
-    "angle",
-    "word",
-    "efficiency",
-    "management",
-    "habit",
-    "star",
-    "chance",
-    "finding",
-    "transportation",
-    "stand",
-    "criticism",
-    "flow",
-    "door",
-    "injury",
-    "insect",
-    "surprise",
-    "apartment",
-]  # pylint: disable=line-too-long
-
-WORD_LIST_IT = [
-    "occidentale",
-    "frase", "sentenza",
-    "segnale",
-    "discarica", "scaricare",
-    "posto", "macchia", "punto",
-    "opposto", "di fronte",
-    "fondo", "parte inferiore",
-    "patata",
-    "amministrazione", "governo", "gestione",
-    "lavoro", "funzionante",
-    "benvenuto",
-    "mattina",
-    "buono", "bene",
-    "agenzia", "ente",
-    "primario", "principale",
-    "desiderio", "augurio",
-    "responsabilità", "compito",
-    "stampa", "premere",
-    "problema",
-    "presidente",
-    "rubare",
-    "spazzola", "spazzolare",
-    "leggere",
-    "tipo", "digitare",
-    "battere", "sconfiggere",
-    "allenatore", "istruttore",
-    "crescita", "sviluppo",
-    "lucchetto", "chiudere a chiave",
-    "osso",
-    "caso", "scatola",
-    "uguale", "pari",
-    "comodo", "confortevole",
-    "regione", "zona",
-    "sostituzione", "rimpiazzo",
-    "prestazione", "esecuzione",
-    "compagno", "partner",
-    "camminare", "passeggiata",
-    "medicina", "farmaco",
-    "film", "pellicola",
-    "cosa", "oggetto",
-    "roccia", "sasso", "rock",
-    "toccare", "rubinetto",
-    "totale", "complessivo",
-    "competizione", "gara",
-    "facilità", "agio",
-    "sud",
-    "fondazione", "stabilimento", "locale",
-    "raccogliere", "radunare",
-    "parcheggio",
-    "mondo",
-    "abbondanza", "molto",
-    "respiro",
-    "rivendicare", "affermazione",
-    "alcol",
-    "commercio", "scambio",
-    "caro", "gentile",
-    "evidenziare", "punto saliente",
-    "strada", "via",
-    "questione", "materia", "sostanza",
-    "decisione",
-    "disordine", "casino",
-    "accordo", "patto", "contratto",
-    "studio", "atelier", "sala di registrazione",
-    "allenatore", "coach",
-    "assistere", "aiutare",
-    "cervello",
-    "ala",
-    "stile",
-    "privato",
-    "cima", "superiore",
-    "marrone",
-    "gamba", "zampa",
-    "comprare", "acquistare",
-    "procedura",
-    "metodo",
-    "velocità",
-
-    "alto", "sballo",
-    "azienda", "compagnia", "società",
-    "prezioso", "di valore",
-    "torta", "crostata",
-    "analista",
-    "sessione", "seduta",
-    "schema", "modello", "motivo",
-    "distretto", "quartiere",
-    "piacere", "godimento",
-    "cena",
-    "nuoto",
-    "scherzo", "barzelletta",
-    "ordine", "ordinare",
-    "piatto", "lastra",
-    "dipartimento", "reparto",
-    "motore",
-    "cella", "cellulare",
-    "spendere", "trascorrere",
-    "armadio", "gabinetto",
-    "differenza",
-    "potere", "energia", "forza",
-    "esame", "esaminazione",
-    "motore",
-    "cavallo",
-    "dimensione", "misura",
-    "pagare", "paga",
-    "dito del piede", "alluce",
-    "curva",
-    "letteratura",
-    "disturbare", "seccare",
-    "fuoco", "incendio", "sparare",
-    "possibilità",
-    "dibattito", "discussione",
-    "attività",
-    "passaggio", "corridoio", "brano",
-    "ciao", "salve",
-    "ciclo", "giro",
-    "sfondo", "retroscena",
-    "silenzioso", "tranquillo",
-    "autore", "scrittore",
-    "effetto",
-    "attore",
-    "pagina",
-    "bicicletta",
-    "errore",
-    "gola",
-    "attacco", "aggredire",
-    "personaggio", "carattere",
-    "telefono",
-    "tè",
-    "aumento", "crescita",
-    "risultato", "esito",
-    "file", "schedario", "fascicolo",
-    "specifico", "particolare",
-    "ispettore",
-    "interno",
-    "potenziale",
-    "personale", "staff",
-    "edificio", "costruzione",
-    "datore di lavoro",
-    "scarpa",
-    "mano",
-    "direzione", "orientamento",
-    "giardino",
-    "acquisto", "comprare",
-    "colloquio", "intervista",
-    "studio", "ricerca",
-    "riconoscimento",
-    "membro", "iscritto",
-    "spirituale",
-    "forno",
-    "panino", "sandwich",
-    "strano", "bizzarro",
-    "passeggero",
-    "particolare", "specifico",
-    "risposta",
-    "reazione",
-    "dimensione", "taglia",
-    "variazione",
-    "un", "una",
-    "annullare", "cancellare",
-    "caramella",
-    "uscita",
-    "ospite",
-    "condizione", "stato",
-    "volare", "mosca",
-    "prezzo",
-    "debolezza",
-    "convertire", "trasformare",
-    "hotel", "albergo",
-    "grande", "ottimo",
-    "bocca",
-    "mente",
-    "canzone", "brano",
-    "zucchero",
-    "sospettare", "sospetto",
-    "telefono", "apparecchio telefonico",
-    "orecchio",
-    "tetto",
-    "vernice", "dipingere",
-    "frigorifero",
-    "organizzazione", "ente",
-    "giuria",
-    "ricompensa", "premio",
-    "ingegneria",
-    "giorno",
-    "possesso", "bene",
-    "equipaggio",
-    "bar", "locale",
-    "strada",
-    "descrizione",
-    "celebrazione", "festeggiamento",
-    "punteggio", "partitura",
-    "segno", "voto", "marchio",
-    "lettera",
-    "doccia",
-    "suggerimento", "proposta",
-    "signore", "sir",
-    "fortuna",
-    "nazionale",
-    "progresso", "avanzamento",
-    "sala", "atrio",
-    "colpo", "ictus",
-    "teoria",
-    "offerta", "proposta",
-    "storia", "racconto",
-    "tassa",
-    "definizione",
-    "storia", "storia passata",
-    "cavalcare", "corsa", "giro",
-    "mezzo", "medio",
-    "apertura", "inizio",
-    "vetro", "bicchiere",
-    "ascensore",
-    "stomaco", "pancia",
-    "domanda", "quesito",
-    "abilità", "capacità",
-    "leader", "principale",
-    "villaggio", "paese",
-    "computer",
-    "città",
-    "grande", "maestoso",
-    "fiducia", "sicurezza di sé",
-    "candela",
-    "prete", "sacerdote",
-    "raccomandazione", "consiglio",
-    "punto", "segnalare",
-    "necessario", "indispensabile",
-    "corpo",
-    "scrivania", "banco",
-    "segreto",
-    "orrore", "paura",
-    "rumore",
-    "cultura",
-    "avvertimento", "avviso",
-    "acqua",
-    "rotondo", "giro",
-    "dieta",
-    "fiore",
-    "autobus", "bus",
-    "duro", "tosto", "difficile",
-    "permesso", "autorizzazione",
-    "settimana",
-    "pronto", "sollecito",
-    "connessione", "collegamento",
-    "abuso", "maltrattamento",
-    "altezza",
-    "salvare", "risparmiare",
-    "angolo", "spigolo",
-    "confine", "frontiera",
-    "stress", "tensione",
-    "guidare", "corsa",
-    "fermarsi", "stop",
-    "strappare", "lacerare",
-    "pasto",
-    "ascoltare",
-    "confusione",
-    "fidanzata",
-    "vivere", "abitazione",
-    "relazione", "parentela",
-    "importanza", "significato",
-    "piano", "programma",
-    "creativo",
-    "atmosfera", "ambiente",
-    "colpa",
-    "invitare", "invito",
-    "alloggio", "abitazione",
-    "carta", "giornale",
-    "bevanda", "bere",
-    "rotolo", "rotolare",
-    "argento",
-    "ubriaco",
-    "età",
-    "danno",
-    "fumo", "fumare",
-    "ambiente",
-    "pacchetto", "confezione",
-    "risparmi",
-    "influenza", "influsso",
-    "turista",
-
-    "pioggia",
-    "posta", "palo", "inviare",
-    "segno", "cartello", "firmare",
-    "nonna",
-    "correre", "gestire",
-    "profitto", "guadagno",
-    "spingere", "pressione",
-    "impiegato", "commesso",
-    "finale", "definitivo",
-    "vino",
-    "nuotare",
-    "pausa", "interruzione",
-    "roba", "materiale",
-    "cantante",
-    "funerale",
-    "media", "medio",
-    "fonte", "origine",
-    "scena", "scenario",
-    "tradizione",
-    "personale", "privato",
-    "neve",
-    "nessuno",
-    "distanza",
-    "tipo", "ordinare",
-    "sensibile", "delicato",
-    "animale",
-    "maggiore", "importante",
-    "negoziazione", "trattativa",
-    "clic", "scatto",
-    "umore",
-    "periodo", "epoca",
-    "arrivo",
-    "espressione",
-    "vacanza", "festività",
-    "ripetere",
-    "polvere",
-    "armadio", "ripostiglio",
-    "oro",
-    "cattivo",
-    "vela", "navigare",
-    "combinazione", "unione",
-    "vestiti", "abiti",
-    "enfasi", "accento",
-    "dovere", "obbligo",
-    "nero",
-    "passo", "scalino",
-    "scuola",
-    "saltare",
-    "documento",
-    "professionale",
-    "labbro",
-    "chimico",
-    "fronte", "davanti",
-    "sveglia", "svegliarsi",
-    "mentre",
-    "dentro",
-    "orologio", "guardare",
-    "fila", "riga", "remare",
-    "soggetto", "materia",
-    "penalità", "sanzione",
-    "equilibrio", "bilancia",
-    "possibile",
-    "adulto",
-    "da parte", "a lato",
-    "campione", "esempio",
-    "appello", "ricorso",
-    "matrimonio", "nozze",
-    "profondità",
-    "re",
-    "premio", "riconoscimento",
-    "moglie",
-    "soffiare", "colpo",
-    "sito", "luogo",
-    "campo", "accampamento",
-    "musica",
-    "sicuro", "cassaforte",
-    "regalo", "dono",
-    "colpa", "guasto",
-    "indovinare", "supporre",
-    "atto", "agire",
-    "vergogna",
-    "dramma",
-    "capitale",
-    "esame", "prova",
-    "stupido",
-    "record", "registrazione", "primato",
-    "suono",
-    "altalena", "oscillare",
-    "romanzo",
-    "minimo",
-    "rapporto", "proporzione",
-    "macchina",
-    "forma", "sagoma",
-    "piombo", "guidare", "condurre",
-    "operazione", "intervento",
-    "stipendio", "salario",
-    "nuvola",
-    "affare", "relazione",
-    "colpire", "successo",
-    "capitolo",
-    "palcoscenico", "fase",
-    "quantità",
-    "accesso",
-    "esercito",
-    "catena",
-    "traffico",
-    "calcio", "colpo",
-    "analisi",
-    "aeroporto",
-    "tempo", "ora",
-    "vacanza",
-    "filosofia",
-    "palla", "ballo",
-    "petto", "cassa",
-    "grazie",
-    "posto", "luogo",
-    "montagna",
-    "pubblicità",
-    "rosso",
-    "passato",
-    "affitto", "noleggio",
-    "ritorno", "rendere",
-    "tour", "giro",
-    "casa",
-    "costruzione", "cantiere",
-    "rete", "netto",
-    "nativo", "indigeno",
-    "guerra",
-    "figura", "numero",
-    "tassa", "compenso",
-    "spruzzare", "spruzzo",
-    "utente",
-    "sporcizia", "terra",
-    "colpo", "sparare",
-    "compito",
-    "bastone", "attaccare",
-    "amico",
-    "software",
-    "promozione", "avanzamento",
-    "interazione",
-    "circondare",
-    "blocco", "isolato",
-    "scopo", "finalità",
-    "pratica", "allenamento",
-    "conflitto",
-    "routine", "abitudine",
-    "requisito",
-    "bonus", "premio",
-    "buco",
-    "stato", "condizione",
-    "junior", "giovane",
-    "dolce", "caramella",
-    "afferrare", "catturare",
-    "lacrima", "strappare",
-    "piegare", "piega",
-    "muro", "parete",
-    "redattore", "editor",
-    "vita",
-    "posizione", "carica",
-    "libbra", "martellare",
-    "rispetto",
-    "bagno",
-    "cappotto", "mantello",
-    "copione", "script",
-    "lavoro", "impiego",
-    "insegnare",
-    "nascita",
-    "vista", "opinione",
-    "risolvere",
-    "tema", "argomento",
-    "dipendente",
-    "dubbio",
-    "mercato",
-    "istruzione", "educazione",
-    "servire",
-    "recuperare",
-    "tono",
-    "danno", "male",
-    "perdere", "sentire la mancanza",
-    "unione", "sindacato",
-    "comprensione", "intesa",
-    "mucca",
-    "fiume",
-    "associazione",
-    "concetto",
-    "formazione", "addestramento",
-    "ricetta",
-    "relazione",
-    "riserva", "prenotare",
-    "depressione", "avvallamento",
-    "prova", "dimostrazione",
-    "capelli", "pelo",
-    "entrate", "ricavi",
-    "indipendente",
-    "sollevare", "ascensore",
-    "compito", "assegnazione",
-    "temporaneo", "provvisorio",
-    "ammontare", "quantità",
-    "perdita",
-    "bordo", "orlo",
-    "traccia", "pista",
-    "controllare", "assegno",
-    "corda", "fune",
-    "stima", "preventivo",
-    "inquinamento",
-    "stabile", "scuderia",
-    "messaggio",
-    "consegna", "spedizione",
-    "prospettiva", "punto di vista",
-    "specchio",
-    "assistente",
-    "rappresentante",
-    "testimone",
-    "natura",
-    "giudice",
-    "frutto",
-    "punta", "mancia", "consiglio",
-    "diavolo",
-    "cittadina", "paese",
-    "emergenza",
-    "superiore", "alto",
-    "goccia", "lasciare",
-    "soggiorno", "restare",
-    "umano",
-    "collo",
-    "altoparlante", "oratore",
-    "rete",
-    "cantare",
-    "resistere",
-    "lega", "campionato",
-    "viaggio", "gita",
-    "firma",
-    "avvocato",
-    "importanza",
-    "gas",
-    "scelta",
-    "ingegnere",
-    "successo",
-    "parte",
-    "esterno",
-    "lavoratore",
-    "semplice",
-    "quarto", "trimestre",
-    "studente",
-    "cuore",
-    "passare", "biglietto d’ingresso",
-    "dispetto",
-    "turno", "spostamento",
-    "ruvido", "difficile",
-    "signora", "dama",
-    "erba", "prato",
-    "comunità",
-    "garage",
-    "gioventù", "giovane età",
-    "standard",
-    "gonna",
-    "promessa",
-    "cieco",
-    "televisione",
-    "malattia",
-    "commissione", "incarico",
-    "positivo",
-    "energia",
-    "calmo", "tranquillo",
-    "presenza",
-    "melodia", "accordare",
-    "base", "fondamento",
-    "preferenza",
-    "testa", "capo",
-    "comune", "ordinario",
-    "tagliare", "ferita",
-    "da qualche parte",
-    "presentazione", "relazione",
-    "corrente", "attuale",
-    "pensiero",
-    "rivoluzione",
-    "sforzo",
-    "maestro", "padrone",
-    "attuare", "strumento",
-    "repubblica",
-    "pavimento", "piano",
-    "principio",
-    "sconosciuto", "estraneo",
-    "spalla",
-    "voto", "grado",
-    "bottone",
-    "tennis",
-    "polizia",
-    "collezione", "raccolta",
-    "conto", "account",
-    "registro", "registrare",
-    "guanto",
-    "dividere",
-    "professore",
-    "sedia", "poltrona",
-    "priorità",
-    "combinare", "unire",
-    "pace",
-    "estensione", "prolungamento",
-    "forse",
-
-    "sera",
-    "cornice", "struttura", "fotogramma",
-    "sorella",
-    "onda", "salutare",
-    "codice",
-    "applicazione", "domanda",
-    "topo", "mouse",
-    "partita", "incontro", "fiammifero", "abbinare",
-    "bancone", "contatore",
-    "bottiglia",
-    "metà",
-    "guancia",
-    "risoluzione", "determinazione",
-    "schiena", "indietro", "retro",
-    "conoscenza", "sapere",
-    "fare",
-    "discussione",
-    "vite", "avvitare",
-    "lunghezza",
-    "incidente",
-    "battaglia",
-    "vestito", "abito",
-    "ginocchio",
-    "registro", "tronco",
-    "pacchetto", "confezione",
-    "esso", "ciò",
-    "girare", "svolta",
-    "udienza", "udito",
-    "giornale",
-    "strato",
-    "ricchezza",
-    "profilo",
-    "immaginazione",
-    "risposta",
-    "fine settimana", "weekend",
-    "insegnante", "maestro",
-    "aspetto", "apparizione",
-    "incontrare",
-    "bicicletta", "moto",
-    "alzarsi", "sorgere",
-    "cintura",
-    "incidente", "schianto",
-    "ciotola",
-    "equivalente",
-    "supporto", "sostegno",
-    "immagine",
-    "poesia",
-    "rischio",
-    "eccitazione", "entusiasmo",
-    "remoto", "telecomando",
-    "segretaria", "segretario",
-    "pubblico",
-    "produrre", "prodotti",
-    "aereo", "piano",
-    "schermo", "mostrare",
-    "denaro", "soldi",
-    "sabbia",
-    "situazione",
-    "pugno", "pugnalata",
-    "cliente",
-    "titolo",
-    "scuotere", "stretta di mano",
-    "mutuo", "ipoteca",
-    "opzione",
-    "numero",
-    "scoppio", "pop",
-    "finestra",
-    "estensione", "portata",
-    "niente",
-    "esperienza",
-    "opinione",
-    "partenza",
-    "danza", "ballo",
-    "indicazione", "segno",
-    "ragazzo",
-    "materiale",
-    "banda", "fascia", "gruppo musicale",
-    "leader", "capo",
-    "sole",
-    "bello", "bella",
-    "muscolo",
-    "contadino", "agricoltore",
-    "varietà",
-    "grasso",
-    "manico", "gestire",
-    "direttore", "regista",
-    "opportunità",
-    "calendario",
-    "fuori", "esterno",
-    "andatura", "ritmo",
-    "bagno",
-    "pesce", "pescare",
-    "conseguenza",
-    "mettere",
-    "proprietario",
-    "andare",
-    "medico", "dottore",
-    "informazioni",
-    "condividere", "quota",
-    "ferire", "male",
-    "protezione",
-    "carriera",
-    "finanza",
-    "forza",
-    "golf",
-    "spazzatura", "immondizia",
-    "aspetto", "punto di vista",
-    "bambino", "ragazzino",
-    "cibo",
-    "stivale",
-    "latte",
-    "rispondere",
-    "obiettivo", "scopo",
-    "realtà",
-    "crudo", "grezzo",
-    "anello", "squillo",
-    "centro commerciale",
-    "uno",
-    "impatto", "influenza",
-    "area", "zona",
-    "notizie", "news",
-    "internazionale",
-    "serie",
-    "impressionare",
-    "madre",
-    "rifugio", "shelter",
-    "sciopero", "colpire",
-    "prestito",
-    "mese",
-    "sedile", "posto",
-    "qualsiasi cosa",
-    "intrattenimento",
-    "familiare", "conosciuto",
-    "indizio",
-    "anno",
-    "contento", "lieto",
-    "supermercato",
-    "naturale",
-    "dio",
-    "costo",
-    "conversazione",
-    "cravatta", "legare",
-    "rovina", "distruggere",
-    "comodità", "conforto",
-    "terra",
-    "tempesta",
-    "percentuale",
-    "assistenza", "aiuto",
-    "bilancio",
-    "forza", "vigore",
-    "inizio",
-    "sonno", "dormire",
-    "altro",
-    "giovane",
-    "unità",
-    "riempire",
-    "negozio", "conservare",
-    "desiderio",
-    "nascondere",
-    "valore",
-    "tazza", "coppa",
-    "manutenzione",
-    "infermiera",
-    "funzione",
-    "torre",
-    "ruolo",
-    "classe", "lezione",
-    "fotocamera", "telecamera",
-    "database",
-    "panico",
-    "nazione",
-    "cesto", "canestro",
-    "ghiaccio",
-    "arte",
-    "spirito", "anima",
-    "grafico",
-    "scambio",
-    "feedback", "riscontro",
-    "dichiarazione",
-    "reputazione",
-    "ricerca",
-    "caccia",
-    "esercizio",
-    "cattivo", "sgradevole",
-    "avviso", "notare",
-    "maschio",
-    "cortile", "giardino",
-    "annuale",
-    "collare", "colletto",
-    "data", "appuntamento", "dattero",
-    "piattaforma", "banchina",
-    "pianta", "fabbrica",
-    "fortuna", "ricchezza",
-    "passione",
-    "amicizia",
-    "diffondere", "spalmare",
-    "cancro",
-    "biglietto", "ticket",
-    "atteggiamento",
-    "isola",
-    "attivo",
-    "oggetto", "opporre",
-    "servizio",
-    "acquirente", "compratore",
-    "morso", "mordere",
-    "carta", "tessera",
-    "faccia", "viso",
-    "bistecca",
-    "proposta",
-    "paziente", "malato",
-    "calore", "riscaldare",
-    "regola", "dominare",
-    "residente", "abitante",
-    "ampio", "largo",
-    "politica",
-    "ovest", "occidente",
-    "coltello",
-    "esperto",
-    "ragazza",
-    "disegno", "progettare",
-    "sale",
-    "baseball",
-    "afferrare", "prendere",
-    "ispezione",
-    "cugino", "cugina",
-    "coppia",
-    "rivista",
-    "cuoco", "cucinare",
-    "dipendente",
-    "sicurezza",
-    "pollo",
-    "versione",
-    "valuta", "moneta",
-    "scala a pioli",
-    "schema", "piano",
-    "cucina",
-    "impiego", "occupazione",
-    "locale",
-    "attenzione",
-    "manager", "responsabile",
-    "fatto",
-    "coprire", "copertina",
-    "triste",
-    "guardia", "sorvegliare",
-    "parente", "relativo",
-    "contea", "provincia",
-    "tasso", "tariffa",
-    "pranzo",
-    "programma",
-    "iniziativa",
-    "ingranaggio", "attrezzatura",
-    "ponte",
-    "seno", "petto",
-    "parlare", "discorso",
-    "piatto vivanda",
-    "garanzia",
-    "birra",
-    "veicolo",
-    "ricevimento", "accoglienza",
-    "donna",
-    "sostanza", "materia",
-    "copia", "copiare",
-    "lezione", "conferenza",
-    "vantaggio",
-    "parco",
-    "freddo",
-    "morte",
-    "mescolare",
-    "tenere", "prendere",
-    "scala", "bilancia",
-    "domani",
-    "sangue",
-    "richiesta",
-    "verde",
-    "biscotto",
-    "chiesa",
-    "strisciare", "spogliarello",
-    "per sempre",
-    "oltre",
-    "debito",
-    "placcaggio", "affrontare",
-    "lavare",
-    "seguente",
-    "sentire", "provare",
-    "massimo",
-    "settore",
-    "mare",
-    "proprietà",
-    "economia",
-    "menu",
-    "panchina", "tribunale",
-    "provare", "tentare",
-    "lingua",
-    "iniziare",
-    "chiamata", "telefonare",
-    "solido",
-    "indirizzo",
-    "reddito",
-    "piede",
-    "senior", "anziano",
-    "miele",
-    "pochi",
-    "miscela",
-    "contanti",
-    "drogheria", "alimentari",
-    "collegamento", "link",
-    "mappa",
-    "modulo", "forma",
-    "fattore",
-    "pentola",
-    "modello",
-    "scrittore", "autore",
-    "fattoria",
-    "inverno",
-    "abilità",
-    "ovunque",
-    "compleanno",
-    "politica",
-    "rilascio", "pubblicare",
-    "marito",
-    "laboratorio",
-    "fretta",
-    "posta",
-    "attrezzatura",
-    "lavandino", "affondare",
-    "paio", "coppia",
-    "autista",
-    "considerazione",
-    "pelle", "cuoio",
-    "pelle", "cute",
-    "blu",
-    "barca",
-    "vendita",
-    "mattone",
-    "due",
-    "nutrire", "alimentare",
-    "quadrato", "piazza",
-    "punto", "puntino",
-    "corsa", "fretta",
-    "sogno",
-    "posizione", "luogo",
-    "pomeriggio",
-    "produttore",
-    "controllo",
-    "occasione",
-    "problema", "guaio",
-    "introduzione",
-    "consiglio",
-    "scommessa",
-    "mangiare",
-    "uccidere",
-    "categoria",
-    "modo", "maniera",
-    "ufficio",
-    "proprietà", "tenuta",
-    "orgoglio",
-    "consapevolezza",
-    "scivolare", "slip",
-    "crepa", "fessura",
-    "cliente",
-    "unghia", "chiodo",
-    "sparare", "scattare",
-    "iscrizione", "abbonamento",
-    "morbido", "soffice",
-    "chiunque",
-    "rete", "web",
-    "ufficiale",
-    "individuo",
-    "pizza",
-    "interesse",
-    "borsa", "sacca",
-    "incantesimo", "scrivere",
-    "professione",
-    "regina",
-    "accordo", "affare",
-    "risorsa",
-    "nave", "spedire",
-    "tipo", "tizio",
-    "cioccolato",
-    "articolazione", "congiunto",
-    "formale",
-    "di sopra", "piano superiore",
-    "auto", "macchina",
-    "resort", "villaggio turistico",
-    "all’estero",
-    "rivenditore", "dealer",
-    "associare", "collega",
-    "dito",
-    "chirurgia", "operazione",
-    "commento",
-    "squadra", "team",
-    "dettaglio",
-    "pazzo",
-    "sentiero", "percorso",
-    "racconto", "fiaba",
-    "iniziale",
-    "braccio",
-    "radio",
-    "domanda", "richiesta",
-    "singolo", "celibe", "singola",
-
-    "disegnare", "pareggio", "attrarre", "estrarre",
-    "giallo",
-    "gara", "concorso", "contestare",
-    "pezzo", "brano",
-    "citazione", "quotare", "preventivo",
-    "tirare", "trazione",
-    "commerciale", "spot pubblicitario",
-    "camicia", "maglietta",
-    "contributo", "apporto",
-    "crema", "panna",
-    "canale", "canalizzare",
-    "abito", "completo", "causa legale", "stare bene a",
-    "disciplina", "disciplinare",
-    "istruzione", "direttiva",
-    "concerto", "intesa",
-    "discorso", "parola",
-    "basso",
-    "efficace", "in vigore",
-    "appendere", "impiccare", "restare in linea",
-    "graffiare", "graffio", "grattare",
-    "industria", "settore",
-    "colazione",
-    "posare", "sdraiare", "deporre", "laico",
-    "unirsi", "giuntura", "congiungere",
-    "metallo", "metal",
-    "camera da letto",
-    "minuto", "minuzioso",
-    "prodotto",
-    "riposo", "resto", "riposare",
-    "temperatura",
-    "molti", "tanti",
-    "dare", "regalare", "cedere",
-    "argomentazione", "lite", "discussione",
-    "stampare", "stampa", "impronta",
-    "viola", "porpora",
-    "ridere", "risata",
-    "salute",
-    "credito", "riconoscimento",
-    "investimento",
-    "vendere", "svendere",
-    "ambientazione", "impostazione", "scenario", "contesto",
-    "lezione", "insegnamento",
-    "uovo",
-    "medio", "mezzo", "centrale",
-    "matrimonio", "nozze",
-    "livello",
-    "prova", "evidenza", "indizio",
-    "frase", "locuzione", "espressione",
-    "amore", "amare",
-    "sé", "se stesso", "auto-",
-    "beneficio", "vantaggio", "benefit",
-    "guida", "orientamento",
-    "influenzare", "colpire",
-    "tu", "voi", "Lei",
-    "papà", "babbo", "padre",
-    "ansia", "agitazione",
-    "speciale", "particolare",
-    "fidanzato", "ragazzo",
-    "test", "esame", "prova",
-    "vuoto", "in bianco",
-    "pagamento",
-    "zuppa", "minestra", "brodo",
-    "obbligo",
-    "rispondere", "risposta",
-    "sorriso", "sorridere",
-    "profondo",
-    "lamentela", "reclamo", "querela",
-    "aggiunta", "addizione",
-    "recensione", "revisione", "rivedere",
-    "scatola", "riquadro", "ring",
-    "asciugamano", "salvietta",
-    "minore", "secondario", "minorenne",
-    "divertimento", "divertente",
-    "suolo", "terreno", "sporcare",
-    "questione", "problema", "emissione", "pubblicare",
-    "sigaretta",
-    "internet", "rete",
-    "guadagno", "ottenere", "aumentare",
-    "dire", "raccontare",
-    "ingresso", "voce", "iscrizione",
-    "di scorta", "risparmiare",
-    "incidente", "episodio",
-    "famiglia",
-    "rifiutare", "rifiuti",
-    "filiale", "ramo", "branca",
-    "lattina", "barattolo", "potere", "inscatolare",
-    "penna", "recinto",
-    "nonno",
-    "costante",
-    "serbatoio", "carro armato", "vasca",
-    "zio",
-    "clima",
-    "terra", "suolo", "fondare",
-    "volume",
-    "comunicazione",
-    "gentile", "tipo",
-    "poeta", "poetessa",
-    "bambino", "figlio",
-    "schermo", "selezionare",
-    "mio", "miniera", "mina",
-    "smettere", "abbandonare", "licenziarsi",
-    "gene",
-    "mancanza", "scarsità", "mancare",
-    "carità", "beneficenza", "ente benefico",
-    "memoria", "ricordo",
-    "dente",
-    "paura", "temere",
-    "menzionare", "menzione", "citare",
-    "marketing",
-    "rivelare", "svelare",
-    "ragione", "motivo", "ragionare",
-    "tribunale", "corte", "campo",
-    "stagione", "condire",
-    "libertà",
-    "terra", "atterrare", "sbarcare", "terreno",
-    "sport",
-    "pubblico", "platea",
-    "aula",
-    "legge", "diritto",
-    "gancio", "agganciare",
-    "vincere", "vittoria",
-    "portare", "trasportare",
-    "occhio",
-    "odore", "annusare", "puzzare",
-    "distribuzione",
-    "ricerca", "fare ricerca",
-    "paese", "campagna",
-    "osare", "ardire",
-    "speranza", "sperare",
-    "mentre", "considerato che",
-    "allungare", "tratto",
-    "biblioteca",
-    "se",
-    "ritardo", "ritardare",
-    "università", "college",
-    "plastica", "plastico",
-    "libro", "prenotare",
-    "presente", "regalo", "presentare",
-    "uso", "usare", "utilizzo",
-    "preoccuparsi", "preoccupazione",
-    "campione", "sostenere",
-    "obiettivo", "rete",
-    "economia", "risparmio",
-    "marzo", "marcia", "marciare",
-    "elezione",
-    "riflessione", "riflesso",
-    "mezzanotte",
-    "scivolare", "diapositiva", "scivolo",
-    "inflazione", "gonfiaggio",
-    "azione", "causa",
-    "sfida", "contestare",
-    "chitarra",
-    "costa",
-    "mela",
-    "campagna",
-    "campo", "settore",
-    "giacca", "giubbotto",
-    "senso", "percepire",
-    "modo", "via", "strada", "maniera",
-    "visivo", "visuale",
-    "rimuovere", "togliere",
-    "meteo", "tempo atmosferico",
-    "spazzatura", "buttare",
-    "cavo", "tv via cavo",
-    "rimpianto", "pentirsi",
-    "amico", "compare",
-    "spiaggia",
-    "storico", "storica",
-    "coraggio",
-    "simpatia", "compassione",
-    "camion",
-    "tensione",
-    "permesso", "permettere",
-    "naso",
-    "letto", "aiuola",
-    "figlio",
-    "persona",
-    "base", "basare",
-    "carne",
-    "solito", "abituale",
-    "aria", "aspetto",
-    "riunione", "incontro",
-    "valore", "vale la pena",
-    "gioco", "partita", "selvaggina",
-    "indipendenza",
-    "fisico", "visita medica",
-    "breve", "memoria",
-    "giocare", "recitare", "opera teatrale",
-    "aumentare", "sollevare", "aumento",
-    "tavola", "consiglio", "imbarcare",
-    "lei",
-    "chiave", "tasto", "fondamentale",
-    "scrittura",
-    "scegliere", "raccogliere", "piccone",
-    "comando", "ordinare",
-    "festa", "partito", "parte",
-    "ieri",
-    "primavera", "molla", "sorgente", "saltare",
-    "candidato", "candidata",
-    "fisica",
-    "università",
-    "preoccupazione", "interessare", "impresa",
-    "sviluppo",
-    "cambiamento", "cambiare", "spiccioli",
-    "corda", "filo", "stringa",
-    "bersaglio", "obiettivo", "prendere di mira",
-    "istanza", "esempio",
-    "stanza", "spazio",
-    "amaro", "acre", "aspro",
-    "uccello",
-    "calcio", "football americano",
-    "normale",
-    "dividere", "spaccare", "divisione",
-    "impressione", "impronta",
-    "legno", "bosco",
-    "lungo", "bramare",
-    "significato", "senso",
-    "scorta", "azione", "magazzino",
-    "cappellino", "tappo", "tetto",
-    "leadership", "dirigenza", "capacità di guida",
-    "media", "mezzi di comunicazione",
-    "ambizione",
-    "pesca",
-    "tema", "saggio",
-    "insalata",
-    "riparare", "riparazione",
-    "oggi",
-    "designer", "stilista", "progettista",
-    "notte", "serata",
-    "banca", "argine", "sponda",
-    "disegno", "estrazione",
-    "inevitabile",
-    "fase",
-    "vasto", "immenso",
-    "patatina", "chip", "scheggia", "gettone",
-    "rabbia", "ira",
-    "interruttore", "scambiare", "cambiare",
-    "piangere", "grido",
-    "torcere", "colpo di scena", "torsione",
-    "personalità",
-    "tentativo", "tentare",
-    "archiviazione", "magazzino", "stoccaggio",
-    "essere", "creatura",
-    "preparazione",
-    "pipistrello", "mazza", "colpire",
-    "selezione", "scelta",
-    "bianco",
-    "tecnologia",
-    "contratto", "contrarre",
-    "lato", "fianco", "prendere le parti di",
-    "sezione", "tratto",
-    "stazione", "postazione", "installare",
-    "fino a", "cassa", "lavorare il terreno",
-    "struttura", "strutturare",
-    "lingua",
-    "gusto", "assaggiare",
-    "verità",
-    "difficoltà",
-    "gruppo",
-    "limite", "limitare",
-    "principale",
-    "muovere", "mossa", "traslocare",
-    "sensazione", "sentimento",
-    "luce", "leggero", "accendere",
-    "esempio",
-    "missione", "mandato",
-    "potere", "forza", "potrebbe",
-    "aspettare", "attendere",
-    "ruota", "volante",
-    "negozio", "fare acquisti",
-    "ospite", "presentatore", "host",
-    "classico",
-    "alternativa", "alternativo",
-    "causa", "provocare",
-    "agente", "rappresentante",
-    "consistere",
-    "tavolo", "tabella",
-    "compagnia aerea",
-    "testo", "inviare un messaggio",
-    "piscina", "biliardo", "mettere in comune",
-    "artigianato", "mestiere", "imbarcazione",
-    "gamma", "intervallo", "catena montuosa", "raggio d'azione",
-    "carburante", "alimentare",
-    "attrezzo", "strumento",
-    "partner", "socio", "compagno",
-    "caricare", "carico",
-    "ingresso", "entrata",
-    "deposito", "acconto", "versare",
-    "odiare", "odio",
-    "articolo",
-    "video",
-    "estate",
-    "caratteristica", "funzione", "articolo di approfondimento",
-    "estremo",
-    "mobile", "cellulare",
-    "ospedale",
-    "volo", "fuga",
-    "cadere", "autunno",
-    "pensione",
-    "pianoforte", "piano",
-    "fallire", "bocciarsi",
-    "risultato", "risultare",
-    "strofinare", "sfregare",
-    "divario", "fessura", "lacuna",
-    "sistema", "impianto",
-    "rapporto", "relazione", "segnalare",
-    "succhiare", "fare schifo",
-    "ordinario", "comune",
-    "vento", "avvolgere",
-    "nervo", "coraggio",
-    "chiedere", "domandare",
-    "splendere", "lucidare", "brillare",
-    "nota", "notare", "biglietto",
-    "linea", "fila", "riga",
-    "mamma", "madre",
-    "percezione",
-    "fratello",
-    "riferimento", "referenza", "citazione",
-    "piegare", "curva", "ansa",
-    "caricare", "accusa", "costo", "incaricare",
-    "trattare", "cura", "leccornia",
-    "trucco", "ingannare",
-    "termine", "semestre", "condizione",
-    "compiti", "compiti a casa",
-    "cuocere al forno", "infornare",
-    "offerta", "offrire",
-    "stato", "status",
-    "progetto", "proiettare",
-    "strategia",
-    "arancione", "arancia",
-    "lasciare", "affittare",
-    "entusiasmo",
-    "genitore",
-    "concentrarsi", "concentrato",
-    "dispositivo", "congegno",
-    "viaggiare", "viaggio",
-    "poesia",
-    "business", "affari", "azienda",
-    "società",
-    "bacio", "baciare",
-    "fine", "terminare",
-    "verdura", "vegetale",
-    "assumere", "impiegare",
-    "programma", "orario", "pianificare",
-    "ora",
-    "coraggioso",
-    "mettere a fuoco", "concentrarsi", "fuoco",
-    "processo", "procedimento", "elaborare",
-    "film", "pellicola",
-    "illegale",
-    "generale", "generico",
-    "caffè",
-    "annuncio", "pubblicità",
-    "autostrada", "superstrada",
-    "chimica", "alchimia",
-    "psicologia",
-    "assumere", "noleggiare",
-    "campana", "campanello",
-    "conferenza", "convegno",
-    "sollievo", "rilievo",
-    "spettacolo", "mostrare",
-    "ordinato", "figo", "liscio",
-    "divertente", "strano",
-    "peso",
-    "qualità",
-    "club", "circolo", "mazza",
-    "figlia",
-    "zona",
-    "toccare", "tocco",
-    "stasera", "questa notte",
-    "shock", "scuotere", "scioccare",
-    "bruciare", "ustione",
-    "scusa", "giustificazione", "scusare",
-    "nome", "nominare",
-    "sondaggio", "rilievo", "ispezionare",
-    "paesaggio",
-    "anticipo", "avanzare",
-    "soddisfazione",
-    "pane",
-    "disastro", "catastrofe",
-    "voce", "articolo", "elemento",
-    "cappello",
-    "precedente", "priore",
-    "shopping", "spesa",
-    "visitare", "visita",
-    "est", "oriente",
-    "foto", "fotografia",
-    "casa", "abitazione", "in casa",
-    "idea",
-    "padre", "babbo",
-    "confronto", "comparazione",
-    "gatto",
-    "tubo", "pipa", "condotta",
-    "vincitore", "vincitrice",
-    "contare", "conte",
-    "lago",
-    "combattere", "lotta", "rissa",
-    "premio",
-    "fondazione", "fondamenta", "fondotinta",
-    "cane",
-    "tenere", "mantenere", "proseguire",
-    "ideale",
-    "ventilatore", "tifoso", "fan",
-    "lotta", "lottare",
-    "vetta", "picco", "ora di punta",
-    "sicurezza", "salvaguardia",
-    "soluzione",
-    "inferno", "diavolo!",
-    "conclusione", "esito",
-    "popolazione",
-    "sforzo", "ceppo", "tensione",
-    "allarme", "sveglia",
-    "misurazione", "misura",
-    "secondo", "secondare",
-    "treno", "allenare", "addestrare",
-    "gara", "razza", "corsa",
-    "dovuto", "scadenza", "previsto",
-    "assicurazione",
-    "capo", "boss",
-    "albero",
-    "monitor", "sorvegliare",
-    "malato", "stufo",
-    "corso", "percorso", "certo",
-    "trascinare", "seccatura",
-    "appuntamento", "nomina",
-    "fetta", "affettare",
-    "ancora", "immobile", "alambicco",
-    "cura", "preoccuparsi", "interessarsi",
-    "pazienza",
-    "ricco",
-    "fuga", "scappare",
-    "emozione",
-    "reale", "regale",
-    "femmina", "femminile",
-    "infanzia",
-    "governo", "amministrazione",
-    "immagine", "foto", "quadro",
-    "volontà", "testamento",
-    "calzino", "calza",
-    "grande",
-    "cancello", "gate",
-    "olio", "petrolio",
-    "croce", "attraversare", "incrociare", "arrabbiato",
-    "spillo", "perno", "PIN",
-    "miglioramento",
-    "campionato", "titolo",
-    "sciocco", "stupido",
-    "aiuto", "aiutare",
-    "cielo",
-    "campo", "intonazione", "lancio", "pece",
-    "uomo",
-    "diamante", "rombo",
-    "la maggior parte", "più",
-    "transizione", "passaggio",
-    "lavoro", "opera", "lavorare",
-    "scienza",
-    "comitato", "commissione",
-    "momento", "istante",
-    "riparare", "fissare", "aggiustare", "imbroglio",
-    "insegnamento", "didattica",
-    "scavare", "frecciatina",
-    "specialista",
-    "complesso", "complessato",
-    "guida", "guidare",
-    "persone", "popolo", "gente",
-    "morto", "spento",
-    "voce",
-    "originale",
-    "pausa", "rompere", "interruzione",
-    "argomento", "tema",
-    "dati",
-    "grado", "laurea",
-    "lettura", "valore letto",
-    "registrazione", "incisione",
-    "mucchio", "mazzo", "gruppo",
-    "raggiungere", "portata",
-    "giudizio", "sentenza",
-    "bugia", "mentire", "sdraiarsi",
-    "regolare", "abituale",
-    "insieme", "set", "ambientazione", "fissare",
-    "dipinto", "pittura",
-    "modalità", "modo",
-    "elenco", "lista",
-    "giocatore", "lettore",
-    "orso", "sopportare", "partorire",
-    "nord", "settentrione",
-    "chiedersi", "meraviglia",
-    "tappeto", "moquette",
-    "pesante", "intenso",
-    "ufficiale", "funzionario", "agente",
-    "negativo",
-    "orologio",
-    "unico",
-    "bambino", "bebè", "neonato",
-    "dolore", "pena",
-    "assunzione", "supposizione",
-    "disco",
-    "ferro", "ferro da stiro", "stirare",
-    "conto", "fattura", "banconota", "bolletta", "disegno di legge",
-    "cassetto", "disegnatore", "traente",
-    "guardare", "sguardo", "aspetto",
-    "doppio", "raddoppiare",
-    "errore", "sbaglio",
-    "finire", "fine", "rifinitura",
-    "futuro", "avvenire",
-    "brillante", "geniale", "luminoso",
-    "contatto", "contattare",
-    "matematica",
-    "riso",
-    "lasciare", "partire", "congedo",
-    "ristorante",
-    "sconto", "scontare",
-    "sesso", "rapporti sessuali",
-    "virus",
-    "briciola", "po'", "bit",
-    "fiducia", "fidarsi", "trust (istituto giuridico)",
-    "evento", "avvenimento",
-    "indossare", "usura", "consumo",
-    "succo", "spremuta",
-    "fallimento", "guasto", "mancanza",
-    "insetto", "bug (errore)", "difetto",
-    "contesto",
-    "fango",
-    "intero", "tutto", "completo",
-    "avvolgere", "involtino", "wrap (panino)",
-    "intenzione", "proposito",
-    "bozza", "leva (militare)", "corrente d'aria",
-    "pressione",
-    "torta", "dolce",
-    "scuro", "buio", "oscuro",
-    "spiegazione",
-    "spazio", "cosmo",
-    "angolo", "angolazione",
-    "parola", "promessa",
-    "efficienza", "rendimento",
-    "gestione", "direzione", "management",
-    "abitudine", "abito",
-    "stella", "diva",
-    "possibilità", "caso", "occasione",
-    "ritrovamento", "constatazione", "risultato",
-    "trasporto", "trasporti",
-    "stare in piedi", "sopportare", "stand (espositore)", "bancarella",
-    "critica", "censura",
-    "flusso", "scorrere",
-    "porta", "portello",
-    "lesione", "infortunio", "ferita",
-    "insetto",
-    "sorpresa", "sorprendere",
-    "appartamento",
-]
+    """Download 'punkt' and 'punkt_tab' if not already installed.
+
+    NLTK >= 3.9 loads the punkt models from 'punkt_tab', older versions from 'punkt'.
+    NLTK looks for them in `RESOURCES_DIR/nltk_data` first, so that they can be bundled with
+    the task and loaded without network access.
+    """
+    nltk_data_dir = os.path.join(RESOURCES_DIR, "nltk_data")
+    if nltk_data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, nltk_data_dir)
+
+    for resource in ("punkt", "punkt_tab"):
+        try:
+            nltk.data.find(f"tokenizers/{resource}")
+        except LookupError:
+            nltk.download(resource)
+
 
 # WORD_LIST = list(set(WORD_LIST_EN + WORD_LIST_IT))
-WORD_LIST = WORD_LIST_IT
+WORD_LIST_FILENAME = "word_list_it.txt"
+
+
+@functools.lru_cache(maxsize=None)
+def get_word_list():
+    """Load the word list used to generate keywords, one word per line."""
+    with open(os.path.join(RESOURCES_DIR, WORD_LIST_FILENAME), "r", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.rstrip("\n")]
+
 
 # ISO 639-1 codes to language names.
 LANGUAGE_CODES = immutabledict.immutabledict(
@@ -3218,6 +178,7 @@ def count_words(text):
 
 @functools.lru_cache(maxsize=None)
 def _get_sentence_tokenizer():
+    download_nltk_resources()
     return nltk.data.load("nltk:tokenizers/punkt/italian.pickle")
 
 
@@ -3228,9 +189,177 @@ def count_sentences(text):
     return len(tokenized_sentences)
 
 
+class LanguageDetectionError(Exception):
+    """The language of a text could not be detected."""
+
+
+class LanguageBackend:
+    """A language identifier: returns the ISO 639-1 code of the language of a text.
+
+    Subclasses implement `detect` and raise `LanguageDetectionError` when a text has no
+    recognizable language (e.g. it has no letters).
+    """
+
+    name = "base"
+
+    def detect(self, text):
+        raise NotImplementedError
+
+
+class LangdetectBackend(LanguageBackend):
+    """langdetect, with a fixed seed so that the same text always gets the same language."""
+
+    name = "langdetect"
+
+    def __init__(self, seed=0):
+        self.seed = int(seed)
+
+    @functools.cached_property
+    def factory(self):
+        factory = DetectorFactory()
+        factory.load_profile(PROFILES_DIRECTORY)
+        factory.seed = self.seed
+        return factory
+
+    def detect(self, text):
+        detector = self.factory.create()
+        detector.append(text)
+        try:
+            return detector.detect()
+        except langdetect.LangDetectException as e:
+            raise LanguageDetectionError(str(e)) from e
+
+
+class FastTextBackend(LanguageBackend):
+    """A fastText language identification model, e.g. `lid.176.ftz`."""
+
+    name = "fasttext"
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+
+    @functools.cached_property
+    def model(self):
+        import fasttext
+
+        return fasttext.load_model(self.model_path)
+
+    def detect(self, text):
+        # fastText predicts one line at a time.
+        text = " ".join(text.split())
+        if not text:
+            raise LanguageDetectionError("empty text")
+        (label,), _ = self.model.predict(text)
+        return label[len("__label__") :]
+
+
+LANGUAGE_BACKENDS = {
+    LangdetectBackend.name: LangdetectBackend,
+    FastTextBackend.name: FastTextBackend,
+}
+
+
+class LanguageIdentifier:
+    """Language identification with a memo of the texts already seen.
+
+    The memo is keyed by a hash of the text, so the same response (and each of its variants)
+    is identified once for the strict and the loose evaluation and all the checkers.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._memo: Dict[bytes, object] = {}
+
+    def detect(self, text):
+        key = hashlib.sha1(text.encode("utf-8", "surrogatepass")).digest()
+        if key not in self._memo:
+            try:
+                self._memo[key] = self.backend.detect(text)
+            except LanguageDetectionError as e:
+                self._memo[key] = e
+        result = self._memo[key]
+        if isinstance(result, LanguageDetectionError):
+            raise result
+        return result
+
+
+def load_language_backend(spec):
+    """Builds a backend from `<name>[:<argument>]`, e.g. `langdetect:0` or `fasttext:lid.176.ftz`."""
+    name, _, argument = spec.partition(":")
+    if name not in LANGUAGE_BACKENDS:
+        raise ValueError(
+            f"Unknown language identification backend {name}, expected one of {list(LANGUAGE_BACKENDS)}."
+        )
+    return LANGUAGE_BACKENDS[name](*([argument] if argument else []))
+
+
+# `langdetect:<seed>` or `fasttext:<model path>`.
+LANGUAGE_BACKEND = os.environ.get("ITABENCH_IFEVAL_LANGID", "langdetect")
+
+
+@functools.lru_cache(maxsize=None)
+def get_language_identifier(spec=None):
+    return LanguageIdentifier(load_language_backend(spec or LANGUAGE_BACKEND))
+
+
+class ResponseAnalysis:
+    """Features of a response, computed the first time a checker needs them.
+
+    The loose evaluation runs every instruction against up to eight variants of a response,
+    and different instructions need the same features of a variant: `analyze_response`
+    returns the same analysis for the same text, so each feature is computed once.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.language_error = None
+
+    @functools.cached_property
+    def num_words(self):
+        return count_words(self.text)
+
+    @functools.cached_property
+    def num_sentences(self):
+        return count_sentences(self.text)
+
+    @functools.cached_property
+    def sentences(self):
+        return tuple(split_into_sentences(self.text))
+
+    @functools.cached_property
+    def word_tokens(self):
+        download_nltk_resources()
+        return tuple(nltk.word_tokenize(self.text))
+
+    @functools.cached_property
+    def language(self):
+        """The language of the text, or None if it could not be detected."""
+        try:
+            return get_language_identifier().detect(self.text)
+        except LanguageDetectionError as e:
+            self.language_error = e
+            return None
+
+    @functools.cached_property
+    def divided_paragraphs(self):
+        """Paragraphs separated by the markdown divider `***`."""
+        return tuple(re.split(r"\s?\*\*\*\s?", self.text))
+
+    @functools.cached_property
+    def paragraphs(self):
+        """Paragraphs separated by two new lines."""
+        return tuple(re.split(r"\n\n", self.text))
+
+
+@functools.lru_cache(maxsize=16)
+def analyze_response(text):
+    """Returns the (shared) analysis of a response."""
+    return ResponseAnalysis(text)
+
+
 def generate_keywords(num_keywords):
     """Randomly generates a few keywords."""
-    return random.sample(WORD_LIST, k=num_keywords)
+    return random.sample(get_word_list(), k=num_keywords)
 
 
 ##### INSTRUCTIONS.PY
@@ -3261,7 +390,6 @@ import re
 import string
 from typing import Dict, Optional, Sequence, Union
 
-import langdetect
 
 logger = logging.getLogger(__name__)
 
@@ -3434,14 +562,14 @@ class ResponseLanguageChecker(Instruction):
         """
         assert isinstance(value, str)
 
-        try:
-            return langdetect.detect(value) == self._language
-        except langdetect.LangDetectException as e:
+        analysis = analyze_response(value)
+        if analysis.language is None:
             # Count as instruction is followed.
             logging.error(
-                "Unable to detect language for text %s due to %s", value, e
+                "Unable to detect language for text %s due to %s", value, analysis.language_error
             )  # refex: disable=pytotw.037
             return True
+        return analysis.language == self._language
 
 
 class NumberOfSentences(Instruction):
@@ -3512,7 +640,7 @@ class NumberOfSentences(Instruction):
             ValueError if the string in `instruction_args` is not in
             [`less_than`, `at_least`].
         """
-        num_sentences = count_sentences(value)
+        num_sentences = analyze_response(value).num_sentences
         if self._comparison_relation == _COMPARISON_RELATION[0]:
             return num_sentences < self._num_sentences_threshold
         elif self._comparison_relation == _COMPARISON_RELATION[1]:
@@ -3677,6 +805,7 @@ class ConstrainedStartChecker(Instruction):
         self._starter = starter.strip() if isinstance(starter, str) else starter
         if self._starter is None:
             self._starter = random.choice(_STARTER_OPTIONS)
+        self._starter_pattern = re.compile(r"^\s*" + self._starter + r".*$", flags=re.MULTILINE)
         self._description_pattern = (
             # "During the conversation, when it is your turn, please always start with {starter}"
             "Durante la conversazione, quando tocca a te, inizia sempre con {starter}"
@@ -3701,10 +830,7 @@ class ConstrainedStartChecker(Instruction):
           True if the response starts with the given phrase or keyword that is
           contained in `instruction_args`; otherwise, False.
         """
-        response_pattern = r"^\s*" + self._starter + r".*$"
-        response_with_constrained_start = re.search(
-            response_pattern, value, flags=re.MULTILINE
-        )
+        response_with_constrained_start = self._starter_pattern.search(value)
         return True if response_with_constrained_start else False
 
 
@@ -3785,6 +911,7 @@ class SectionChecker(Instruction):
         )
         if self._section_spliter is None:
             self._section_spliter = random.choice(_SECTION_SPLITER)
+        self._section_splitter_pattern = re.compile(r"\s?" + self._section_spliter + r"\s?\d+\s?")
 
         self._num_sections = num_sections
         if self._num_sections is None or self._num_sections < 0:
@@ -3833,8 +960,7 @@ class SectionChecker(Instruction):
           True if the number of sections in the response is greater than or equal to
           the minimum number of sections; otherwise, False.
         """
-        section_splitter_patten = r"\s?" + self._section_spliter + r"\s?\d+\s?"
-        sections = re.split(section_splitter_patten, value)
+        sections = self._section_splitter_pattern.split(value)
         num_sections = len(sections) - 1
         return num_sections >= self._num_sections
 
@@ -3883,7 +1009,7 @@ class ParagraphChecker(Instruction):
           True if the actual number of paragraphs is the same as required;
           otherwise, False.
         """
-        paragraphs = re.split(r"\s?\*\*\*\s?", value)
+        paragraphs = analyze_response(value).divided_paragraphs
         num_paragraphs = len(paragraphs)
 
         for index, paragraph in enumerate(paragraphs):
@@ -3917,6 +1043,16 @@ class PostscriptChecker(Instruction):
         if self._postscript_marker is None:
             self._postscript_marker = random.choice(_POSTSCRIPT_MARKER)
 
+        if self._postscript_marker == "P.P.S":
+            postscript_pattern = r"\s*p\.\s?p\.\s?s.*$"
+        elif self._postscript_marker == "P.S.":
+            postscript_pattern = r"\s*p\.\s?s\..*$"
+        elif self._postscript_marker == "N.B.":
+            postscript_pattern = r"\s*N\.\s?B\..*$"
+        else:
+            postscript_pattern = r"\s*" + self._postscript_marker.lower() + r".*$"
+        self._postscript_pattern = re.compile(postscript_pattern, flags=re.MULTILINE)
+
         self._description_pattern = (
             # "At the end of your response, please explicitly add a postscript "
             # + "starting with {postscript}"
@@ -3946,15 +1082,7 @@ class PostscriptChecker(Instruction):
           the keyword containing in the `instruction_args`; otherwise False.
         """
         value = value.lower()
-        if self._postscript_marker == "P.P.S":
-            postscript_pattern = r"\s*p\.\s?p\.\s?s.*$"
-        elif self._postscript_marker == "P.S.":
-            postscript_pattern = r"\s*p\.\s?s\..*$"
-        elif self._postscript_marker == "N.B.":
-            postscript_pattern = r"\s*N\.\s?B\..*$"
-        else:
-            postscript_pattern = r"\s*" + self._postscript_marker.lower() + r".*$"
-        postscript = re.findall(postscript_pattern, value, flags=re.MULTILINE)
+        postscript = self._postscript_pattern.findall(value)
         return True if postscript else False
 
 
@@ -4050,6 +1178,9 @@ class KeywordChecker(Instruction):
         else:
             self._keywords = keywords
         self._keywords = sorted(self._keywords)
+        self._keyword_patterns = [
+            re.compile(keyword, flags=re.IGNORECASE) for keyword in self._keywords
+        ]
 
         # self._description_pattern = "Include keywords {keywords} in the response."
         self._description_pattern = "Includi le parole chiave {keywords} nella risposta."
@@ -4066,8 +1197,8 @@ class KeywordChecker(Instruction):
 
     def check_following(self, value):
         """Check if the response contain the expected keywords."""
-        for keyword in self._keywords:
-            if not re.search(keyword, value, flags=re.IGNORECASE):
+        for keyword_pattern in self._keyword_patterns:
+            if not keyword_pattern.search(value):
                 return False
         return True
 
@@ -4095,6 +1226,7 @@ class KeywordFrequencyChecker(Instruction):
             self._keyword = generate_keywords(num_keywords=1)[0]
         else:
             self._keyword = keyword.strip()
+        self._keyword_pattern = re.compile(self._keyword, flags=re.IGNORECASE)
 
         self._frequency = frequency
         if self._frequency is None or self._frequency < 0:
@@ -4140,7 +1272,7 @@ class KeywordFrequencyChecker(Instruction):
 
     def check_following(self, value):
         """Checks if the response contain the keyword with required frequency."""
-        actual_occurrences = len(re.findall(self._keyword, value, flags=re.IGNORECASE))
+        actual_occurrences = len(self._keyword_pattern.findall(value))
 
         if self._comparison_relation == _COMPARISON_RELATION[0]:
             return actual_occurrences < self._frequency
@@ -4201,7 +1333,7 @@ class NumberOfWords(Instruction):
 
     def check_following(self, value):
         """Checks if the response contains the expected number of words."""
-        num_words = count_words(value)
+        num_words = analyze_response(value).num_words
 
         if self._comparison_relation == _COMPARISON_RELATION[0]:
             return num_words < self._num_words
@@ -4323,7 +1455,7 @@ class ParagraphFirstWordCheck(Instruction):
           word of the specified paragraph is the same as required. Otherwise, false.
         """
 
-        paragraphs = re.split(r"\n\n", value)
+        paragraphs = analyze_response(value).paragraphs
         num_paragraphs = len(paragraphs)
 
         for paragraph in paragraphs:
@@ -4406,7 +1538,7 @@ class KeySentenceChecker(Instruction):
     def check_following(self, value):
         """Checks if the response contains the expected key sentences."""
         count = 0
-        sentences = split_into_sentences(value)
+        sentences = analyze_response(value).sentences
         for sentence in self._key_sentences:
             if sentence in sentences:
                 count += 1
@@ -4435,6 +1567,9 @@ class ForbiddenWords(Instruction):
         else:
             self._forbidden_words = list(set(forbidden_words))
         self._forbidden_words = sorted(self._forbidden_words)
+        self._forbidden_patterns = [
+            re.compile(r"\b" + word + r"\b", flags=re.IGNORECASE) for word in self._forbidden_words
+        ]
         self._description_pattern = (
             # "Do not include keywords {forbidden_words} in the response."
             "Non includere le parole chiave {forbidden_words} nella risposta."
@@ -4452,8 +1587,8 @@ class ForbiddenWords(Instruction):
 
     def check_following(self, value):
         """Check if the response does not contain the expected keywords."""
-        for word in self._forbidden_words:
-            if re.search(r"\b" + word + r"\b", value, flags=re.IGNORECASE):
+        for forbidden_pattern in self._forbidden_patterns:
+            if forbidden_pattern.search(value):
                 return False
         return True
 
@@ -4648,6 +1783,9 @@ class EndChecker(Instruction):
         return value.endswith(self._end_phrase)
 
 
+_TITLE_PATTERN = re.compile(r"<<[^\n]+>>")
+
+
 class TitleChecker(Instruction):
     """Checks the response for a title."""
 
@@ -4670,9 +1808,7 @@ class TitleChecker(Instruction):
 
     def check_following(self, value):
         """Checks if the response contains a title."""
-        pattern = r"<<[^\n]+>>"
-        re_pattern = re.compile(pattern)
-        titles = re.findall(re_pattern, value)
+        titles = _TITLE_PATTERN.findall(value)
 
         for title in titles:
             if title.lstrip("<").rstrip(">").strip():
@@ -4782,14 +1918,16 @@ class CapitalLettersEnglishChecker(Instruction):
         """Checks that the response is in English and in all capital letters."""
         assert isinstance(value, str)
 
-        try:
-            return value.isupper() and langdetect.detect(value) == "it"
-        except langdetect.LangDetectException as e:
+        if not value.isupper():
+            return False
+        analysis = analyze_response(value)
+        if analysis.language is None:
             # Count as instruction is followed.
             logging.error(
-                "Unable to detect language for text %s due to %s", value, e
+                "Unable to detect language for text %s due to %s", value, analysis.language_error
             )  # refex: disable=pytotw.037
             return True
+        return analysis.language == "it"
 
 
 class LowercaseLettersEnglishChecker(Instruction):
@@ -4814,14 +1952,16 @@ class LowercaseLettersEnglishChecker(Instruction):
         """Checks that the response is in English and in all lowercase letters."""
         assert isinstance(value, str)
 
-        try:
-            return value.islower() and langdetect.detect(value) == "it"
-        except langdetect.LangDetectException as e:
+        if not value.islower():
+            return False
+        analysis = analyze_response(value)
+        if analysis.language is None:
             # Count as instruction is followed.
             logging.error(
-                "Unable to detect language for text %s due to %s", value, e
+                "Unable to detect language for text %s due to %s", value, analysis.language_error
             )  # refex: disable=pytotw.037
             return True
+        return analysis.language == "it"
 
 
 class CommaChecker(Instruction):
@@ -4904,7 +2044,7 @@ class CapitalWordFrequencyChecker(Instruction):
     def check_following(self, value):
         """Checks the frequency of words with all capital letters."""
         # Hyphenated words will count as one word
-        words = nltk.word_tokenize(value)
+        words = analyze_response(value).word_tokens
         capital_words = [word for word in words if word.isupper()]
 
         capital_words = len(capital_words)
@@ -5132,15 +2272,23 @@ class OutputExample:
     follow_instruction_list: list[bool]
 
 
-def test_instruction_following_strict(
-        inp,
-        response,
-):
-    """Tests response to see if instructions are followed."""
-    instruction_list = inp.instruction_id_list
-    is_following_list = []
+# Checkers of the instructions of the last documents, shared by the strict and the loose
+# evaluation (which run one after the other on a document), least recently used first.
+_INSTRUCTION_PLANS: collections.OrderedDict[str, list] = collections.OrderedDict()
+INSTRUCTION_PLANS_MAX_SIZE = 64
+
 
-    for index, instruction_id in enumerate(instruction_list):
+def compile_instructions(inp):
+    """Builds the checkers of the instructions of a document, once per document."""
+    plan_key = json.dumps(
+        [inp.key, inp.instruction_id_list, inp.kwargs, inp.prompt], sort_keys=True, default=str
+    )
+    if plan_key in _INSTRUCTION_PLANS:
+        _INSTRUCTION_PLANS.move_to_end(plan_key)
+        return _INSTRUCTION_PLANS[plan_key]
+
+    instructions = []
+    for index, instruction_id in enumerate(inp.instruction_id_list):
         instruction_cls = INSTRUCTION_DICT[instruction_id]
         instruction = instruction_cls(instruction_id)
 
@@ -5150,7 +2298,22 @@ def test_instruction_following_strict(
         args = instruction.get_instruction_args()
         if args and "prompt" in args:
             instruction.build_description(prompt=inp.prompt)
+        instructions.append(instruction)
+
+    _INSTRUCTION_PLANS[plan_key] = instructions
+    if len(_INSTRUCTION_PLANS) > INSTRUCTION_PLANS_MAX_SIZE:
+        _INSTRUCTION_PLANS.popitem(last=False)
+    return instructions
 
+
+def test_instruction_following_strict(
+        inp,
+        response,
+):
+    """Tests response to see if instructions are followed."""
+    is_following_list = []
+
+    for instruction in compile_instructions(inp):
         if response.strip() and instruction.check_following(response):
             is_following_list.append(True)
         else:
@@ -5165,11 +2328,8 @@ def test_instruction_following_strict(
     )
 
 
-def test_instruction_following_loose(
-        inp,
-        response,
-):
-    """Tests response for an upper bound for following instructions."""
+def response_variants(response):
+    """The distinct, non-empty variants of a response checked by the loose evaluation."""
     r = response.split("\n")
     response_remove_first = "\n".join(r[1:]).strip()
     response_remove_last = "\n".join(r[:-1]).strip()
@@ -5178,33 +2338,37 @@ def test_instruction_following_loose(
     revised_response_remove_first = response_remove_first.replace("*", "")
     revised_response_remove_last = response_remove_last.replace("*", "")
     revised_response_remove_both = response_remove_both.replace("*", "")
-    all_responses = [
-        response,
-        revised_response,
-        response_remove_first,
-        response_remove_last,
-        response_remove_both,
-        revised_response_remove_first,
-        revised_response_remove_last,
-        revised_response_remove_both,
+    # The variants often coincide (e.g. a response without `*`): check each text once.
+    return [
+        r
+        for r in dict.fromkeys(
+            [
+                response,
+                revised_response,
+                response_remove_first,
+                response_remove_last,
+                response_remove_both,
+                revised_response_remove_first,
+                revised_response_remove_last,
+                revised_response_remove_both,
+            ]
+        )
+        if r.strip()
     ]
-    instruction_list = inp.instruction_id_list
-    is_following_list = []
 
-    for index, instruction_id in enumerate(instruction_list):
-        instruction_cls = INSTRUCTION_DICT[instruction_id]
-        instruction = instruction_cls(instruction_id)
 
-        # Remove None values from kwargs to avoid unexpected keyword argument errors in build_description method.
-        kwargs = {k: v for k, v in inp.kwargs[index].items() if v}
-        instruction.build_description(**kwargs)
-        args = instruction.get_instruction_args()
-        if args and "prompt" in args:
-            instruction.build_description(prompt=inp.prompt)
+def test_instruction_following_loose(
+        inp,
+        response,
+):
+    """Tests response for an upper bound for following instructions."""
+    all_responses = response_variants(response)
+    is_following_list = []
 
+    for instruction in compile_instructions(inp):
         is_following = False
         for r in all_responses:
-            if r.strip() and instruction.check_following(r):
+            if instruction.check_following(r):
                 is_following = True
                 break
 
@@ -1,12 +1,31 @@
+import functools
+import hashlib
 import logging
-from typing import Dict, List
+import os
+import pickle
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from fractions import Fraction
+from importlib.metadata import version
+from typing import Dict, List, Optional, Tuple
 
 import datasets
 
+try:
+    from itabench.scoring import shared_pool
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the responses are scored in this process, see `_InlinePool`.
+    shared_pool = None
+
 
 try:
     import re
-    import signal
 
     import sympy
     from math_verify import LatexExtractionConfig, parse, verify
@@ -19,6 +38,28 @@ except ModuleNotFoundError:
 
 INVALID_ANSWER = "[invalidanswer]"
 
+# Hard wall-clock limits per item: `math_verify` has its own (shorter) timeouts, the limit of
+# `is_equiv` is the one of the original implementation.
+SCORING_TIMEOUT_SECONDS = 60
+EQUIV_TIMEOUT_SECONDS = 1
+
+MATH_CACHE_DIR = os.environ.get(
+    "ITABENCH_MATH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "itabench", "math_it")
+)
+GOLD_CACHE_VERSION = "1.0"
+VERDICT_CACHE_VERSION = "1.0"
+
+# `lm_eval` executes this file again for every `!function` of the YAML, so the parsed gold
+# answers and the scores computed by `score_responses` are kept in an object shared by all
+# the copies of the module.
+_SHARED = sys.modules.setdefault(
+    "_itabench_math_it", types.SimpleNamespace(scores={}, golds={}, tiers={}, golds_loaded=False)
+)
+SCORES: Dict[Tuple[str, str, str], Dict[str, int]] = _SHARED.scores
+GOLDS: Dict[str, tuple] = _SHARED.golds
+# Tier of `equivalence_tier` that decided `exact_match_original`, for every scored response.
+TIERS: Dict[Tuple[str, str, str], str] = _SHARED.tiers
+
 
 # taken from
 # https://github.com/wellecks/lm-evaluation-harness/blob/master/lm_eval/tasks/minerva_math.py
@@ -37,7 +78,213 @@ def process_docs(dataset: datasets.Dataset) -> datasets.Dataset:
             out_doc["few_shot"] = True
         return out_doc
 
-    return dataset.map(_process_doc).remove_columns(['problem_translation', 'solution_translation']).select(list(range(300)))
+    dataset = dataset.map(_process_doc).remove_columns(['problem_translation', 'solution_translation']).select(list(range(300)))
+    return dataset
+
+
+def _gold_key(solution: str, answer: str) -> str:
+    return hashlib.sha256(f"{solution}\0{answer}".encode()).hexdigest()
+
+
+def _gold_cache_path() -> str:
+    # The parsed forms depend on this file and on the version of `math_verify`.
+    with open(__file__, "rb") as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    key = "\0".join([source_hash, version("math-verify"), GOLD_CACHE_VERSION])
+    fingerprint = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(MATH_CACHE_DIR, f"golds-{fingerprint}.pkl")
+
+
+def _parse_gold(solution: str, answer: str, parsing_timeout: Optional[int] = 5) -> tuple:
+    parsed_answer = parse(
+        solution, extraction_config=[LatexExtractionConfig()], parsing_timeout=parsing_timeout
+    )
+    try:
+        normalized_gold = normalize_final_answer(answer)
+    except Exception:
+        normalized_gold = None
+    return parsed_answer, normalized_gold
+
+
+def load_golds() -> None:
+    """
+    Read the parsed and normalized gold answers stored in `MATH_CACHE_DIR`, once per process.
+    """
+    if _SHARED.golds_loaded:
+        return
+    _SHARED.golds_loaded = True
+    path = _gold_cache_path()
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                GOLDS.update(pickle.load(f))
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+
+def save_golds() -> None:
+    path = _gold_cache_path()
+    try:
+        os.makedirs(MATH_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(GOLDS, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_gold(solution: str, answer: str) -> tuple:
+    """
+    Return the gold answer parsed by `math_verify` and normalized with `normalize_final_answer`
+    (None if it cannot be normalized), parsing it on first use.
+    """
+    load_golds()
+    key = _gold_key(solution, answer)
+    if key not in GOLDS:
+        GOLDS[key] = _parse_gold(solution, answer)
+    return GOLDS[key]
+
+
+class VerdictCache:
+    """
+    Persistent memo of the verdicts of `verify` and of the sympy comparison of `is_equiv`,
+    keyed by the parsed (candidate, gold) pair, so that the same final answers given by
+    different models or checkpoints are compared only once.
+
+    Every process (including the scoring workers) opens its own connection to the database.
+    Errors of the database are ignored and the verdicts are computed again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, verdict INTEGER NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _versions() -> str:
+        # The verdicts depend on the versions of `math_verify` and `sympy`.
+        return f"{version('math-verify')}-{sympy.__version__}-{VERDICT_CACHE_VERSION}"
+
+    def _key(self, kind: str, candidate: str, gold: str) -> str:
+        key = "\0".join([kind, candidate, gold, self._versions()])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, kind: str, candidate: str, gold: str) -> Optional[bool]:
+        try:
+            row = self._connect().execute(
+                "SELECT verdict FROM verdicts WHERE key = ?", (self._key(kind, candidate, gold),)
+            ).fetchone()
+        except (OSError, sqlite3.Error):
+            return None
+        return None if row is None else bool(row[0])
+
+    def set(self, kind: str, candidate: str, gold: str, verdict: bool) -> None:
+        try:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?)",
+                (self._key(kind, candidate, gold), int(verdict)),
+            )
+            connection.commit()
+        except (OSError, sqlite3.Error):
+            pass
+
+
+VERDICTS = VerdictCache(os.path.join(MATH_CACHE_DIR, "verdicts.sqlite"))
+# Verdict of the scoring pool for the comparisons that timed out, which are not memoized.
+TIMED_OUT = "timed out"
+
+
+class _Deadline(BaseException):
+    pass
+
+
+def _raise_deadline(signum, frame):
+    raise _Deadline()
+
+
+class _InlinePool:
+    """
+    Stand-in for the scoring pool of `itabench.scoring`: every item is run in this process,
+    under a `SIGALRM` deadline when this is the main thread.
+    """
+
+    num_workers = 1
+
+    def map(self, function, items: list, timeout: Optional[float] = None, default=None) -> list:
+        use_alarm = (
+            timeout is not None
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        )
+        results = []
+        for args in items:
+            if use_alarm:
+                previous = signal.signal(signal.SIGALRM, _raise_deadline)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                results.append(function(*args))
+            except (Exception, _Deadline):
+                results.append(default)
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                    signal.signal(signal.SIGALRM, previous)
+        return results
+
+
+def _scoring_pool():
+    return shared_pool() if shared_pool is not None else _InlinePool()
+
+
+def cached_verify(
+    parsed_answer: list, parsed_candidate: list, timeout_seconds: Optional[int] = 5
+) -> bool:
+    """
+    Compare with `verify`, reusing the memoized verdict. `verify` returns False when its own
+    timeout fires, so only the verdicts computed without a timeout (under the time limit of
+    the scoring pool) are memoized.
+    """
+    candidate, gold = sympy.srepr(parsed_candidate), sympy.srepr(parsed_answer)
+    verdict = VERDICTS.get("math_verify", candidate, gold)
+    if verdict is None:
+        verdict = bool(verify(parsed_answer, parsed_candidate, timeout_seconds=timeout_seconds))
+        if timeout_seconds is None:
+            VERDICTS.set("math_verify", candidate, gold, verdict)
+    return verdict
+
+
+def cached_sympy_equiv(pairs: List[Tuple[str, str]]) -> List[bool]:
+    """
+    Compare the pairs of normalized answers with sympy in worker processes, reusing the
+    memoized verdicts.
+    """
+    verdicts = [VERDICTS.get("sympy", x1, x2) for x1, x2 in pairs]
+    missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    results = _scoring_pool().map(
+        _is_equiv, [pairs[i] for i in missing], EQUIV_TIMEOUT_SECONDS, TIMED_OUT
+    )
+    for i, result in zip(missing, results):
+        if result is TIMED_OUT:
+            verdicts[i] = False
+        else:
+            verdicts[i] = bool(result)
+            VERDICTS.set("sympy", *pairs[i], verdicts[i])
+    return verdicts
 
 
 def list_fewshot_samples() -> list[dict]:
@@ -67,17 +314,22 @@ def list_fewshot_samples() -> list[dict]:
 
 def process_results(doc: dict, results: List[str]) -> Dict[str, int]:
     candidates = results[0]
+    scores = SCORES.get((candidates, doc["solution"], doc["answer"]))
+    if scores is not None:
+        return dict(scores)
+
     parsed_candidate = parse(candidates)
-    parsed_answer = parse(doc["solution"], extraction_config=[LatexExtractionConfig()])
-    if verify(parsed_answer, parsed_candidate):
+    parsed_answer, _ = get_gold(doc["solution"], doc["answer"])
+    if cached_verify(parsed_answer, parsed_candidate):
         retval = 1
     else:
         retval = 0
 
     try:
-        original = process_result_v1(doc, candidates)
+        original, tier = _process_result_v1(doc, candidates)
     except:  # noqa: E722
-        original = 0
+        original, tier = 0, "invalid"
+    TIERS[(candidates, doc["solution"], doc["answer"])] = tier
 
     output = {
         "exact_match": retval,
@@ -88,16 +340,104 @@ def process_results(doc: dict, results: List[str]) -> Dict[str, int]:
 
 def process_result_v1(doc: dict, candidates: str) -> int:
     # using the orginal answer extraction method
+    return _process_result_v1(doc, candidates)[0]
+
+
+def _process_result_v1(doc: dict, candidates: str) -> Tuple[int, str]:
+    answer, normalized_gold = normalize_result_v1(doc, candidates)
+    if answer == INVALID_ANSWER:
+        return 0, "invalid"
+    equivalent, tier = equivalence_tier(answer, normalized_gold)
+    if equivalent is None:
+        equivalent = is_equiv(answer, normalized_gold)
+    return (1 if equivalent else 0), tier
+
+
+def normalize_result_v1(doc: dict, candidates: str) -> Tuple[str, str]:
     unnormalized_answer = get_unnormalized_answer(candidates)
     answer = normalize_final_answer(unnormalized_answer)
-    normalized_gold = normalize_final_answer(doc["answer"])
-    if answer == INVALID_ANSWER:
-        return 0
-    if answer.strip() == normalized_gold.strip() or is_equiv(answer, normalized_gold):
-        retval = 1
+    if "solution" in doc:
+        normalized_gold = get_gold(doc["solution"], doc["answer"])[1]
+        if normalized_gold is None:
+            raise ValueError(f"Cannot normalize the gold answer {doc['answer']}")
     else:
-        retval = 0
-    return retval
+        normalized_gold = normalize_final_answer(doc["answer"])
+    return answer, normalized_gold
+
+
+def _prepare_scores(candidates: str, solution: str, answer: str, gold: Optional[tuple]) -> tuple:
+    """
+    Score a response up to the `is_equiv` check, which needs a shorter time limit, parsing the
+    gold answer if it is not given.
+
+    Runs under the time limit of the scoring pool, so the timeouts of `math_verify` (which use
+    `SIGALRM` as well) are disabled. Returns the `exact_match` score, the `exact_match_original`
+    score (None if it needs sympy), the pair of normalized answers to compare with sympy, the
+    tier of `equivalence_tier` that decided the score and the gold answer.
+    """
+    if gold is None:
+        gold = _parse_gold(solution, answer, parsing_timeout=None)
+    parsed_answer, normalized_gold = gold
+    parsed_candidate = parse(candidates, parsing_timeout=None)
+    exact_match = 1 if cached_verify(parsed_answer, parsed_candidate, timeout_seconds=None) else 0
+
+    try:
+        normalized = normalize_final_answer(get_unnormalized_answer(candidates))
+    except:  # noqa: E722
+        return exact_match, 0, None, "invalid", gold
+    if normalized == INVALID_ANSWER or normalized_gold is None:
+        return exact_match, 0, None, "invalid", gold
+
+    equivalent, tier = equivalence_tier(normalized, normalized_gold)
+    if equivalent is None:
+        return exact_match, None, (normalized, normalized_gold), tier, gold
+    return exact_match, 1 if equivalent else 0, None, tier, gold
+
+
+def score_responses(resps: List[List[str]], docs: List[dict]) -> List[List[str]]:
+    """
+    Filter that scores all the responses of the task in worker processes and stores the scores
+    for `process_results`. The responses are returned unchanged.
+
+    Responses that cannot be scored in time are left to `process_results`.
+    """
+    eval_logger = logging.getLogger(__name__)
+    start = time.perf_counter()
+
+    keys = [(resp[0], doc["solution"], doc["answer"]) for resp, doc in zip(resps, docs)]
+    keys = list(dict.fromkeys(key for key in keys if key not in SCORES))
+    load_golds()
+    items = [key + (GOLDS.get(_gold_key(*key[1:])),) for key in keys]
+    pool = _scoring_pool()
+    prepared = pool.map(_prepare_scores, items, SCORING_TIMEOUT_SECONDS)
+
+    parsed_golds = False
+    for key, scores in zip(keys, prepared):
+        if scores is not None and _gold_key(*key[1:]) not in GOLDS:
+            GOLDS[_gold_key(*key[1:])] = scores[4]
+            parsed_golds = True
+    if parsed_golds:
+        save_golds()
+
+    pairs = list(dict.fromkeys(p[2] for p in prepared if p is not None and p[2] is not None))
+    equivalent = dict(zip(pairs, cached_sympy_equiv(pairs)))
+
+    for key, scores in zip(keys, prepared):
+        if scores is None:
+            continue
+        exact_match, original, pair, tier, _ = scores
+        if original is None:
+            original = 1 if equivalent[pair] else 0
+        SCORES[key] = {"exact_match": exact_match, "exact_match_original": original}
+        TIERS[key] = tier
+
+    tiers = Counter(TIERS[key] for key in keys if key in TIERS)
+    eval_logger.info(
+        f"Scored {len(keys)} responses ({len(pairs)} sympy comparisons) with "
+        f"{pool.num_workers} workers in {time.perf_counter() - start:.1f}s, "
+        f"decided by: {dict(sorted(tiers.items()))}"
+    )
+    return resps
 
 
 def last_boxed_only_string(string: str) -> str:
@@ -146,58 +486,153 @@ def remove_boxed(s: str) -> str:
         return INVALID_ANSWER
 
 
-class timeout:
-    def __init__(self, seconds=1, error_message="Timeout"):
-        self.seconds = seconds
-        self.error_message = error_message
+_INTEGER = r"(?:0|[1-9]\d*)"
+_DECIMAL_RE = re.compile(rf"-?{_INTEGER}\.\d+")
+_FRACTION_RE = re.compile(rf"\\frac\{{(-?{_INTEGER})\}}\{{(-?{_INTEGER})\}}|({_INTEGER})/({_INTEGER})")
+_RADICAL_RE = re.compile(rf"({_INTEGER})?(?:\\sqrt\{{({_INTEGER})\}})?")
 
-    def handle_timeout(self, signum, frame):
-        raise TimeoutError(self.error_message)
 
-    def __enter__(self):
-        signal.signal(signal.SIGALRM, self.handle_timeout)
-        signal.alarm(self.seconds)
+def _parse_radical(term: str) -> Optional[Tuple[Fraction, int]]:
+    """
+    Parse `a`, `\\sqrt{b}` or `a\\sqrt{b}` as (r, n) with value r * sqrt(n), n square-free.
+    """
+    match = _RADICAL_RE.fullmatch(term)
+    if term == "" or match is None:
+        return None
+    coefficient = int(match.group(1)) if match.group(1) is not None else 1
+    radicand = int(match.group(2)) if match.group(2) is not None else 1
+    if radicand > 10**12:
+        return None
+    if radicand == 0:
+        return Fraction(0), 1
+
+    square_free, factor = 1, 2
+    while factor * factor <= radicand:
+        while radicand % (factor * factor) == 0:
+            coefficient *= factor
+            radicand //= factor * factor
+        if radicand % factor == 0:
+            square_free *= factor
+            radicand //= factor
+        factor += 1
+    return Fraction(coefficient), square_free * radicand
+
+
+def _parse_exact(x: str) -> Optional[Tuple[Fraction, int]]:
+    """
+    Parse an integer, a fraction of integers or a fraction of `a\\sqrt{b}` terms as (r, n) with
+    value r * sqrt(n), n square-free.
+    """
+    sign = 1
+    if x.startswith("-"):
+        sign, x = -1, x[1:]
+
+    match = _FRACTION_RE.fullmatch(x)
+    if match is not None:
+        if match.group(1) is not None:
+            numerator, denominator = match.group(1, 2)
+        else:
+            numerator, denominator = match.group(3, 4)
+        if int(denominator) == 0:
+            return None
+        return sign * Fraction(int(numerator), int(denominator)), 1
+
+    if x.startswith("\\frac{") and x.endswith("}"):
+        numerator, _, denominator = x[len("\\frac{") : -1].partition("}{")
+        numerator, denominator = _parse_radical(numerator), _parse_radical(denominator)
+        if numerator is None or denominator is None or denominator[0] == 0:
+            return None
+        # a sqrt(b) / (c sqrt(d)) = a / (c d) sqrt(b d)
+        value, radicand = _parse_radical(f"\\sqrt{{{numerator[1] * denominator[1]}}}")
+        return sign * numerator[0] * value / (denominator[0] * denominator[1]), radicand
+
+    value = _parse_radical(x)
+    if value is None:
+        return None
+    return sign * value[0], value[1]
+
+
+def equivalence_tier(x1: str, x2: str) -> Tuple[Optional[bool], str]:
+    """
+    Decide whether two normalized answers are equivalent without sympy when possible.
 
-    def __exit__(self, type, value, traceback):
-        signal.alarm(0)
+    The tiers, in order, are: exact match, numbers (integers, decimals and fractions) and
+    radicals (`\\frac` and `\\sqrt` of integers). Every tier only decides the cases where the
+    sympy comparison of `is_equiv` would give the same result, otherwise it returns
+    (None, "sympy").
+    """
+    if x1.strip() == x2.strip():
+        return True, "exact"
+
+    if _DECIMAL_RE.fullmatch(x1) or _DECIMAL_RE.fullmatch(x2):
+        numbers = []
+        for x in (x1, x2):
+            if _DECIMAL_RE.fullmatch(x):
+                # sympy parses decimals with up to 15 digits as double precision floats.
+                if len(x.replace("-", "").replace(".", "").lstrip("0")) > 15:
+                    return None, "sympy"
+                numbers.append(Fraction(x))
+            else:
+                exact = _parse_exact(x)
+                if exact is None or exact[1] != 1:
+                    return None, "sympy"
+                numbers.append(exact[0])
+        if max(abs(number) for number in numbers) >= 10**15:
+            return None, "sympy"
+        if float(numbers[0]) == float(numbers[1]):
+            return True, "numeric"
+        if abs(numbers[0] - numbers[1]) > 1e-9 * max(abs(number) for number in numbers):
+            return False, "numeric"
+        return None, "sympy"
+
+    exact1, exact2 = _parse_exact(x1), _parse_exact(x2)
+    if exact1 is None or exact2 is None:
+        return None, "sympy"
+    tier = "numeric" if exact1[1] == exact2[1] == 1 else "radical"
+    if exact1[0] == 0 or exact2[0] == 0:
+        return exact1[0] == exact2[0], tier
+    return exact1 == exact2, tier
 
 
 def is_equiv(x1: str, x2: str) -> bool:
     """
     x1 and x2 are normalized latex string
     """
+    equivalent, tier = equivalence_tier(x1, x2)
+    if tier != "exact" and equivalent is not None:
+        return equivalent
+    return cached_sympy_equiv([(x1, x2)])[0]
+
+
+def _is_equiv(x1: str, x2: str) -> bool:
     eval_logger = logging.getLogger(__name__)
     try:
-        with timeout(seconds=1):
-            try:
-                parsed_x1 = parse_latex(x1)
-                parsed_x2 = parse_latex(x2)
-            except (
-                sympy.parsing.latex.errors.LaTeXParsingError,
-                sympy.SympifyError,
-                TypeError,
-            ):
-                eval_logger.debug(f"couldn't parse one of {x1} or {x2}")
+        try:
+            parsed_x1 = parse_latex(x1)
+            parsed_x2 = parse_latex(x2)
+        except (
+            sympy.parsing.latex.errors.LaTeXParsingError,
+            sympy.SympifyError,
+            TypeError,
+        ):
+            eval_logger.debug(f"couldn't parse one of {x1} or {x2}")
+            return False
+
+        try:
+            diff = parsed_x1 - parsed_x2
+        except TypeError:
+            eval_logger.debug(f"couldn't subtract {x1} and {x2}")
+            return False
+
+        try:
+            if sympy.simplify(diff) == 0:
+                return True
+            else:
                 return False
-
-            try:
-                diff = parsed_x1 - parsed_x2
-            except TypeError:
-                eval_logger.debug(f"couldn't subtract {x1} and {x2}")
-                return False
-
-            try:
-                if sympy.simplify(diff) == 0:
-                    return True
-                else:
-                    return False
-            except ValueError:
-                eval_logger.debug(
-                    f"Had some trouble simplifying when comparing {x1} and {x2}"
-                )
-    except TimeoutError:
-        eval_logger.debug(f"Timed out comparing {x1} and {x2}")
-        return False
+        except ValueError:
+            eval_logger.debug(
+                f"Had some trouble simplifying when comparing {x1} and {x2}"
+            )
     except ImportError as e:
         eval_logger.error(e)
         raise
@@ -207,6 +642,15 @@ def is_equiv(x1: str, x2: str) -> bool:
 
 
 def get_unnormalized_answer(text: str) -> str:
+    # The few-shot examples (and the stop pattern of the task) end with the Italian sentence,
+    # which can be cut after the answer; the English one of the original task is the fallback.
+    match = re.search(
+        r"Risposta finale: [Ll]a risposta finale è(.*?). Spero sia corretta.",
+        text + " Spero sia corretta.",
+    )
+    if match:
+        return match.group(1).strip()
+
     end_seq = "I hope it is correct."
     text += end_seq
     match = re.search(
@@ -288,7 +732,7 @@ def normalize_final_answer(final_answer: str) -> str:
 
     for before, after in SUBSTITUTIONS:
         final_answer = final_answer.replace(before, after)
-    for expr in REMOVED_EXPRESSIONS:
+    for expr in REMOVED_EXPRESSIONS_IT:
         final_answer = final_answer.replace(expr, "")
 
     # Extract answer that is in LaTeX math, is bold,
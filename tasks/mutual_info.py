@@ -0,0 +1,50 @@
+"""
+Multiple-choice tasks that also report the accuracy calibrated by mutual information.
+
+`acc_mutual_info` picks the choice that maximises log P(choice | context) - log P(choice):
+for every document, `lm_eval` adds a request for the loglikelihood of each choice without
+context. When the choices are the same for all the documents (e.g. "Sì"/"No"), these
+requests are identical across the documents and the tasks, so `itabench run` sends them to
+the model once per run and keeps the answers in its results cache.
+
+Use it with `class: !function <path>/mutual_info.MutualInfoTask` and an `acc_mutual_info`
+entry in the `metric_list` of the task.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from lm_eval.api.task import ConfigurableTask
+
+
+class MutualInfoTask(ConfigurableTask):
+    def __init__(self, config=None, **kwargs) -> None:
+        # `class` is read by the task manager, and is not a field of `TaskConfig`.
+        config = {key: value for key, value in (config or {}).items() if key != "class"}
+        super().__init__(config=config, **kwargs)
+
+    def process_results(self, doc: dict, results: List[Tuple[float, bool]]) -> dict:
+        """
+        Compute `acc`, `acc_norm` and `acc_mutual_info` as `lm_eval` does.
+
+        The conditional loglikelihoods come first in `results`, then the unconditional ones
+        (`lm_eval` 0.4.8 reads them interleaved, which mixes the two).
+        """
+        choices = self.doc_to_choice(doc)
+        if len(results) != 2 * len(choices):
+            return super().process_results(doc, results)
+
+        lls = np.array([ll for ll, _ in results[: len(choices)]])
+        lls_unconditional = np.array([ll for ll, _ in results[len(choices) :]])
+        completion_len = np.array([float(len(choice)) for choice in choices])
+
+        gold = self.doc_to_target(doc)
+        if isinstance(gold, str):
+            gold = choices.index(gold)
+
+        scores = {
+            "acc": 1.0 if np.argmax(lls) == gold else 0.0,
+            "acc_norm": 1.0 if np.argmax(lls / completion_len) == gold else 0.0,
+            "acc_mutual_info": 1.0 if np.argmax(lls - lls_unconditional) == gold else 0.0,
+        }
+        return {metric: scores[metric] for metric in self._metric_fn_list if metric in scores}
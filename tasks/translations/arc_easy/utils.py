@@ -1,5 +1,15 @@
+from typing import Optional
+
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 QUERY_PREFIX = {
     "default": {
         "en": "Question: {input}",
@@ -22,42 +32,46 @@ def process_docs(
     source_language: str,
     target_language: str,
     template="default",
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    if source_language == "en":
+        input_column, choices_column = "input", "choices"
+    else:
+        input_column, choices_column = "input_translation", "choices_translation"
 
-    def _process_doc(doc):
+    def _process_docs(docs):
+        queries = []
+        all_choices = []
 
-        if source_language == "en":
-            input = doc["input"]
-            choices = doc["choices"]
-        else:
-            input = doc["input_translation"]
-            choices = doc["choices_translation"]
+        for input, choices in zip(docs[input_column], docs[choices_column]):
+            if template == "with_choices":
+                labels = ["A", "B", "C", "D", "E"][: len(choices)]
+                choices = [f"* {label}. {choice}" for choice, label in zip(choices, labels)]
 
-        if template == "with_choices":
-            labels = ["A", "B", "C", "D", "E"][: len(choices)]
-            choices = [f"* {label}. {choice}" for choice, label in zip(choices, labels)]
+                query = QUERY_PREFIX[template][source_language].format(
+                    input=input,
+                    choices="\n".join(choices),
+                )
 
-            query = QUERY_PREFIX[template][source_language].format(
-                input=input,
-                choices="\n".join(choices),
-            )
+            else:
+                query = QUERY_PREFIX[template][source_language].format(input=input)
 
-        else:
-            query = QUERY_PREFIX[template][source_language].format(input=input)
+            query += "\n" + ANSWER_PREFIX[target_language]
 
-        query += "\n" + ANSWER_PREFIX[target_language]
+            queries.append(query)
+            all_choices.append(choices if template == "default" else labels)
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices if template == "default" else labels,
-            "gold": int(doc["label"]),
+            "query": queries,
+            "choices": all_choices,
+            "gold": [int(label) for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc)
+    task_name = f"arc_easy_{template}_{source_language}-{target_language}"
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 # Custom methods to use the ARC-Easy dataset for perplexity evaluation.
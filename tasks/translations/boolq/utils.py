@@ -1,5 +1,15 @@
+from typing import Optional
+
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 PASSAGE_PREFIX = {
     "en": "Context: {passage}",
     "it": "Contesto: {passage}",
@@ -28,44 +38,41 @@ def process_docs(
     source_language: str,
     target_language: str,
     add_passage: bool = False,
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
+    passage_key = "passage" if source_language == "en" else "passage_translation"
 
-    def _process_doc(doc):
-        category = doc["metadata"]["category"]
-
-        query = QUERY_PREFIX[category][source_language]
+    def _process_docs(docs):
+        queries = []
 
-        if source_language == "en":
-            query = query.format(input=doc["input"])
-        else:
-            query = query.format(input=doc["input_translation"])
+        for input, metadata in zip(docs[input_column], docs["metadata"]):
+            query = QUERY_PREFIX[metadata["category"]][source_language]
+            query = query.format(input=input)
 
-        if add_passage:
-            passage_prefix = PASSAGE_PREFIX[source_language]
-            if source_language == "en":
-                passage = doc["metadata"]["passage"]
-            else:
-                passage = doc["metadata"]["passage_translation"]
+            if add_passage:
+                passage = metadata[passage_key]
+                if passage:
+                    passage = PASSAGE_PREFIX[source_language].format(passage=passage)
+                    query = passage + "\n" + query
 
-            if passage:
-                passage = passage_prefix.format(passage=passage)
-                query = passage + "\n" + query
-
-        query += "\n" + ANSWER_PREFIX[target_language]
-
-        choices = CHOICES[target_language]
+            query += "\n" + ANSWER_PREFIX[target_language]
+            queries.append(query)
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": 0 if doc["label"] else 1,
+            "query": queries,
+            "choices": [CHOICES[target_language]] * len(queries),
+            "gold": [0 if label else 1 for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc)
+    task_name = f"boolq_{source_language}-{target_language}"
+    if add_passage:
+        task_name = f"boolq_with_passages_{source_language}-{target_language}"
+
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 def process_docs_it_it(dataset: datasets.Dataset) -> datasets.Dataset:
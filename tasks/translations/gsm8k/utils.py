@@ -1,5 +1,15 @@
+from typing import Optional
+
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 QUERY_PREFIX = {
     "en": "Question: ",
     "it": "Domanda: ",
@@ -16,46 +26,42 @@ def process_docs(
     source_language: str,
     target_language: str,
     output_type: str = "multiple_choice",
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    if source_language == "en":
+        input_column, choices_column = "input", "choices"
+    else:
+        input_column, choices_column = "input_translation", "choices_translation"
 
-    def _process_doc(doc):
-        if source_language == "en":
-            query = QUERY_PREFIX[source_language] + doc["input"]
-            choices = doc["choices"]
-        else:
-            query = QUERY_PREFIX[source_language] + doc["input_translation"]
-            choices = doc["choices_translation"]
+    explanation_key = "explanation" if target_language == "en" else "explanation_translation"
 
-        query += "\n" + ANSWER_PREFIX[target_language]
-        result = doc["label"]
+    def _process_docs(docs):
+        queries = [
+            QUERY_PREFIX[source_language] + input + "\n" + ANSWER_PREFIX[target_language]
+            for input in docs[input_column]
+        ]
 
         if output_type == "multiple_choice":
-
             return {
-                "id": doc["id"],
-                "query": query,
-                "choices": choices,
-                "gold": 0,
+                "query": queries,
+                "choices": docs[choices_column],
+                "gold": [0] * len(queries),
             }
 
         else:
-            if target_language == "en":
-                explanation = doc["metadata"]["explanation"]
-            else:
-                explanation = doc["metadata"]["explanation_translation"]
-
-            answer = f"{explanation} #### {result}"
-
             return {
-                "id": doc["id"],
-                "query": query,
-                "answer": answer,
+                "query": queries,
+                "answer": [
+                    f"{metadata[explanation_key]} #### {result}"
+                    for metadata, result in zip(docs["metadata"], docs["label"])
+                ],
             }
 
-    return dataset.map(_process_doc)
+    task_name = f"gsm8k_{output_type}_{source_language}-{target_language}"
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 def process_docs_it_it(dataset: datasets.Dataset) -> datasets.Dataset:
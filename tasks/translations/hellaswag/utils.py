@@ -1,7 +1,16 @@
 import re
+from typing import Optional
 
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 
 def preprocess(text):
     """
@@ -18,36 +27,28 @@ def process_docs(
     dataset: datasets.Dataset,
     source_language: str,
     target_language: str,
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
+    choices_column = "choices" if target_language == "en" else "choices_translation"
+    # activity_label = "activity_label" if source_language == "en" else "activity_label_translation"
 
-    def _process_doc(doc):
-        if source_language == "en":
-            query = doc["input"]
-            # activity_label = doc["metadata"]["activity_label"]
-        else:
-            query = doc["input_translation"]
-            # activity_label = doc["metadata"]["activity_label_translation"]
-
-        if target_language == "en":
-            choices = doc["choices"]
-        else:
-            choices = doc["choices_translation"]
-
+    def _process_docs(docs):
         # query = activity_label + ": " + preprocess(query)
-        query = preprocess(query)
-        choices = [preprocess(choice) for choice in choices]
-
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": int(doc["label"]),
+            "query": [preprocess(query) for query in docs[input_column]],
+            "choices": [
+                [preprocess(choice) for choice in choices]
+                for choices in docs[choices_column]
+            ],
+            "gold": [int(label) for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc)
+    task_name = f"hellaswag_{source_language}-{target_language}"
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 def process_docs_it_it(dataset: datasets.Dataset) -> datasets.Dataset:
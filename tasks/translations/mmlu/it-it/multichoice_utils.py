@@ -1,4 +1,17 @@
+import json
+import os
+from typing import Optional
+
 import datasets
+import pyarrow.compute as pc
+
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
 
 QUERY_PREFIX = {
     "cloze": {
@@ -16,6 +29,54 @@ ANSWER_PREFIX = {
     "it": "Risposta:",
 }
 
+SUBJECT_INDEX_FILENAME = "itabench-mmlu-subjects-{fingerprint}.json"
+
+_SUBJECT_INDEXES = {}
+
+
+def get_subject_index(dataset: datasets.Dataset) -> dict:
+    """
+    Map each subject to the indices of its rows in the dataset.
+
+    The index is built with a single pass over the `metadata.subject` column, once per
+    dataset fingerprint, and stored next to the Arrow cache files of the dataset so that
+    every subject task (and every template and language direction) can reuse it.
+    """
+    fingerprint = dataset._fingerprint
+    if fingerprint in _SUBJECT_INDEXES:
+        return _SUBJECT_INDEXES[fingerprint]
+
+    index_path = None
+    if dataset.cache_files:
+        cache_dir = os.path.dirname(dataset.cache_files[0]["filename"])
+        index_path = os.path.join(
+            cache_dir, SUBJECT_INDEX_FILENAME.format(fingerprint=fingerprint)
+        )
+
+    if index_path is not None and os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            subject_index = json.load(f)
+    else:
+        table = dataset.select_columns(["metadata"]).with_format("arrow")[: len(dataset)]
+        subjects = pc.struct_field(table.column("metadata"), "subject").to_pylist()
+
+        subject_index = {}
+        for row_index, row_subject in enumerate(subjects):
+            subject_index.setdefault(row_subject, []).append(row_index)
+
+        if index_path is not None:
+            # The cache directory may be read-only, in which case the index is only kept in memory.
+            try:
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(subject_index, f)
+                os.replace(tmp_path, index_path)
+            except OSError:
+                pass
+
+    _SUBJECT_INDEXES[fingerprint] = subject_index
+    return subject_index
+
 
 def process_docs(
     dataset: datasets.Dataset,
@@ -23,66 +84,62 @@ def process_docs(
     target_language: str,
     template="cloze",
     subject=None,
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
 
-    def _process_doc_cloze(doc):
-        query = QUERY_PREFIX["cloze"][source_language]
-
-        if source_language == "en":
-            input = doc["input"]
-        else:
-            input = doc["input_translation"]
-
-        query = query.format(input=input)
-        query += "\n" + ANSWER_PREFIX[target_language]
-
-        if target_language == "en":
-            choices = doc["choices"]
-        else:
-            choices = doc["choices_translation"]
+    def _process_docs_cloze(docs):
+        choices_column = "choices" if target_language == "en" else "choices_translation"
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": int(doc["label"]),
+            "query": [
+                QUERY_PREFIX["cloze"][source_language].format(input=input)
+                + "\n"
+                + ANSWER_PREFIX[target_language]
+                for input in docs[input_column]
+            ],
+            "choices": docs[choices_column],
+            "gold": [int(label) for label in docs["label"]],
         }
 
-    def _process_doc_multichoice(doc):
-        query = QUERY_PREFIX["multichoice"][source_language]
+    def _process_docs_multichoice(docs):
+        choices_column = "choices" if source_language == "en" else "choices_translation"
 
-        if source_language == "en":
-            input = doc["input"]
-            choices = doc["choices"]
-        else:
-            input = doc["input_translation"]
-            choices = doc["choices_translation"]
+        queries = []
+        all_labels = []
 
-        choices = [c[:-1] if c.endswith(".") else c for c in choices]
+        for input, choices in zip(docs[input_column], docs[choices_column]):
+            choices = [c[:-1] if c.endswith(".") else c for c in choices]
 
-        labels = ["A", "B", "C", "D"][: len(choices)]
-        choices = [f"{label}. {choice}" for choice, label in zip(choices, labels)]
+            labels = ["A", "B", "C", "D"][: len(choices)]
+            choices = [f"{label}. {choice}" for choice, label in zip(choices, labels)]
 
-        query = query.format(input=input, choices="\n".join(choices))
-        query += "\n" + ANSWER_PREFIX[target_language]
+            query = QUERY_PREFIX["multichoice"][source_language]
+            query = query.format(input=input, choices="\n".join(choices))
+            query += "\n" + ANSWER_PREFIX[target_language]
+
+            queries.append(query)
+            all_labels.append(labels)
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": labels,
-            "gold": int(doc["label"]),
+            "query": queries,
+            "choices": all_labels,
+            "gold": [int(label) for label in docs["label"]],
         }
 
     if subject is not None:
-        dataset = dataset.filter(lambda x: x["metadata"]["subject"] == subject)
+        dataset = dataset.select(get_subject_index(dataset).get(subject, []))
+
+    task_name = f"mmlu_{template}_{subject or 'all'}_{source_language}-{target_language}"
+    map_kwargs = {"batched": True, "num_proc": num_proc}
 
     if template == "cloze":
-        return dataset.map(_process_doc_cloze)
+        return cached_map(dataset, _process_docs_cloze, task_name, **map_kwargs)
     elif template == "multichoice":
-        return dataset.map(_process_doc_multichoice)
+        return cached_map(dataset, _process_docs_multichoice, task_name, **map_kwargs)
     else:
         raise ValueError(f"Unknown template: {template}")
 
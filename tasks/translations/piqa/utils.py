@@ -1,7 +1,16 @@
 import re
+from typing import Optional
 
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 QUERY_PREFIX = {
     "question": {
         "en": "Question: {input}\n",
@@ -45,35 +54,32 @@ def process_docs(
     dataset: datasets.Dataset,
     source_language: str,
     target_language: str,
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
+    choices_column = "choices" if target_language == "en" else "choices_translation"
 
-    def _process_doc(doc):
-        category = doc["metadata"]["category"]
-
-        if source_language == "en":
-            input = doc["input"]
-        else:
-            input = doc["input_translation"]
+    def _process_docs(docs):
+        queries = []
 
-        if target_language == "en":
-            choices = doc["choices"]
-        else:
-            choices = doc["choices_translation"]
+        for input, metadata in zip(docs[input_column], docs["metadata"]):
+            category = metadata["category"]
 
-        query = QUERY_PREFIX[category][source_language].format(input=input)
-        query += ANSWER_PREFIX[category][target_language]
+            query = QUERY_PREFIX[category][source_language].format(input=input)
+            query += ANSWER_PREFIX[category][target_language]
+            queries.append(query)
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": int(doc["label"]),
+            "query": queries,
+            "choices": docs[choices_column],
+            "gold": [int(label) for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc)
+    task_name = f"piqa_{source_language}-{target_language}"
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 def process_docs_it_it(dataset: datasets.Dataset) -> datasets.Dataset:
@@ -1,7 +1,16 @@
 import re
+from typing import Optional
 
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 QUERY_PREFIX = {
     "en": "Question: {input}\n",
     "it": "Domanda: {input}\n",
@@ -23,39 +32,40 @@ def process_docs(
     source_language: str,
     target_language: str,
     add_passage: bool = False,
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
+    passage_key = "passage" if source_language == "en" else "passage_translation"
+    choices_column = "choices" if target_language == "en" else "choices_translation"
 
-    def _process_doc(doc):
-        if source_language == "en":
-            input = doc["input"]
-            passage = doc["metadata"]["passage"]
-        else:
-            input = doc["input_translation"]
-            passage = doc["metadata"]["passage_translation"]
+    def _process_docs(docs):
+        queries = []
 
-        if target_language == "en":
-            choices = doc["choices"]
-        else:
-            choices = doc["choices_translation"]
+        for input, metadata in zip(docs[input_column], docs["metadata"]):
+            query = QUERY_PREFIX[source_language].format(input=input)
+            query += ANSWER_PREFIX[target_language]
 
-        query = QUERY_PREFIX[source_language].format(input=input)
-        query += ANSWER_PREFIX[target_language]
+            passage = metadata[passage_key]
+            if add_passage and passage:
+                passage = PASSAGE_PREFIX[source_language].format(passage=passage)
+                query = passage + query
 
-        if add_passage and passage:
-            passage = PASSAGE_PREFIX[source_language].format(passage=passage)
-            query = passage + query
+            queries.append(query)
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": int(doc["label"]),
+            "query": queries,
+            "choices": docs[choices_column],
+            "gold": [int(label) for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc)
+    task_name = f"sciq_{source_language}-{target_language}"
+    if add_passage:
+        task_name = f"sciq_with_passages_{source_language}-{target_language}"
+
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 def process_docs_it_it(dataset: datasets.Dataset) -> datasets.Dataset:
@@ -1,6 +1,16 @@
+from typing import Optional
+
 import datasets
 import numpy as np
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 QUERY_PREFIX = {
     "en": "Question: {input}\n",
     "it": "Domanda: {input}\n",
@@ -17,33 +27,27 @@ def process_docs(
     source_language: str,
     target_language: str,
     mc_type: str = "mc1",
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
+    choices_column = "choices" if target_language == "en" else "choices_translation"
 
-    def _process_doc(doc):
-        if source_language == "en":
-            input = doc["input"]
-        else:
-            input = doc["input_translation"]
-
-        if target_language == "en":
-            choices = doc["choices"][mc_type]
-        else:
-            choices = doc["choices_translation"][mc_type]
-
-        query = QUERY_PREFIX[source_language].format(input=input)
-        query += ANSWER_PREFIX[target_language]
-
+    def _process_docs(docs):
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": doc["label"][mc_type],
+            "query": [
+                QUERY_PREFIX[source_language].format(input=input)
+                + ANSWER_PREFIX[target_language]
+                for input in docs[input_column]
+            ],
+            "choices": [choices[mc_type] for choices in docs[choices_column]],
+            "gold": [label[mc_type] for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc)
+    task_name = f"truthful_qa_{mc_type}_{source_language}-{target_language}"
+    return cached_map(dataset, _process_docs, task_name, batched=True, num_proc=num_proc)
 
 
 def process_results_mc2(doc, results):
@@ -1,5 +1,15 @@
+from typing import Optional
+
 import datasets
 
+try:
+    from itabench.docs_cache import cached_map
+except ImportError:
+    # Without the `itabench` package (e.g. `lm_eval --include_path tasks` from another
+    # directory), the processed docs are not cached.
+    def cached_map(dataset, function, task_name, **map_kwargs):
+        return dataset.map(function, **map_kwargs)
+
 QUERY_PREFIX = {
     "en": "{input}",
     "it": "{input}",
@@ -15,43 +25,45 @@ def process_docs(
     dataset: datasets.Dataset,
     source_language: str,
     target_language: str,
+    num_proc: Optional[int] = None,
 ) -> datasets.Dataset:
     """
     Prepare the dataset and builds the prompt using the source and target languages.
     """
+    input_column = "input" if source_language == "en" else "input_translation"
+    choices_column = "choices" if target_language == "en" else "choices_translation"
 
-    def _process_doc(doc):
-        if source_language == "en":
-            input = doc["input"]
-        else:
-            input = doc["input_translation"]
+    def _process_docs(docs):
+        queries = []
+        all_choices = []
 
-        if target_language == "en":
-            choices = doc["choices"]
-        else:
-            choices = doc["choices_translation"]
+        for input, choices in zip(docs[input_column], docs[choices_column]):
+            # Split on the first underscore to get the target text.
+            idx = input.index("_")
+            input, target_text = input[:idx], input[idx + 1 :]
+            input = input.strip() + " "
+            target_text = target_text.strip()
 
-        # Split on the first underscore to get the target text.
-        idx = input.index("_")
-        input, target_text = input[:idx], input[idx + 1 :]
-        input = input.strip() + " "
-        target_text = target_text.strip()
+            query = QUERY_PREFIX[source_language].format(input=input)
+            query += ANSWER_PREFIX[target_language]
 
-        query = QUERY_PREFIX[source_language].format(input=input)
-        query += ANSWER_PREFIX[target_language]
+            choices = [choice.strip() for choice in choices]
+            # TODO: This may not be the best for languages without spaces.
+            choices = [choice + " " + target_text for choice in choices]
 
-        choices = [choice.strip() for choice in choices]
-        # TODO: This may not be the best for languages without spaces.
-        choices = [choice + " " + target_text for choice in choices]
+            queries.append(query)
+            all_choices.append(choices)
 
         return {
-            "id": doc["id"],
-            "query": query,
-            "choices": choices,
-            "gold": int(doc["label"]),
+            "query": queries,
+            "choices": all_choices,
+            "gold": [int(label) for label in docs["label"]],
         }
 
-    return dataset.map(_process_doc).filter(lambda x: x["query"].strip() != "")
+    task_name = f"winogrande_{source_language}-{target_language}"
+    return cached_map(
+        dataset, _process_docs, task_name, batched=True, num_proc=num_proc
+    ).filter(lambda x: x["query"].strip() != "")
 
 
 def process_docs_it_it(dataset: datasets.Dataset) -> datasets.Dataset:
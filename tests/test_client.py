@@ -0,0 +1,119 @@
+"""
+`itabench-completions` against a local stub of an OpenAI-compatible server that answers 503
+once it has `CAPACITY` requests in flight.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import types
+
+import pytest
+import transformers
+from lm_eval.api.instance import Instance
+
+from itabench import client
+
+# Optional, like in the client itself.
+web = pytest.importorskip("aiohttp.web")
+
+CAPACITY = 4
+INITIAL_CONCURRENT = 16
+BACKOFF = 0.02
+N_REQUESTS = 200
+
+
+@pytest.fixture
+def stub_server():
+    state = {"in_flight": 0, "max_in_flight": 0, "rejected": 0, "arrivals": {}}
+
+    async def completions(request):
+        body = await request.json()
+        state["arrivals"].setdefault(body["prompt"], []).append(time.monotonic())
+        if state["in_flight"] >= CAPACITY:
+            state["rejected"] += 1
+            return web.Response(status=503, text="busy")
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            state["in_flight"] -= 1
+        text = f" answer to {body['prompt']}\nDomanda: more"
+        return web.json_response(
+            {"choices": [{"index": 0, "text": text}], "usage": {"completion_tokens": 4}}
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/completions", completions)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{port}/v1", state
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.run_until_complete(runner.cleanup())
+    loop.close()
+
+
+def test_generate_until_against_an_overloaded_server(stub_server, monkeypatch):
+    base_url, state = stub_server
+    tokenizer = types.SimpleNamespace(eos_token_id=None, name_or_path="stub", chat_template=None)
+    monkeypatch.setattr(
+        transformers.AutoTokenizer, "from_pretrained", lambda *args, **kwargs: tokenizer
+    )
+    # No jitter, so that the delays between the attempts of a request are the backoff.
+    monkeypatch.setattr(random, "uniform", lambda low, high: 1.0)
+
+    limits = []
+
+    class RecordingWindow(client.AdaptiveWindow):
+        async def release(self, epoch, overloaded=False):
+            await super().release(epoch, overloaded)
+            limits.append(self.limit)
+
+    monkeypatch.setattr(client, "AdaptiveWindow", RecordingWindow)
+
+    lm = client.AsyncCompletionsLM(
+        base_url=base_url,
+        model="stub",
+        initial_concurrent=INITIAL_CONCURRENT,
+        max_concurrent=64,
+        max_retries=20,
+        backoff=BACKOFF,
+        max_backoff=BACKOFF * 2**4,
+    )
+    streamed = []
+    lm.on_answer = lambda i, answer: streamed.append((i, answer))
+
+    gen_kwargs = {"until": ["Domanda:"], "max_gen_toks": 16, "do_sample": False}
+    prompts = [f"prompt {i:04d}" for i in range(N_REQUESTS)]
+    requests = [
+        Instance("generate_until", {}, (prompt, dict(gen_kwargs)), idx=0) for prompt in prompts
+    ]
+    answers = lm.generate_until(requests, disable_tqdm=True)
+
+    # In the order of the requests, cut at the stop sequence.
+    assert answers == [f" answer to {prompt}\n" for prompt in prompts]
+    # Every answer was streamed once, with its index.
+    assert sorted(streamed) == list(enumerate(answers))
+
+    # The server was overloaded, the window shrank below its initial size.
+    assert state["rejected"] > 0
+    assert state["max_in_flight"] <= CAPACITY
+    assert min(limits) < INITIAL_CONCURRENT
+
+    # Every rejected request was retried, after an exponentially growing delay.
+    retried = [times for times in state["arrivals"].values() if len(times) > 1]
+    assert sum(len(times) - 1 for times in retried) == state["rejected"]
+    for times in retried:
+        for attempt, (before, after) in enumerate(zip(times, times[1:])):
+            assert after - before >= min(BACKOFF * 2**attempt, BACKOFF * 2**4) * 0.9
@@ -0,0 +1,36 @@
+"""
+Importing the utils of IFEval-IT must not download the NLTK resources or touch the network:
+`lm_eval` imports it whenever it indexes the task tree.
+"""
+
+import os
+import socket
+import time
+
+import nltk
+
+from itabench.tasks import TASKS_DIR, load_module
+
+IFEVAL_UTILS = os.path.join(TASKS_DIR, "leaderboard_it", "ifeval_it", "utils.py")
+# Seconds; the word list, the NLTK models and the language profiles are loaded on first use.
+IMPORT_TIME_LIMIT = 5.0
+
+
+def test_import_is_offline_and_fast(monkeypatch, tmp_path):
+    def blocked_connect(self, address):
+        raise OSError(f"network access during the import: {address}")
+
+    downloads = []
+    monkeypatch.setattr(socket.socket, "connect", blocked_connect)
+    monkeypatch.setattr(nltk, "download", lambda *args, **kwargs: downloads.append(args))
+    # No NLTK data installed: any lookup at import time would ask for a download.
+    monkeypatch.setattr(nltk.data, "path", [str(tmp_path)])
+    monkeypatch.setenv("ITABENCH_IFEVAL_RESOURCES", str(tmp_path))
+
+    start = time.perf_counter()
+    module = load_module(IFEVAL_UTILS)
+    elapsed = time.perf_counter() - start
+
+    assert downloads == []
+    assert elapsed < IMPORT_TIME_LIMIT
+    assert callable(module.process_results)
@@ -0,0 +1,82 @@
+"""
+`DatasetPrefetcher` with a fake `load_dataset`: the byte budget, the datasets handed back to
+the caller and the release of the datasets after their last user.
+"""
+
+import threading
+import types
+
+from itabench.prefetch import LOADING, SKIPPED, DatasetPrefetcher, dataset_key
+
+MB = 2**20
+
+
+class FakeLoader:
+    """
+    `load_dataset` whose datasets have the given sizes, and whose loads can be held back.
+    """
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.loaded = []
+        self.release = {path: threading.Event() for path in sizes}
+        self.started = {path: threading.Event() for path in sizes}
+
+    def __call__(self, path, name=None):
+        self.started[path].set()
+        self.release[path].wait(timeout=10)
+        self.loaded.append(path)
+        return types.SimpleNamespace(path=path, data=types.SimpleNamespace(nbytes=self.sizes[path]))
+
+
+def test_budget_blocks_loading_and_releases_after_last_user():
+    loader = FakeLoader({"a": 3 * MB, "b": 1 * MB})
+    for event in loader.release.values():
+        event.set()
+    # "a" is used by two tasks, then "b"; only one dataset fits in the budget.
+    arguments = [{"path": "a"}, {"path": "a"}, {"path": "b"}]
+    prefetcher = DatasetPrefetcher(loader, arguments, max_workers=2, max_bytes=2 * MB)
+    try:
+        assert loader.started["a"].wait(timeout=10)
+        prefetcher.futures[dataset_key({"path": "a"})].result(timeout=10)
+        # "a" is over the budget: "b" waits for it to be released.
+        assert not loader.started["b"].wait(timeout=0.2)
+        assert prefetcher.held_bytes == 3 * MB
+
+        assert prefetcher.get({"path": "a"}).path == "a"
+        # Still held for its second user.
+        assert prefetcher.held_bytes == 3 * MB
+        assert not loader.started["b"].is_set()
+
+        assert prefetcher.get({"path": "a"}).path == "a"
+        # Released after its last user, which lets "b" load.
+        assert loader.started["b"].wait(timeout=10)
+        assert prefetcher.get({"path": "b"}).path == "b"
+        assert prefetcher.held_bytes == 0
+        assert prefetcher.hits == 3
+        assert loader.loaded == ["a", "b"]
+    finally:
+        prefetcher.close()
+
+
+def test_pending_dataset_is_handed_back_to_the_caller():
+    loader = FakeLoader({"a": 1 * MB, "b": 1 * MB})
+    # A single worker, busy loading "a": "b" is still pending.
+    prefetcher = DatasetPrefetcher(loader, [{"path": "a"}, {"path": "b"}], max_workers=1)
+    try:
+        assert loader.started["a"].wait(timeout=10)
+        assert prefetcher.states[dataset_key({"path": "a"})] == LOADING
+        assert prefetcher.get({"path": "b"}) is None
+        assert prefetcher.states[dataset_key({"path": "b"})] == SKIPPED
+
+        loader.release["a"].set()
+        assert prefetcher.get({"path": "a"}).path == "a"
+        prefetcher.executor.shutdown(wait=True)
+        # The worker does not load "b" once the caller took it over.
+        assert loader.loaded == ["a"]
+        assert prefetcher.hits == 1
+        assert prefetcher.held_bytes == 0
+        # Unknown datasets are left to the caller as well.
+        assert prefetcher.get({"path": "c"}) is None
+    finally:
+        prefetcher.close()
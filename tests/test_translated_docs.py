@@ -0,0 +1,291 @@
+"""
+The batched `process_docs` of the translated tasks give the same rows, in the same column
+order, as the per-row functions they replaced (below, as they were).
+"""
+
+import itertools
+import os
+
+import datasets
+import pytest
+
+from itabench import docs_cache
+from itabench.tasks import TASKS_DIR, load_module
+
+TRANSLATIONS_DIR = os.path.join(TASKS_DIR, "translations")
+LANGUAGES = list(itertools.product(["it", "en"], repeat=2))
+
+
+def _input(doc, source_language):
+    return doc["input"] if source_language == "en" else doc["input_translation"]
+
+
+def _choices(doc, language):
+    return doc["choices"] if language == "en" else doc["choices_translation"]
+
+
+def arc_doc(module, source_language, target_language, template="default"):
+    def _process_doc(doc):
+        input = _input(doc, source_language)
+        choices = _choices(doc, source_language)
+        if template == "with_choices":
+            labels = ["A", "B", "C", "D", "E"][: len(choices)]
+            choices = [f"* {label}. {choice}" for choice, label in zip(choices, labels)]
+            query = module.QUERY_PREFIX[template][source_language].format(
+                input=input, choices="\n".join(choices)
+            )
+        else:
+            query = module.QUERY_PREFIX[template][source_language].format(input=input)
+        query += "\n" + module.ANSWER_PREFIX[target_language]
+        return {
+            "id": doc["id"],
+            "query": query,
+            "choices": choices if template == "default" else labels,
+            "gold": int(doc["label"]),
+        }
+
+    return _process_doc
+
+
+def boolq_doc(module, source_language, target_language, add_passage=False):
+    def _process_doc(doc):
+        query = module.QUERY_PREFIX[doc["metadata"]["category"]][source_language]
+        query = query.format(input=_input(doc, source_language))
+        if add_passage:
+            key = "passage" if source_language == "en" else "passage_translation"
+            passage = doc["metadata"][key]
+            if passage:
+                passage = module.PASSAGE_PREFIX[source_language].format(passage=passage)
+                query = passage + "\n" + query
+        query += "\n" + module.ANSWER_PREFIX[target_language]
+        return {
+            "id": doc["id"],
+            "query": query,
+            "choices": module.CHOICES[target_language],
+            "gold": 0 if doc["label"] else 1,
+        }
+
+    return _process_doc
+
+
+def gsm8k_doc(module, source_language, target_language, output_type="multiple_choice"):
+    def _process_doc(doc):
+        query = module.QUERY_PREFIX[source_language] + _input(doc, source_language)
+        query += "\n" + module.ANSWER_PREFIX[target_language]
+        if output_type == "multiple_choice":
+            return {
+                "id": doc["id"],
+                "query": query,
+                "choices": _choices(doc, source_language),
+                "gold": 0,
+            }
+        key = "explanation" if target_language == "en" else "explanation_translation"
+        return {
+            "id": doc["id"],
+            "query": query,
+            "answer": f"{doc['metadata'][key]} #### {doc['label']}",
+        }
+
+    return _process_doc
+
+
+def hellaswag_doc(module, source_language, target_language):
+    def _process_doc(doc):
+        return {
+            "id": doc["id"],
+            "query": module.preprocess(_input(doc, source_language)),
+            "choices": [module.preprocess(c) for c in _choices(doc, target_language)],
+            "gold": int(doc["label"]),
+        }
+
+    return _process_doc
+
+
+def mmlu_doc(module, source_language, target_language, template="cloze"):
+    def _process_doc_cloze(doc):
+        query = module.QUERY_PREFIX["cloze"][source_language]
+        query = query.format(input=_input(doc, source_language))
+        query += "\n" + module.ANSWER_PREFIX[target_language]
+        return {
+            "id": doc["id"],
+            "query": query,
+            "choices": _choices(doc, target_language),
+            "gold": int(doc["label"]),
+        }
+
+    def _process_doc_multichoice(doc):
+        choices = _choices(doc, source_language)
+        choices = [c[:-1] if c.endswith(".") else c for c in choices]
+        labels = ["A", "B", "C", "D"][: len(choices)]
+        choices = [f"{label}. {choice}" for choice, label in zip(choices, labels)]
+        query = module.QUERY_PREFIX["multichoice"][source_language]
+        query = query.format(input=_input(doc, source_language), choices="\n".join(choices))
+        query += "\n" + module.ANSWER_PREFIX[target_language]
+        return {"id": doc["id"], "query": query, "choices": labels, "gold": int(doc["label"])}
+
+    return _process_doc_cloze if template == "cloze" else _process_doc_multichoice
+
+
+def piqa_doc(module, source_language, target_language):
+    def _process_doc(doc):
+        category = doc["metadata"]["category"]
+        query = module.QUERY_PREFIX[category][source_language]
+        query = query.format(input=_input(doc, source_language))
+        query += module.ANSWER_PREFIX[category][target_language]
+        return {
+            "id": doc["id"],
+            "query": query,
+            "choices": _choices(doc, target_language),
+            "gold": int(doc["label"]),
+        }
+
+    return _process_doc
+
+
+def sciq_doc(module, source_language, target_language, add_passage=False):
+    def _process_doc(doc):
+        key = "passage" if source_language == "en" else "passage_translation"
+        passage = doc["metadata"][key]
+        query = module.QUERY_PREFIX[source_language].format(input=_input(doc, source_language))
+        query += module.ANSWER_PREFIX[target_language]
+        if add_passage and passage:
+            query = module.PASSAGE_PREFIX[source_language].format(passage=passage) + query
+        return {
+            "id": doc["id"],
+            "query": query,
+            "choices": _choices(doc, target_language),
+            "gold": int(doc["label"]),
+        }
+
+    return _process_doc
+
+
+def truthful_qa_doc(module, source_language, target_language, mc_type="mc1"):
+    def _process_doc(doc):
+        query = module.QUERY_PREFIX[source_language].format(input=_input(doc, source_language))
+        query += module.ANSWER_PREFIX[target_language]
+        return {
+            "id": doc["id"],
+            "query": query,
+            "choices": _choices(doc, target_language)[mc_type],
+            "gold": doc["label"][mc_type],
+        }
+
+    return _process_doc
+
+
+def winogrande_doc(module, source_language, target_language):
+    def _process_doc(doc):
+        input = _input(doc, source_language)
+        idx = input.index("_")
+        input, target_text = input[:idx].strip() + " ", input[idx + 1 :].strip()
+        query = module.QUERY_PREFIX[source_language].format(input=input)
+        query += module.ANSWER_PREFIX[target_language]
+        choices = [choice.strip() + " " + target_text for choice in _choices(doc, target_language)]
+        return {"id": doc["id"], "query": query, "choices": choices, "gold": int(doc["label"])}
+
+    return _process_doc
+
+
+MMLU_FILES = [
+    "mmlu/_utils.py",
+    "mmlu/en-en/cloze_utils.py",
+    "mmlu/en-en/multichoice_utils.py",
+    "mmlu/it-it/cloze_utils.py",
+    "mmlu/it-it/multichoice_utils.py",
+]
+
+# (utils file, reference, keyword arguments of `process_docs`, kind of synthetic docs)
+CASES = [
+    ("arc_challenge/utils.py", arc_doc, {"template": "default"}, "default"),
+    ("arc_challenge/utils.py", arc_doc, {"template": "with_choices"}, "default"),
+    ("arc_easy/utils.py", arc_doc, {"template": "default"}, "default"),
+    ("arc_easy/utils.py", arc_doc, {"template": "with_choices"}, "default"),
+    ("boolq/utils.py", boolq_doc, {"add_passage": False}, "boolq"),
+    ("boolq/utils.py", boolq_doc, {"add_passage": True}, "boolq"),
+    ("gsm8k/utils.py", gsm8k_doc, {"output_type": "multiple_choice"}, "default"),
+    ("gsm8k/utils.py", gsm8k_doc, {"output_type": "generate_until"}, "default"),
+    ("hellaswag/utils.py", hellaswag_doc, {}, "default"),
+    ("piqa/utils.py", piqa_doc, {}, "piqa"),
+    ("sciq/utils.py", sciq_doc, {"add_passage": False}, "default"),
+    ("sciq/utils.py", sciq_doc, {"add_passage": True}, "default"),
+    ("truthful_qa/utils.py", truthful_qa_doc, {"mc_type": "mc1"}, "truthful_qa"),
+    ("truthful_qa/utils.py", truthful_qa_doc, {"mc_type": "mc2"}, "truthful_qa"),
+    ("winogrande/utils.py", winogrande_doc, {}, "default"),
+] + [
+    (path, mmlu_doc, {"template": template}, "default")
+    for path in MMLU_FILES
+    for template in ("cloze", "multichoice")
+]
+
+
+def synthetic_docs(kind: str, n: int = 40) -> datasets.Dataset:
+    rows = []
+    for i in range(n):
+        row = {
+            "id": str(i),
+            "input": f"Question {i} [x] with a _ blank.",
+            "input_translation": f"Domanda {i} con uno _ spazio.",
+            "choices": ["first.", "second [t]", " third", "fourth."][: 2 + i % 3],
+            "choices_translation": ["primo.", "secondo", "terzo ", "quarto."][: 2 + i % 3],
+            "label": i % 2,
+            "metadata": {
+                "category": "question",
+                "passage": "" if i % 5 == 0 else f"Passage {i}.",
+                "passage_translation": "" if i % 5 == 0 else f"Passaggio {i}.",
+                "explanation": f"Because {i}.",
+                "explanation_translation": f"Perché {i}.",
+                "subject": ["anatomy", "virology", "astronomy"][i % 3],
+            },
+        }
+        if kind == "piqa":
+            row["metadata"]["category"] = ["question", "text_completion", "topic", "property"][
+                i % 4
+            ]
+        elif kind == "boolq":
+            row["label"] = bool(i % 2)
+        elif kind == "truthful_qa":
+            row["choices"] = {"mc1": ["a", "b"], "mc2": ["c", "d", "e"]}
+            row["choices_translation"] = {"mc1": ["A", "B"], "mc2": ["C", "D", "E"]}
+            row["label"] = {"mc1": [1, 0], "mc2": [1, 0, 0]}
+        rows.append(row)
+    return datasets.Dataset.from_list(rows)
+
+
+@pytest.fixture(autouse=True)
+def empty_docs_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(docs_cache, "DOCS_CACHE_DIR", str(tmp_path))
+    datasets.disable_progress_bars()
+
+
+@pytest.mark.parametrize(
+    "path,reference,options,kind",
+    CASES,
+    ids=[f"{path}-{'-'.join(map(str, options.values()))}" for path, _, options, _ in CASES],
+)
+def test_batched_process_docs_match_the_per_row_functions(path, reference, options, kind):
+    module = load_module(os.path.join(TRANSLATIONS_DIR, path))
+    dataset = synthetic_docs(kind)
+    for source_language, target_language in LANGUAGES:
+        expected = dataset.map(reference(module, source_language, target_language, **options))
+        if reference is winogrande_doc:
+            expected = expected.filter(lambda doc: doc["query"].strip() != "")
+        processed = module.process_docs(dataset, source_language, target_language, **options)
+
+        assert processed.column_names == expected.column_names
+        assert processed.features == expected.features
+        assert processed.to_list() == expected.to_list()
+
+
+@pytest.mark.parametrize("path", MMLU_FILES)
+def test_mmlu_subjects_match_the_per_row_functions(path):
+    module = load_module(os.path.join(TRANSLATIONS_DIR, path))
+    dataset = synthetic_docs("default")
+    for template in ("cloze", "multichoice"):
+        expected = dataset.filter(lambda doc: doc["metadata"]["subject"] == "virology").map(
+            mmlu_doc(module, "it", "it", template)
+        )
+        processed = module.process_docs(dataset, "it", "it", template, subject="virology")
+
+        assert processed.column_names == expected.column_names
+        assert processed.to_list() == expected.to_list()